@@ -0,0 +1,92 @@
+"""
+Bytes on the wire for the admin student and user list pages, raw vs compressed.
+
+    python bench/compression.py
+    python bench/compression.py --users 2000
+
+Needs no database: the real templates are rendered inside the app with synthetic
+rows (one page of STUDENTS_PAGE_SIZE students; every account on the users page, as
+the page lists them all), then put through compress.py's encoders. Brotli is
+measured when the Brotli package is installed.
+"""
+import argparse
+import gzip
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "enrollment"))
+
+import admin_views  # noqa: E402
+import compress  # noqa: E402
+from factory import create_app  # noqa: E402
+from flask import render_template  # noqa: E402
+
+FIRST = ["Juan", "Maria", "Jose", "Ana", "Mark", "Angel", "John", "Kristine", "Paolo", "Jasmine"]
+LAST = ["Dela Cruz", "Santos", "Reyes", "Garcia", "Mendoza", "Bautista", "Villanueva", "Fernandez"]
+PROGRAMS = [{"id": i, "name": name} for i, name in enumerate(
+    ["BS Information Technology", "BS Computer Science", "BS Accountancy", "BS Education"], start=1)]
+
+
+def students_page(rng):
+    students = [{
+        "id": 1000 + i,
+        "student_id": "2025-%06d" % (1000 + i),
+        "first_name": rng.choice(FIRST),
+        "middle_name": rng.choice(LAST),
+        "last_name": rng.choice(LAST),
+        "program_name": rng.choice(PROGRAMS)["name"],
+        "year_level": rng.randint(1, 4),
+    } for i in range(admin_views.STUDENTS_PAGE_SIZE)]
+    return render_template("admin/students.html", students=students, all_programs=PROGRAMS,
+                           filters={"program_id": "", "year_level": "", "q": ""},
+                           next_after=students[-1]["id"], prev_before=None)
+
+
+def users_page(rng, count):
+    roles = ["admin"] * 3 + ["registrar"] * 5 + ["cashier"] * 4 + ["student"] * max(count - 12, 0)
+    users_by_role = {"admin": [], "registrar": [], "cashier": [], "student": []}
+    for i, role in enumerate(roles, start=1):
+        users_by_role[role].append({"id": i, "username": "%s%s%d" % (rng.choice(FIRST).lower(), role[:3], i),
+                                    "role": role})
+    return render_template("admin/users.html", users_by_role=users_by_role)
+
+
+def measure(name, html):
+    raw = html.encode("utf-8")
+    rows = [("identity", len(raw), 0.0)]
+    encoders = [("gzip-%d" % compress.GZIP_LEVEL, lambda d: gzip.compress(d, compress.GZIP_LEVEL, mtime=0)),
+                ("gzip-9", lambda d: gzip.compress(d, 9, mtime=0))]
+    if compress.brotli is not None:
+        encoders.append(("br-%d" % compress.BROTLI_QUALITY,
+                         lambda d: compress.brotli.compress(d, quality=compress.BROTLI_QUALITY)))
+    for label, encode in encoders:
+        started = time.perf_counter()
+        for _ in range(20):
+            body = encode(raw)
+        rows.append((label, len(body), (time.perf_counter() - started) / 20 * 1000))
+
+    print(name)
+    for label, size, ms in rows:
+        print("  %-10s %8d bytes  %5.1f%% of raw  saved %8d  %.2fms"
+              % (label, size, 100.0 * size / len(raw), len(raw) - size, ms))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    app = create_app("admin")
+    with app.test_request_context():
+        measure("/admin/students (one page, %d rows)" % admin_views.STUDENTS_PAGE_SIZE, students_page(rng))
+        measure("/admin/users (%d accounts)" % args.users, users_page(rng, args.users))
+    if compress.brotli is None:
+        print("(Brotli not installed: br not measured)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+"""
+Enrollment rush: seed a synthetic campus and drive scripted user journeys over HTTP.
+
+    python bench/rush.py seed --students 50000
+    python bench/rush.py run --portal http://localhost:5000 --admin http://localhost:5001 \\
+                             --users 2000 --concurrency 64
+    python bench/rush.py compare bench/results/rush-A.json bench/results/rush-B.json
+    python bench/rush.py clean
+
+`seed` and `clean` talk to the database configured through DB_* (see enrollment/db.py).
+Every seeded row is tagged with the RUSH prefix so `clean` removes exactly what `seed`
+created. `run` needs both apps running against that database. It records each
+request's latency per route and writes p50/p95/p99 and throughput to
+bench/results/rush-<timestamp>.json.
+
+Journeys:
+  student    POST /login, GET /student/enroll/<section>, POST /student/enroll/submit
+  registrar  POST /login, GET /registrar/dashboard, GET /registrar/enrollments,
+             GET /registrar/validate/<id> for the enrollments the students just made
+  admin      POST /login, GET /admin/students (plain and filtered),
+             GET /admin/class_schedules, GET /admin/dashboard
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "enrollment"))
+
+import db  # noqa: E402
+import enrollments  # noqa: E402
+import passwords  # noqa: E402
+import refcache  # noqa: E402
+import stats  # noqa: E402
+
+TAG = "RUSH"
+PASSWORD = "rush-pass"
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday"]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+BATCH = 1000
+
+
+# ----------------------------------
+# SEED / CLEAN
+# ----------------------------------
+def _section_name(p, year, letter):
+    return "%s-P%02d-Y%d%s" % (TAG, p, year, letter)
+
+
+def seed(args):
+    conn = db.get_db_connection()
+    cur = conn.cursor()
+    rng = random.Random(args.seed)
+
+    cur.executemany("INSERT INTO programs (code, name) VALUES (%s, %s)",
+                    [("%s-P%02d" % (TAG, p), "Rush Program %02d" % p) for p in range(args.programs)])
+    cur.execute("SELECT id, code FROM programs WHERE code LIKE %s", (TAG + "-P%",))
+    program_ids = {code: pid for pid, code in cur.fetchall()}
+
+    # Subject slot i of year y requires slot i of year y-1: chains four subjects deep
+    subject_ids = {}  # (p, year, slot) -> id
+    for year in range(1, 5):
+        rows = []
+        for p in range(args.programs):
+            for slot in range(args.subjects_per_year):
+                prereq = subject_ids.get((p, year - 1, slot))
+                rows.append(("%s-P%02d-Y%d-S%02d" % (TAG, p, year, slot), "Rush Subject P%02d Y%d S%02d" % (p, year, slot),
+                             3, program_ids["%s-P%02d" % (TAG, p)], year, prereq))
+        cur.executemany("""
+            INSERT INTO subjects (code, title, units, program_id, year_level, prerequisite_id)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, rows)
+        cur.execute("SELECT id, code FROM subjects WHERE code LIKE %s", ("%s-%%-Y%d-%%" % (TAG, year),))
+        for sid, code in cur.fetchall():
+            _, p, _, slot = code.split("-")
+            subject_ids[(int(p[1:]), year, int(slot[1:]))] = sid
+
+    # One section = one room; its subjects get distinct day/time slots so nothing clashes
+    schedules = []
+    for p in range(args.programs):
+        for year in range(1, 5):
+            for s in range(args.sections):
+                letter = chr(ord("A") + s)
+                section = _section_name(p, year, letter)
+                for slot in range(args.subjects_per_year):
+                    start = 7 * 60 + (slot // len(DAYS)) * 90
+                    schedules.append((subject_ids[(p, year, slot)], enrollments.CURRENT_SEMESTER, DAYS[slot % len(DAYS)],
+                                      "%02d:%02d" % divmod(start, 60), "%02d:%02d" % divmod(start + 80, 60),
+                                      "R-%s" % section, "Rush Instructor %s-%d" % (section, slot), section, args.capacity))
+    cur.executemany("""
+        INSERT INTO class_schedules (subject_id, semester, day, time_start, time_end, room, instructor, section, capacity)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, schedules)
+    conn.commit()
+
+    # Students: one bcrypt hash shared by all accounts, logins still pay for the check
+    pw_hash = passwords.hash_now(PASSWORD)
+    staff = [("rush-registrar", pw_hash, "registrar"), ("rush-admin", pw_hash, "admin")]
+    cur.executemany("INSERT INTO users (username, password, role) VALUES (%s, %s, %s)", staff)
+    for start in range(0, args.students, BATCH):
+        numbers = range(start, min(start + BATCH, args.students))
+        cur.executemany("INSERT INTO users (username, password, role) VALUES (%s, %s, 'student')",
+                        [("rush-%06d" % n, pw_hash) for n in numbers])
+        cur.execute("SELECT username, id FROM users WHERE username BETWEEN %s AND %s",
+                    ("rush-%06d" % numbers[0], "rush-%06d" % numbers[-1]))
+        user_ids = dict(cur.fetchall())
+        rows = []
+        for n in numbers:
+            p = n % args.programs
+            year = 1 if rng.random() < 0.75 else 2
+            rows.append(("%s-%06d" % (TAG, n), "Rush", "Student%06d" % n, program_ids["%s-P%02d" % (TAG, p)],
+                         year, user_ids["rush-%06d" % n]))
+        cur.executemany("""
+            INSERT INTO students (student_id, first_name, last_name, program_id, year_level, user_id)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, rows)
+        conn.commit()
+
+    # Second-years have passed their first-year subjects
+    cur.execute("""
+        INSERT INTO student_completed_subjects (student_id, subject_id)
+        SELECT st.id, su.id FROM students st
+        JOIN subjects su ON su.program_id = st.program_id AND su.year_level = 1
+        WHERE st.student_id LIKE %s AND st.year_level = 2
+    """, (TAG + "-%",))
+
+    for name in ("programs", "subjects", "class_schedules"):
+        refcache.bump(cur, name)
+    conn.commit()
+    conn.close()
+    stats.rebuild()
+    print("seeded %d programs, %d subjects, %d schedules, %d students"
+          % (len(program_ids), len(subject_ids), len(schedules), args.students))
+
+
+def clean(args):
+    conn = db.get_db_connection()
+    cur = conn.cursor()
+    like = TAG + "-%"
+    # Payments and assessments reference the enrollments, so they go first
+    cur.execute("""
+        DELETE p FROM payments p
+        JOIN assessments a ON p.assessment_id = a.id
+        JOIN enrollments e ON a.enrollment_id = e.id
+        JOIN students st ON e.student_id = st.id
+        WHERE st.student_id LIKE %s
+    """, (like,))
+    cur.execute("""
+        DELETE a FROM assessments a
+        JOIN enrollments e ON a.enrollment_id = e.id
+        JOIN students st ON e.student_id = st.id
+        WHERE st.student_id LIKE %s
+    """, (like,))
+    cur.execute("""
+        DELETE es FROM enrollment_subjects es
+        JOIN enrollments e ON es.enrollment_id = e.id
+        JOIN students st ON e.student_id = st.id
+        WHERE st.student_id LIKE %s
+    """, (like,))
+    cur.execute("UPDATE students SET current_enrollment_id = NULL WHERE student_id LIKE %s", (like,))
+    cur.execute("DELETE e FROM enrollments e JOIN students st ON e.student_id = st.id WHERE st.student_id LIKE %s", (like,))
+    cur.execute("DELETE c FROM student_completed_subjects c JOIN students st ON c.student_id = st.id WHERE st.student_id LIKE %s", (like,))
+    cur.execute("DELETE FROM students WHERE student_id LIKE %s", (like,))
+    cur.execute("DELETE FROM users WHERE username LIKE 'rush-%'")
+    cur.execute("DELETE FROM class_schedules WHERE section LIKE %s", (like,))
+    cur.execute("UPDATE subjects SET prerequisite_id = NULL WHERE code LIKE %s", (like,))
+    cur.execute("DELETE FROM subjects WHERE code LIKE %s", (like,))
+    cur.execute("DELETE FROM programs WHERE code LIKE %s", (like,))
+    for name in ("programs", "subjects", "class_schedules"):
+        refcache.bump(cur, name)
+    conn.commit()
+    conn.close()
+    stats.rebuild()
+    print("removed seeded campus")
+
+
+# ----------------------------------
+# RUN
+# ----------------------------------
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}  # route -> [(seconds, ok)]
+
+    def call(self, http, route, method, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = http.request(method, url, allow_redirects=False, timeout=60, **kwargs)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.samples.setdefault(route, []).append((elapsed, ok))
+        return response
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+def _login(rec, http, base, username):
+    rec.call(http, "POST /login", "POST", base + "/login", data={"username": username, "password": PASSWORD})
+
+
+def student_journey(rec, portal, student):
+    http = requests.Session()
+    _login(rec, http, portal, student["username"])
+    rec.call(http, "GET /student/enroll/<section>", "GET", portal + "/student/enroll/" + student["section"])
+    rec.call(http, "POST /student/enroll/submit", "POST", portal + "/student/enroll/submit",
+             data={"section": student["section"], "subject_ids": student["subject_ids"]})
+
+
+def registrar_journey(rec, portal, enrollment_ids):
+    http = requests.Session()
+    _login(rec, http, portal, "rush-registrar")
+    rec.call(http, "GET /registrar/dashboard", "GET", portal + "/registrar/dashboard")
+    rec.call(http, "GET /registrar/dashboard?status", "GET", portal + "/registrar/dashboard?status=pending")
+    rec.call(http, "GET /registrar/enrollments", "GET", portal + "/registrar/enrollments")
+    for enrollment_id in enrollment_ids:
+        rec.call(http, "GET /registrar/validate/<id>", "GET", "%s/registrar/validate/%d" % (portal, enrollment_id))
+
+
+def admin_journey(rec, admin, rounds):
+    http = requests.Session()
+    rec.call(http, "POST /admin login", "POST", admin + "/login", data={"username": "rush-admin", "password": PASSWORD})
+    for _ in range(rounds):
+        rec.call(http, "GET /admin/students", "GET", admin + "/admin/students")
+        rec.call(http, "GET /admin/students?q", "GET", admin + "/admin/students", params={"q": "Student0"})
+        rec.call(http, "GET /admin/class_schedules", "GET", admin + "/admin/class_schedules")
+        rec.call(http, "GET /admin/dashboard", "GET", admin + "/admin/dashboard")
+
+
+def _pick_students(count, rng):
+    conn = db.get_db_connection()
+    cur = conn.cursor(dictionary=True)
+    cur.execute("""
+        SELECT u.username, st.program_id, st.year_level, p.code AS program_code
+        FROM students st
+        JOIN users u ON u.id = st.user_id
+        JOIN programs p ON p.id = st.program_id
+        WHERE st.student_id LIKE %s AND st.current_enrollment_id IS NULL
+    """, (TAG + "-%",))
+    candidates = cur.fetchall()
+    cur.execute("""
+        SELECT section, GROUP_CONCAT(subject_id ORDER BY subject_id) AS subject_ids
+        FROM class_schedules WHERE section LIKE %s GROUP BY section
+    """, (TAG + "-%",))
+    sections = {row["section"]: row["subject_ids"].split(",") for row in cur.fetchall()}
+    conn.close()
+
+    picked = rng.sample(candidates, min(count, len(candidates)))
+    letters = sorted({name[-1] for name in sections})
+    for student in picked:
+        p = int(student["program_code"].rsplit("P", 1)[1])
+        student["section"] = _section_name(p, student["year_level"], rng.choice(letters))
+        student["subject_ids"] = sections[student["section"]]
+    return picked
+
+
+def _pending_enrollments(limit):
+    conn = db.get_db_connection()
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT e.id FROM enrollments e JOIN students st ON e.student_id = st.id
+        WHERE st.student_id LIKE %s AND e.status = 'pending'
+        ORDER BY e.id LIMIT %s
+    """, (TAG + "-%", limit))
+    ids = [row[0] for row in cur.fetchall()]
+    conn.close()
+    return ids
+
+
+def _summarize(rec, elapsed):
+    routes = {}
+    for route, samples in sorted(rec.samples.items()):
+        ms = [seconds * 1000 for seconds, _ in samples]
+        routes[route] = {
+            "count": len(samples),
+            "errors": sum(1 for _, ok in samples if not ok),
+            "p50_ms": round(percentile(ms, 50), 2),
+            "p95_ms": round(percentile(ms, 95), 2),
+            "p99_ms": round(percentile(ms, 99), 2),
+            "max_ms": round(max(ms), 2),
+            "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        }
+    return {"elapsed_s": round(elapsed, 3), "routes": routes}
+
+
+def _print_phase(name, phase):
+    print("\n%s (%.1fs)" % (name, phase["elapsed_s"]))
+    print("  %-34s %7s %6s %9s %9s %9s %9s" % ("route", "count", "err", "p50 ms", "p95 ms", "p99 ms", "req/s"))
+    for route, r in phase["routes"].items():
+        print("  %-34s %7d %6d %9.1f %9.1f %9.1f %9.1f" % (
+            route, r["count"], r["errors"], r["p50_ms"], r["p95_ms"], r["p99_ms"], r["throughput_rps"]))
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    students = _pick_students(args.users, rng)
+    if not students:
+        sys.exit("no unenrolled seeded students left; run `clean` and `seed` again")
+
+    result = {
+        "meta": {
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "args": {k: v for k, v in vars(args).items() if k != "func"},
+        },
+        "phases": {},
+    }
+
+    # Phase 1: the rush itself
+    rec = Recorder()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(lambda s: student_journey(rec, args.portal, s), students))
+    result["phases"]["students"] = _summarize(rec, time.perf_counter() - started)
+    submits = result["phases"]["students"]["routes"].get("POST /student/enroll/submit", {})
+    result["enrollments_per_second"] = submits.get("throughput_rps", 0.0)
+
+    # Phase 2: back office while the queue is full
+    pending = _pending_enrollments(args.validations)
+    per_registrar = [pending[i::args.registrars] for i in range(args.registrars)]
+    rec = Recorder()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.registrars + args.admins) as pool:
+        jobs = [pool.submit(registrar_journey, rec, args.portal, ids) for ids in per_registrar]
+        jobs += [pool.submit(admin_journey, rec, args.admin, args.admin_rounds) for _ in range(args.admins)]
+        for job in jobs:
+            job.result()
+    result["phases"]["back_office"] = _summarize(rec, time.perf_counter() - started)
+
+    for name, phase in result["phases"].items():
+        _print_phase(name, phase)
+    print("\nenrollments/s: %.1f" % result["enrollments_per_second"])
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = args.out or os.path.join(RESULTS_DIR, "rush-%s.json" % datetime.now().strftime("%Y%m%d-%H%M%S"))
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2)
+    print("results written to %s" % path)
+
+
+def compare(args):
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    print("%-14s %-34s %12s %12s %12s %12s" % ("phase", "route", "p95 before", "p95 after", "rps before", "rps after"))
+    for phase, data in after["phases"].items():
+        old_routes = before["phases"].get(phase, {}).get("routes", {})
+        for route, r in data["routes"].items():
+            old = old_routes.get(route, {})
+            print("%-14s %-34s %12s %12.1f %12s %12.1f" % (
+                phase, route, "%.1f" % old["p95_ms"] if old else "-", r["p95_ms"],
+                "%.1f" % old["throughput_rps"] if old else "-", r["throughput_rps"]))
+    print("enrollments/s: %.1f -> %.1f" % (before.get("enrollments_per_second", 0.0), after.get("enrollments_per_second", 0.0)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("seed", help="create the synthetic campus")
+    p.add_argument("--students", type=int, default=50000)
+    p.add_argument("--programs", type=int, default=10)
+    p.add_argument("--subjects-per-year", type=int, default=6)
+    p.add_argument("--sections", type=int, default=8, help="sections per program and year")
+    p.add_argument("--capacity", type=int, default=400)
+    p.add_argument("--seed", type=int, default=1)
+    p.set_defaults(func=seed)
+
+    p = sub.add_parser("run", help="drive the journeys and record latencies")
+    p.add_argument("--portal", default="http://localhost:5000")
+    p.add_argument("--admin", default="http://localhost:5001")
+    p.add_argument("--users", type=int, default=2000, help="students that go through the enroll journey")
+    p.add_argument("--concurrency", type=int, default=64)
+    p.add_argument("--registrars", type=int, default=4)
+    p.add_argument("--validations", type=int, default=500)
+    p.add_argument("--admins", type=int, default=4)
+    p.add_argument("--admin-rounds", type=int, default=25)
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--out", help="results file (default bench/results/rush-<timestamp>.json)")
+    p.set_defaults(func=run)
+
+    p = sub.add_parser("compare", help="compare two result files")
+    p.add_argument("before")
+    p.add_argument("after")
+    p.set_defaults(func=compare)
+
+    p = sub.add_parser("clean", help="remove the synthetic campus")
+    p.set_defaults(func=clean)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Seat reservation under contention: N concurrent enrollment submits against one section.
+
+    python bench/seat_contention.py --students 1000 --capacity 400 --workers 32
+    python bench/seat_contention.py --mode for-update      # row-lock baseline
+
+Runs against the database configured through DB_* (see enrollment/db.py). It seeds
+throwaway students and a one-subject section, drives enrollments.submit() from a
+thread pool, prints throughput and latency, checks the section was never oversold,
+and removes everything it created (then rebuilds stat_counters).
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "enrollment"))
+
+import db  # noqa: E402
+import enrollments  # noqa: E402
+import stats  # noqa: E402
+
+
+def reserve_for_update(cur, schedule_ids):
+    # Baseline: lock the schedule rows, check, then increment
+    placeholders = ",".join(["%s"] * len(schedule_ids))
+    cur.execute(f"""
+        SELECT id, capacity, enrolled_count FROM class_schedules
+        WHERE id IN ({placeholders}) ORDER BY id FOR UPDATE
+    """, list(schedule_ids))
+    rows = cur.fetchall()
+    if any(cap is not None and taken >= cap for _, cap, taken in rows):
+        return False
+    cur.execute(f"UPDATE class_schedules SET enrolled_count = enrolled_count + 1 WHERE id IN ({placeholders})",
+                list(schedule_ids))
+    return True
+
+
+def seed(cur, tag, students, capacity):
+    cur.execute("INSERT INTO subjects (code, title, units) VALUES (%s, %s, 3)", (tag[:20], "Bench " + tag))
+    subject_id = cur.lastrowid
+    cur.execute("""
+        INSERT INTO class_schedules (subject_id, semester, day, time_start, time_end, room, section, capacity)
+        VALUES (%s, %s, 'MON', '08:00', '09:00', 'BENCH', %s, %s)
+    """, (subject_id, enrollments.CURRENT_SEMESTER, tag, capacity))
+    schedule_id = cur.lastrowid
+    cur.executemany("INSERT INTO students (student_id, first_name, last_name) VALUES (%s, 'Bench', %s)",
+                    [("%s-%05d" % (tag[:12], i), str(i)) for i in range(students)])
+    cur.execute("SELECT id FROM students WHERE student_id LIKE %s", (tag[:12] + "-%",))
+    student_ids = [row[0] for row in cur.fetchall()]
+    return subject_id, schedule_id, student_ids
+
+
+def cleanup(cur, tag, subject_id, schedule_id):
+    # Payments and assessments reference the enrollments, so they go first
+    cur.execute("""
+        DELETE p FROM payments p
+        JOIN assessments a ON p.assessment_id = a.id
+        JOIN enrollments e ON a.enrollment_id = e.id
+        WHERE e.section = %s
+    """, (tag,))
+    cur.execute("""
+        DELETE a FROM assessments a JOIN enrollments e ON a.enrollment_id = e.id
+        WHERE e.section = %s
+    """, (tag,))
+    cur.execute("""
+        DELETE es FROM enrollment_subjects es JOIN enrollments e ON es.enrollment_id = e.id
+        WHERE e.section = %s
+    """, (tag,))
+    cur.execute("DELETE FROM enrollments WHERE section = %s", (tag,))
+    cur.execute("DELETE FROM students WHERE student_id LIKE %s", (tag[:12] + "-%",))
+    cur.execute("DELETE FROM class_schedules WHERE id = %s", (schedule_id,))
+    cur.execute("DELETE FROM subjects WHERE id = %s", (subject_id,))
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--capacity", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--mode", choices=["conditional", "for-update"], default="conditional")
+    args = parser.parse_args()
+
+    if args.mode == "for-update":
+        enrollments.reserve_seats = reserve_for_update
+    # Every worker holds a connection for its whole submit
+    db.POOL_SIZE = max(db.POOL_SIZE, args.workers + 1)
+
+    tag = "B" + uuid.uuid4().hex[:10]
+    conn = db.get_db_connection()
+    cur = conn.cursor()
+    subject_id, schedule_id, student_ids = seed(cur, tag, args.students, args.capacity)
+    conn.commit()
+    conn.close()
+
+    def one(student_id):
+        conn = db.get_db_connection()
+        started = time.perf_counter()
+        try:
+            enrollments.submit(conn, student_id, tag, [subject_id],
+                               enrollments.CURRENT_SEMESTER, enrollments.CURRENT_SCHOOL_YEAR)
+            outcome = "enrolled"
+        except enrollments.SectionFull:
+            outcome = "full"
+        except Exception as e:
+            conn.rollback()
+            outcome = type(e).__name__
+        finally:
+            conn.close()
+        return outcome, time.perf_counter() - started
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(one, student_ids))
+        elapsed = time.perf_counter() - started
+
+        conn = db.get_db_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT enrolled_count FROM class_schedules WHERE id = %s", (schedule_id,))
+        seated = cur.fetchone()[0]
+        cur.execute("SELECT COUNT(*) FROM enrollments WHERE section = %s", (tag,))
+        rows = cur.fetchone()[0]
+        conn.close()
+    finally:
+        conn = db.get_db_connection()
+        cur = conn.cursor()
+        cleanup(cur, tag, subject_id, schedule_id)
+        conn.commit()
+        conn.close()
+        # Undo the dashboard counters the submits bumped
+        stats.rebuild()
+
+    outcomes = {}
+    for outcome, _ in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    latencies = [seconds * 1000 for _, seconds in results]
+
+    print("mode          %s" % args.mode)
+    print("submits       %d in %.2fs  (%.0f/s, %d workers)" % (len(results), elapsed, len(results) / elapsed, args.workers))
+    print("outcomes      %s" % ", ".join("%s=%d" % item for item in sorted(outcomes.items())))
+    print("latency ms    p50=%.1f p95=%.1f p99=%.1f max=%.1f" % (
+        percentile(latencies, 50), percentile(latencies, 95), percentile(latencies, 99), max(latencies)))
+    print("seats         %d taken of %d, %d enrollment rows" % (seated, args.capacity, rows))
+    print("pool          %s" % db.pool_stats())
+    if seated != rows or seated > args.capacity:
+        print("OVERSOLD or drifted counter")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Timetable generator on a synthetic semester: N sections, each with its year level's
+subjects, against a pool of rooms, instructors (with availability and the subjects
+they may teach) and weekly time slots.
+
+    python bench/timetable.py --sections 2000
+    python bench/timetable.py --sections 2000 --rooms 360 --instructors 500
+
+Needs no database: it builds the inputs timetable.load() would, runs the solver
+with progress, then re-checks the result for room, instructor and section clashes
+with conflicts.overlaps_within.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "enrollment"))
+
+import conflicts  # noqa: E402
+import timetable  # noqa: E402
+
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
+
+
+def problem(args, rng):
+    # 1.5-hour slots, 7:30 to 19:30, Monday to Saturday
+    slots = [{"day": day, "start": 450 + 90 * i, "end": 540 + 90 * i} for day in DAYS for i in range(8)]
+    rooms = [{"name": "R%03d" % i, "capacity": rng.choice([30, 40, 40, 50, 60])} for i in range(args.rooms)]
+
+    subjects = {}  # (program, year) -> subject ids
+    next_id = 1
+    for program in range(args.programs):
+        for year in range(1, 5):
+            subjects[(program, year)] = list(range(next_id, next_id + args.subjects))
+            next_id += args.subjects
+
+    # Each instructor teaches subjects of one program and is out one day a week
+    instructors = list(range(1, args.instructors + 1))
+    qualified = {}
+    available = {}
+    for instructor in instructors:
+        program = instructor % args.programs
+        for year in range(1, 5):
+            for subject_id in rng.sample(subjects[(program, year)], max(1, args.subjects // 2)):
+                qualified.setdefault(subject_id, []).append(instructor)
+        off = rng.choice(DAYS)
+        available[instructor] = {k for k, slot in enumerate(slots) if slot["day"] != off}
+
+    tasks = []
+    for n in range(args.sections):
+        program, year = n % args.programs, 1 + (n // args.programs) % 4
+        for subject_id in subjects[(program, year)]:
+            tasks.append({"section": "S%04d" % n, "subject_id": subject_id, "size": rng.choice([25, 30, 35, 40, 45]),
+                          "instructors": qualified.get(subject_id, instructors)})
+    return timetable.Solver(slots, rooms, available, tasks)
+
+
+def clashes(solver):
+    rows = [{"day": solver.slots[k]["day"], "time_start": timetable._clock(solver.slots[k]["start"]),
+             "time_end": timetable._clock(solver.slots[k]["end"]), "room": solver.rooms[room]["name"],
+             "instructor_id": teacher, "section": task["section"]}
+            for task, k, room, teacher in solver.placed]
+    found = 0
+    for kind in ("room", "instructor_id", "section"):
+        groups = {}
+        for row in rows:
+            groups.setdefault(row[kind], []).append(row)
+        found += sum(len(conflicts.overlaps_within(group)) for group in groups.values())
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sections", type=int, default=2000)
+    parser.add_argument("--programs", type=int, default=20)
+    parser.add_argument("--subjects", type=int, default=8, help="subjects per program and year level")
+    parser.add_argument("--rooms", type=int, default=360)
+    parser.add_argument("--instructors", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    started = time.perf_counter()
+    solver = problem(args, rng)
+    built = time.perf_counter() - started
+    print("%d sections, %d classes, %d rooms, %d instructors, %d slots (built in %.2fs)"
+          % (args.sections, len(solver.tasks), args.rooms, args.instructors, len(solver.slots), built))
+
+    started = time.perf_counter()
+    for progress in solver.run():
+        print("  %.1fs  %s" % (time.perf_counter() - started, timetable.describe(progress)))
+    elapsed = time.perf_counter() - started
+
+    print("placed %d/%d, unplaced %d, clashes %d, solved in %.2fs"
+          % (len(solver.placed), len(solver.tasks), len(solver.unplaced), clashes(solver), elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Typeahead latency: search.py's in-memory index over N synthetic student records.
+
+    python bench/typeahead.py --records 100000
+    python bench/typeahead.py --records 100000 --updates 1000
+
+Needs no database: it builds the index the way search.index() does, then times a
+mix of queries (short prefixes, whole names, pieces inside a word, student numbers)
+and, with --updates, edits the way search.touch() applies them after a commit
+(copy the index, change the copy).
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "enrollment"))
+
+import search  # noqa: E402
+
+FIRST = ["Juan", "Maria", "Jose", "Ana", "Mark", "Angel", "John", "Kristine", "Paolo", "Jasmine",
+         "Carlo", "Nicole", "Miguel", "Patricia", "Rafael", "Andrea", "Gabriel", "Camille", "Joshua", "Bea"]
+LAST = ["Dela Cruz", "Santos", "Reyes", "Garcia", "Mendoza", "Bautista", "Villanueva", "Fernandez",
+        "Ramos", "Castillo", "Aquino", "Navarro", "Soriano", "Torres", "Gonzales", "Lopez", "Flores",
+        "Rivera", "Domingo", "Manalo", "Pascual", "Salazar", "Tolentino", "Valdez", "Cabrera"]
+
+
+def rows(count, rng):
+    for i in range(1, count + 1):
+        yield {
+            "id": i,
+            "student_id": "2025-%06d" % i,
+            "first_name": rng.choice(FIRST),
+            "middle_name": rng.choice(LAST + [None]),
+            "last_name": rng.choice(LAST) + ("" if rng.random() < 0.7 else " %s" % rng.choice(LAST)),
+        }
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - started) * 1000, result
+
+
+def report(name, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print("%-14s n=%-5d mean=%.3fms  p95=%.3fms  max=%.3fms"
+          % (name, len(samples), statistics.mean(samples), p95, samples[-1]))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--updates", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    started = time.perf_counter()
+    index = search._Index(0)
+    index.build({row["id"]: search._doc("students", row) for row in rows(args.records, rng)})
+    print("built %d records in %.2fs (%d tokens, %d trigrams)"
+          % (len(index.docs), time.perf_counter() - started, len(index.words), len(index.grams)))
+
+    shapes = {
+        "prefix-1": lambda: rng.choice(LAST)[:1],
+        "prefix-2": lambda: rng.choice(FIRST)[:2],
+        "name": lambda: "%s %s" % (rng.choice(LAST).split()[-1], rng.choice(FIRST)),
+        "infix": lambda: rng.choice(LAST).split()[-1][1:5],
+        "student_id": lambda: "2025-%06d" % rng.randint(1, args.records),
+    }
+    worst = 0.0
+    for name, make in shapes.items():
+        samples = [timed(index.search, make(), search.DEFAULT_LIMIT)[0] for _ in range(args.queries // len(shapes))]
+        worst = max(worst, sorted(samples)[int(len(samples) * 0.95) - 1])
+        report(name, samples)
+
+    if args.updates:
+        def update(current, did, doc):
+            updated = current.copy()
+            updated.add(did, doc)
+            return updated
+
+        samples = []
+        for row in rows(args.updates, rng):
+            row["id"] = rng.randint(1, args.records)
+            seconds, index = timed(update, index, row["id"], search._doc("students", row))
+            samples.append(seconds)
+        report("update", samples)
+
+    print("worst p95: %.3fms" % worst)
+
+
+if __name__ == "__main__":
+    main()
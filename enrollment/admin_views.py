@@ -0,0 +1,972 @@
+from flask import Blueprint, Response, render_template, request, redirect, session, stream_with_context
+import conflicts
+import db
+import enrollments
+import exports
+import importer
+import notifications
+import pagecache
+import passwords
+import prereqs
+import refcache
+import search
+import stats
+import timetable
+from db import get_db_connection
+
+# Admin surface: users, students, programs, subjects, instructors, class schedules
+bp = Blueprint("admin", __name__)
+
+STUDENTS_PAGE_SIZE = 50
+# The student list, newest first and keyset-paged on s.id ({where}: filters and the
+# page bound; {order}: DESC, or ASC when paging back)
+STUDENT_LIST = """
+    SELECT s.id, s.student_id, s.first_name, s.last_name, s.middle_name,
+           s.year_level, p.name AS program_name
+    FROM students s
+    LEFT JOIN programs p ON s.program_id = p.id
+    {where}
+    ORDER BY s.id {order}
+    LIMIT %s
+"""
+# Seat counts change with every enrollment and have no version of their own
+SCHEDULE_SEATS_TTL = 10
+
+# ----------------------------------
+# ADMIN DASHBOARD
+# ----------------------------------
+@bp.route("/admin/dashboard")
+def admin_dashboard():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    # Served from stat_counters (kept current by the write routes) behind a short TTL cache
+    stats_data = stats.dashboard()
+
+    return render_template("admin/dashboard_admin.html", **stats_data)
+
+
+# ----------------------------------
+# ADMIN - USER CRUD
+# ----------------------------------
+@bp.route("/admin/users")
+def admin_users():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+
+    cursor.execute("SELECT * FROM users")
+    users = cursor.fetchall()
+
+    # Group by role
+    users_by_role = {
+        "admin": [],
+        "registrar": [],
+        "cashier": [],
+        "student": []
+    }
+
+    for user in users:
+        role = user["role"].lower()
+
+        # Ensure the role exists in dictionary
+        if role in users_by_role:
+            users_by_role[role].append(user)
+
+    conn.close()
+
+    return render_template("admin/users.html", users_by_role=users_by_role)
+
+
+@bp.route("/admin/users/add", methods=["GET","POST"])
+def admin_add_user():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    role = request.args.get("role", "admin")
+
+    if request.method=="POST":
+        username = request.form["username"]
+        password = request.form["password"]
+        role = request.form.get("role", role)
+        hashed_pw = passwords.hash_password(password)
+
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT * FROM users WHERE username=%s", (username,))
+        if cur.fetchone():
+            conn.close()
+            return "Username already exists!"
+
+        cur.execute("INSERT INTO users (username,password,role) VALUES (%s,%s,%s)",(username,hashed_pw,role))
+        user_id = cur.lastrowid
+        stats.user_added(cur, role)
+        search.touch(conn, cur, "users", [user_id])
+
+        # Student accounts get their student record right away
+        if role == "student":
+            cur.execute(
+                "INSERT INTO students (user_id, first_name, middle_name, last_name) VALUES (%s,%s,%s,%s)",
+                (user_id, request.form.get("first_name",""), request.form.get("middle_name",""), request.form.get("last_name",""))
+            )
+            new_student_id = cur.lastrowid
+            stats.student_added(cur, None)
+            search.touch(conn, cur, "students", [new_student_id])
+
+        conn.commit()
+        notifications.publish("user_added", "New %s account" % role, "%s was added" % username, ("admin",))
+        conn.close()
+        return redirect("/admin/users")
+
+    return render_template("admin/users_add.html", role=role)
+
+@bp.route("/admin/users/edit/<int:id>", methods=["GET","POST"])
+def admin_edit_user(id):
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+
+    if request.method=="POST":
+        username = request.form["username"]
+        password = request.form.get("password")
+        role = request.form.get("role")
+
+        cur.execute("SELECT * FROM users WHERE username=%s AND id!=%s", (username, id))
+        if cur.fetchone():
+            conn.close()
+            return "Username already exists!"
+
+        cur.execute("SELECT role FROM users WHERE id=%s", (id,))
+        old = cur.fetchone()
+        role = role or (old["role"] if old else None)
+        if old:
+            stats.user_role_changed(cur, old["role"], role)
+
+        if password:
+            hashed_pw = passwords.hash_password(password)
+            cur.execute("UPDATE users SET username=%s, password=%s, role=%s WHERE id=%s", (username, hashed_pw, role, id))
+        else:
+            cur.execute("UPDATE users SET username=%s, role=%s WHERE id=%s", (username, role, id))
+        search.touch(conn, cur, "users", [id])
+
+        if role == "student" and "last_name" in request.form:
+            cur.execute("""
+                UPDATE students
+                SET first_name=%s, middle_name=%s, last_name=%s
+                WHERE user_id=%s
+            """, (request.form.get("first_name",""), request.form.get("middle_name",""), request.form.get("last_name",""), id))
+            cur.execute("SELECT id FROM students WHERE user_id=%s", (id,))
+            search.touch(conn, cur, "students", [row["id"] for row in cur.fetchall()])
+
+        conn.commit()
+        conn.close()
+        return redirect("/admin/users")
+
+    cur.execute("SELECT * FROM users WHERE id=%s", (id,))
+    user = cur.fetchone()
+    student = None
+    if user and user["role"] == "student":
+        cur.execute("SELECT * FROM students WHERE user_id=%s", (id,))
+        student = cur.fetchone()
+    conn.close()
+    return render_template("admin/users_edit.html", user=user, student=student)
+
+@bp.route("/admin/users/delete/<int:id>")
+def admin_delete_user(id):
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT role FROM users WHERE id=%s", (id,))
+    user = cur.fetchone()
+    cur.execute("SELECT program_id, created_at, id FROM students WHERE user_id=%s", (id,))
+    student = cur.fetchone()
+
+    # The student record references the account, so it goes first
+    cur.execute("DELETE FROM students WHERE user_id=%s", (id,))
+    if student and cur.rowcount:
+        stats.student_removed(cur, student[0], student[1])
+        search.touch(conn, cur, "students", [student[2]])
+    cur.execute("DELETE FROM users WHERE id=%s",(id,))
+    if user and cur.rowcount:
+        stats.user_removed(cur, user[0])
+        search.touch(conn, cur, "users", [id])
+    conn.commit()
+    if user:
+        notifications.publish("user_removed", "Account removed", "A %s account was deleted" % user[0], ("admin",))
+    conn.close()
+    return redirect("/admin/users")
+
+# ----------------------------------
+# ADMIN - STUDENT LIST PAGE
+# ----------------------------------
+@bp.route("/admin/students")
+def admin_students():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    program_id = request.args.get("program_id", type=int)
+    year_level = request.args.get("year_level", type=int)
+    name = request.args.get("q", "").strip()
+    after = request.args.get("after", type=int)    # next page: ids below this one
+    before = request.args.get("before", type=int)  # previous page: ids above this one
+
+    where = []
+    params = []
+    if program_id:
+        where.append("s.program_id = %s")
+        params.append(program_id)
+    if year_level:
+        where.append("s.year_level = %s")
+        params.append(year_level)
+    if name:
+        # Prefix match on any of the three columns. The OR spans columns, so no single
+        # index answers it (and first_name has none): MySQL reads the matching page by
+        # walking s.id in page order and stops at the LIMIT
+        where.append("(s.last_name LIKE %s OR s.first_name LIKE %s OR s.student_id LIKE %s)")
+        prefix = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        params += [prefix] * 3
+
+    # Keyset pagination on s.id (newest first); never OFFSET
+    if before:
+        where.append("s.id > %s")
+        params.append(before)
+        order = "ASC"
+    else:
+        if after:
+            where.append("s.id < %s")
+            params.append(after)
+        order = "DESC"
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+
+    # Only the list columns; details and the edit form are loaded per row on demand
+    cur.execute(STUDENT_LIST.format(where="WHERE " + " AND ".join(where) if where else "", order=order),
+                params + [STUDENTS_PAGE_SIZE + 1])
+    students = cur.fetchall()
+
+    has_more = len(students) > STUDENTS_PAGE_SIZE
+    students = students[:STUDENTS_PAGE_SIZE]
+    if before:
+        students.reverse()
+
+    conn.close()
+
+    # Program id + name for dropdowns
+    all_programs = refcache.programs()
+
+    filters = {"program_id": program_id or "", "year_level": year_level or "", "q": name}
+    next_after = prev_before = None
+    if students:
+        if has_more or before:
+            next_after = students[-1]["id"]
+        if (has_more and before) or after:
+            prev_before = students[0]["id"]
+
+    return render_template("admin/students.html",
+                           students=students,
+                           all_programs=all_programs,
+                           filters=filters,
+                           next_after=next_after,
+                           prev_before=prev_before)
+
+
+@bp.route("/admin/students/<int:id>/form")
+def admin_student_form(id):
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+    cur.execute("""
+        SELECT s.id, s.student_id, s.first_name, s.last_name, s.middle_name,
+               s.birthdate, s.address, s.contact, s.program_id, s.year_level, s.created_at
+        FROM students s
+        WHERE s.id = %s
+    """, (id,))
+    student = cur.fetchone()
+    conn.close()
+    if not student:
+        return "Student not found", 404
+
+    return render_template("admin/student_form.html", s=student, all_programs=refcache.programs())
+
+# ----------------------------------
+# ADMIN - STUDENT CRUD
+# ----------------------------------
+@bp.route("/admin/students/add", methods=["POST"])
+def admin_add_student():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    student_id = request.form["student_id"]
+    first_name = request.form["first_name"]
+    middle_name = request.form.get("middle_name")
+    last_name = request.form["last_name"]
+    birthdate = request.form.get("birthdate")  # format YYYY-MM-DD
+    address = request.form.get("address")
+    contact = request.form.get("contact")
+    program_id = request.form["program_id"]
+    year_level = request.form.get("year_level") or 1
+    user_id = session.get("user_id")  # optional: who created the record
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("""
+        INSERT INTO students
+        (student_id, first_name, middle_name, last_name, birthdate, address, contact, program_id, year_level, user_id, created_at)
+        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,NOW())
+    """, (student_id, first_name, middle_name, last_name, birthdate, address, contact, program_id, year_level, user_id))
+    new_id = cur.lastrowid
+    stats.student_added(cur, program_id)
+    search.touch(conn, cur, "students", [new_id])
+    conn.commit()
+    notifications.publish("student_added", "New student", "%s %s (%s) was added" % (first_name, last_name, student_id))
+    conn.close()
+    return redirect("/admin/students")
+
+
+@bp.route("/admin/students/edit/<int:id>", methods=["POST"])
+def admin_edit_student(id):
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    student_id = request.form["student_id"]
+    first_name = request.form["first_name"]
+    middle_name = request.form.get("middle_name")
+    last_name = request.form["last_name"]
+    birthdate = request.form.get("birthdate")  # format YYYY-MM-DD
+    address = request.form.get("address")
+    contact = request.form.get("contact")
+    program_id = request.form["program_id"]
+    year_level = request.form.get("year_level") or 1
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT program_id FROM students WHERE id=%s", (id,))
+    old = cur.fetchone()
+    cur.execute("""
+        UPDATE students
+        SET student_id=%s, first_name=%s, middle_name=%s, last_name=%s,
+            birthdate=%s, address=%s, contact=%s, program_id=%s, year_level=%s
+        WHERE id=%s
+    """, (student_id, first_name, middle_name, last_name, birthdate, address, contact, program_id, year_level, id))
+    if old:
+        stats.student_moved(cur, old[0], program_id)
+    search.touch(conn, cur, "students", [id])
+    conn.commit()
+    conn.close()
+    return redirect("/admin/students")
+
+@bp.route("/admin/students/import", methods=["POST"])
+def admin_import_students():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    upload = request.files.get("file")
+    if not upload or not upload.filename:
+        return {"error": "No file uploaded"}, 400
+    if not upload.filename.lower().endswith((".csv", ".xlsx")):
+        return {"error": "Upload a .csv or .xlsx file"}, 400
+
+    # The importer spreads hashing over its own worker pool, away from the login executor
+    conn = get_db_connection()
+    report = importer.import_students(conn, upload.stream, upload.filename, passwords.hash_now)
+    if report["inserted"]:
+        notifications.publish("students_imported", "Students imported",
+                              "%d student(s) imported from %s" % (report["inserted"], upload.filename))
+    conn.close()
+    # The report carries generated passwords
+    return report, 200, {"Cache-Control": "no-store"}
+
+# STUDENTS: Delete
+@bp.route("/admin/students/delete/<int:id>")
+def admin_delete_student(id):
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT program_id, created_at FROM students WHERE id=%s", (id,))
+    student = cur.fetchone()
+    cur.execute("DELETE FROM students WHERE id=%s", (id,))
+    if student and cur.rowcount:
+        stats.student_removed(cur, student[0], student[1])
+        search.touch(conn, cur, "students", [id])
+    conn.commit()
+    if student:
+        notifications.publish("student_removed", "Student removed", "Student record #%s was deleted" % id)
+    conn.close()
+    return redirect("/admin/students")
+
+# PROFILE: view + save
+@bp.route("/admin/profile", methods=["GET","POST"])
+def admin_profile():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+
+    if request.method == "POST":
+        username = request.form["username"]
+        password = request.form.get("password")
+        # check uniqueness
+        cur.execute("SELECT id FROM users WHERE username=%s AND id!=%s", (username, session["user_id"]))
+        if cur.fetchone():
+            conn.close()
+            return "Username already exists", 400
+
+        if password:
+            hashed = passwords.hash_password(password)
+            cur.execute("UPDATE users SET username=%s, password=%s WHERE id=%s", (username, hashed, session["user_id"]))
+        else:
+            cur.execute("UPDATE users SET username=%s WHERE id=%s", (username, session["user_id"]))
+        search.touch(conn, cur, "users", [session["user_id"]])
+        conn.commit()
+        # update session username
+        session["username"] = username
+        conn.close()
+        return redirect("/admin/profile")
+
+    # GET
+    cur.execute("SELECT id, username FROM users WHERE id=%s", (session["user_id"],))
+    user = cur.fetchone()
+    conn.close()
+    return render_template("admin/profile.html", user=user)
+
+# NOTIFICATIONS: the latest 50; the page then follows /notifications/stream (SSE)
+@bp.route("/admin/notifications")
+def admin_notifications():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+    cur.execute("""
+        SELECT id, title, message AS msg, DATE_FORMAT(created_at, '%Y-%m-%d %H:%i') AS time, is_read
+        FROM notifications WHERE audience = 'admin' ORDER BY id DESC LIMIT 50
+    """)
+    items = cur.fetchall()
+    conn.close()
+    return render_template("admin/notifications.html", notifications=items)
+
+# ----------------------------------
+# ADMIN - PROGRAM CRUD
+# ----------------------------------
+@bp.route("/admin/programs")
+@pagecache.conditional("programs", role="admin")
+def admin_programs():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+    cur.execute("SELECT * FROM programs ORDER BY name")
+    programs = cur.fetchall()
+    conn.close()
+    return render_template("admin/programs.html", programs=programs)
+
+
+@bp.route("/admin/programs/add", methods=["GET","POST"])
+def admin_add_program():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    if request.method == "POST":
+        code = request.form["code"]
+        name = request.form["name"]
+
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT * FROM programs WHERE code=%s OR name=%s", (code, name))
+        if cur.fetchone():
+            conn.close()
+            return "Program code or name already exists!"
+
+        cur.execute("INSERT INTO programs (code, name) VALUES (%s, %s)", (code, name))
+        refcache.bump(cur, "programs")
+        conn.commit()
+        conn.close()
+        return redirect("/admin/programs")
+
+    return render_template("admin/programs_add.html")
+
+
+@bp.route("/admin/programs/edit/<int:id>", methods=["GET","POST"])
+def admin_edit_program(id):
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+
+    if request.method == "POST":
+        code = request.form["code"]
+        name = request.form["name"]
+
+        cur.execute("SELECT * FROM programs WHERE (code=%s OR name=%s) AND id!=%s", (code, name, id))
+        if cur.fetchone():
+            conn.close()
+            return "Program code or name already exists!"
+
+        cur.execute("UPDATE programs SET code=%s, name=%s WHERE id=%s", (code, name, id))
+        refcache.bump(cur, "programs")
+        conn.commit()
+        conn.close()
+        return redirect("/admin/programs")
+
+    cur.execute("SELECT * FROM programs WHERE id=%s", (id,))
+    program = cur.fetchone()
+    conn.close()
+    return render_template("admin/programs_edit.html", program=program)
+
+
+@bp.route("/admin/programs/delete/<int:id>")
+def admin_delete_program(id):
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM programs WHERE id=%s", (id,))
+    refcache.bump(cur, "programs")
+    conn.commit()
+    conn.close()
+    return redirect("/admin/programs")
+
+# ----------------------------------
+# ADMIN - SUBJECT CRUD
+# ----------------------------------
+@bp.route("/admin/subjects")
+@pagecache.conditional("subjects", "programs", role="admin")
+def admin_subjects():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+
+    # Fetch subjects with program names
+    cur.execute("""
+        SELECT s.*, p.name AS program_name,
+               prereq.title AS prereq_title
+        FROM subjects s
+        LEFT JOIN programs p ON s.program_id = p.id
+        LEFT JOIN subjects prereq ON s.prerequisite_id = prereq.id
+        ORDER BY s.code
+    """)
+    subjects = cur.fetchall()
+    conn.close()
+    return render_template("admin/subjects.html", subjects=subjects)
+
+
+@bp.route("/admin/subjects/add", methods=["GET","POST"])
+def admin_add_subject():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    if request.method == "POST":
+        code = request.form["code"]
+        title = request.form["title"]
+        units = request.form["units"]
+        program_id = request.form["program_id"]
+        year_level = request.form["year_level"]
+        semester = request.form["semester"]
+        prereq_id = request.form.get("prerequisite_id") or None
+
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute("INSERT INTO subjects (code, title, units, program_id, year_level, semester, prerequisite_id) VALUES (%s,%s,%s,%s,%s,%s,%s)",
+                    (code, title, units, program_id, year_level, semester, prereq_id))
+        search.touch(conn, cur, "subjects", [cur.lastrowid])
+        conn.commit()
+        conn.close()
+        return redirect("/admin/subjects")
+
+    # Programs and subjects (for the prerequisite dropdown) come from the reference cache
+    return render_template("admin/subjects_add.html", programs=refcache.programs(), all_subjects=refcache.subjects())
+
+
+@bp.route("/admin/subjects/edit/<int:id>", methods=["GET","POST"])
+def admin_edit_subject(id):
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+
+    if request.method == "POST":
+        code = request.form["code"]
+        title = request.form["title"]
+        units = request.form["units"]
+        program_id = request.form["program_id"]
+        year_level = request.form["year_level"]
+        semester = request.form["semester"]
+        prereq_id = request.form.get("prerequisite_id") or None
+
+        try:
+            prereqs.check_edge(cur, id, prereq_id)
+        except prereqs.CycleError as e:
+            conn.rollback()
+            conn.close()
+            all_subjects = [s for s in refcache.subjects() if s["id"] != id]
+            return render_template("admin/subjects_edit.html", subject=dict(request.form.to_dict(), id=id),
+                                   programs=refcache.programs(), all_subjects=all_subjects, error=str(e)), 409
+
+        cur.execute("""
+            UPDATE subjects SET code=%s, title=%s, units=%s,
+                                program_id=%s, year_level=%s, semester=%s,
+                                prerequisite_id=%s WHERE id=%s
+        """, (code, title, units, program_id, year_level, semester, prereq_id, id))
+        search.touch(conn, cur, "subjects", [id])
+        conn.commit()
+        conn.close()
+        return redirect("/admin/subjects")
+
+    cur.execute("SELECT * FROM subjects WHERE id=%s", (id,))
+    subject = cur.fetchone()
+    conn.close()
+
+    # Programs and subjects for dropdowns (a subject cannot be its own prerequisite)
+    all_subjects = [s for s in refcache.subjects() if s["id"] != id]
+    return render_template("admin/subjects_edit.html", subject=subject, programs=refcache.programs(), all_subjects=all_subjects)
+
+
+@bp.route("/admin/subjects/delete/<int:id>")
+def admin_delete_subject(id):
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM subjects WHERE id=%s", (id,))
+    search.touch(conn, cur, "subjects", [id])
+    conn.commit()
+    conn.close()
+    return redirect("/admin/subjects")
+
+# ---------------------------
+# INSTRUCTOR CRUD
+# ---------------------------
+@bp.route("/admin/instructors")
+@pagecache.conditional("instructors", role="admin")
+def admin_instructors():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+    cur.execute("SELECT * FROM instructors ORDER BY last_name, first_name")
+    instructors = cur.fetchall()
+    conn.close()
+    return render_template("admin/instructors.html", instructors=instructors)
+
+
+@bp.route("/admin/instructors/add", methods=["GET","POST"])
+def admin_add_instructor():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    if request.method=="POST":
+        first_name = request.form["first_name"]
+        middle_name = request.form.get("middle_name")
+        last_name = request.form["last_name"]
+        contact = request.form.get("contact")
+        email = request.form.get("email")
+
+        conn = get_db_connection()
+        cur = conn.cursor()
+        cur.execute(
+            "INSERT INTO instructors (first_name, middle_name, last_name, contact, email) VALUES (%s,%s,%s,%s,%s)",
+            (first_name, middle_name, last_name, contact, email)
+        )
+        search.touch(conn, cur, "instructors", [cur.lastrowid])
+        conn.commit()
+        conn.close()
+        return redirect("/admin/instructors")
+
+    return render_template("admin/instructors_add.html")
+
+
+@bp.route("/admin/instructors/edit/<int:id>", methods=["GET","POST"])
+def admin_edit_instructor(id):
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+
+    if request.method=="POST":
+        first_name = request.form["first_name"]
+        middle_name = request.form.get("middle_name")
+        last_name = request.form["last_name"]
+        contact = request.form.get("contact")
+        email = request.form.get("email")
+
+        cur.execute(
+            "UPDATE instructors SET first_name=%s, middle_name=%s, last_name=%s, contact=%s, email=%s WHERE id=%s",
+            (first_name, middle_name, last_name, contact, email, id)
+        )
+        search.touch(conn, cur, "instructors", [id])
+        conn.commit()
+        conn.close()
+        return redirect("/admin/instructors")
+
+    cur.execute("SELECT * FROM instructors WHERE id=%s", (id,))
+    instructor = cur.fetchone()
+    conn.close()
+    return render_template("admin/instructors_edit.html", instructor=instructor)
+
+
+@bp.route("/admin/instructors/delete/<int:id>")
+def admin_delete_instructor(id):
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM instructors WHERE id=%s", (id,))
+    search.touch(conn, cur, "instructors", [id])
+    conn.commit()
+    conn.close()
+    return redirect("/admin/instructors")
+
+# ---------------------------
+# CLASS SCHEDULE CRUD
+# ---------------------------
+@bp.route("/admin/class_schedules")
+@pagecache.conditional("class_schedules", "subjects", "programs", "instructors", ttl=SCHEDULE_SEATS_TTL,
+                        role="admin")
+def admin_class_schedules():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+    cur.execute("""
+        SELECT cs.*, s.title AS subject_title, p.name AS program_name,
+               i.first_name, i.last_name
+        FROM class_schedules cs
+        LEFT JOIN subjects s ON cs.subject_id = s.id
+        LEFT JOIN programs p ON s.program_id = p.id
+        LEFT JOIN instructors i ON cs.instructor_id = i.id
+        ORDER BY cs.semester, cs.day, cs.time_start
+    """)
+    schedules = cur.fetchall()
+    conn.close()
+    return render_template("admin/class_schedules.html", schedules=schedules)
+
+
+@bp.route("/admin/class_schedules/add", methods=["GET","POST"])
+def admin_add_class_schedule():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+
+    if request.method=="POST":
+        subject_id = request.form["subject_id"]
+        semester = request.form["semester"]
+        day = request.form["day"]
+        time_start = request.form["time_start"]
+        time_end = request.form["time_end"]
+        room = request.form["room"]
+        instructor_id = request.form.get("instructor_id") or None
+        section = request.form["section"]
+        capacity = request.form.get("capacity") or None
+
+        form = request.form.to_dict()
+        try:
+            # The cached index turns most clashes away without a lock; the locked
+            # re-check covers a schedule another worker saved a moment ago
+            clashes = conflicts.check(form) or conflicts.check_locked(cur, form)
+        except conflicts.InvalidTime as e:
+            conn.close()
+            return render_template("admin/class_schedules_add.html", subjects=refcache.subjects(),
+                                   instructors=refcache.instructors(), error=str(e)), 400
+        if clashes:
+            conn.rollback()
+            conn.close()
+            return render_template("admin/class_schedules_add.html", subjects=refcache.subjects(),
+                                   instructors=refcache.instructors(), error=conflicts.describe(clashes)), 409
+
+        cur.execute("""
+            INSERT INTO class_schedules (subject_id, semester, day, time_start, time_end, room, instructor_id, section, capacity)
+            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
+        """, (subject_id, semester, day, time_start, time_end, room, instructor_id, section, capacity))
+        refcache.bump(cur, "class_schedules")
+        conn.commit()
+        notifications.publish("schedule_added", "Class schedule added",
+                              "Section %s, %s %s-%s in %s" % (section, day, time_start, time_end, room))
+        conn.close()
+        return redirect("/admin/class_schedules")
+
+    conn.close()
+
+    # Subjects and instructors for dropdowns
+    return render_template("admin/class_schedules_add.html", subjects=refcache.subjects(), instructors=refcache.instructors())
+
+
+@bp.route("/admin/class_schedules/edit/<int:id>", methods=["GET","POST"])
+def admin_edit_class_schedule(id):
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+
+    if request.method=="POST":
+        subject_id = request.form["subject_id"]
+        semester = request.form["semester"]
+        day = request.form["day"]
+        time_start = request.form["time_start"]
+        time_end = request.form["time_end"]
+        room = request.form["room"]
+        instructor_id = request.form.get("instructor_id") or None
+        section = request.form["section"]
+        capacity = request.form.get("capacity") or None
+
+        form = request.form.to_dict()
+        try:
+            clashes = conflicts.check(form, exclude_id=id) or conflicts.check_locked(cur, form, exclude_id=id)
+        except conflicts.InvalidTime as e:
+            conn.close()
+            return render_template("admin/class_schedules_edit.html", schedule=dict(form, id=id),
+                                   subjects=refcache.subjects(), instructors=refcache.instructors(),
+                                   error=str(e)), 400
+        if clashes:
+            conn.rollback()
+            conn.close()
+            return render_template("admin/class_schedules_edit.html", schedule=dict(form, id=id),
+                                   subjects=refcache.subjects(), instructors=refcache.instructors(),
+                                   error=conflicts.describe(clashes)), 409
+
+        cur.execute("""
+            UPDATE class_schedules
+            SET subject_id=%s, semester=%s, day=%s, time_start=%s, time_end=%s,
+                room=%s, instructor_id=%s, section=%s, capacity=%s
+            WHERE id=%s
+        """, (subject_id, semester, day, time_start, time_end, room, instructor_id, section, capacity, id))
+        refcache.bump(cur, "class_schedules")
+        conn.commit()
+        conn.close()
+        return redirect("/admin/class_schedules")
+
+    cur.execute("SELECT * FROM class_schedules WHERE id=%s", (id,))
+    schedule = cur.fetchone()
+    conn.close()
+    # Subjects and instructors for dropdowns
+    return render_template("admin/class_schedules_edit.html", schedule=schedule, subjects=refcache.subjects(), instructors=refcache.instructors())
+
+
+@bp.route("/admin/schedules")
+def admin_schedules():
+    # The portal's old schedule pages live here now
+    return redirect("/admin/class_schedules", 301)
+
+
+@bp.route("/admin/class_schedules/delete/<int:id>")
+def admin_delete_class_schedule(id):
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM class_schedules WHERE id=%s", (id,))
+    refcache.bump(cur, "class_schedules")
+    conn.commit()
+    notifications.publish("schedule_removed", "Class schedule removed", "Class schedule #%s was deleted" % id)
+    conn.close()
+    return redirect("/admin/class_schedules")
+
+
+@bp.route("/admin/class_schedules/conflicts")
+def admin_class_schedule_conflicts():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    semester = request.args.get("semester", "")
+    found = conflicts.validate_semester(semester)
+    return {"semester": semester, "count": len(found), "conflicts": found}
+
+
+@bp.route("/admin/class_schedules/generate", methods=["POST"])
+def admin_generate_class_schedules():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    semester = request.form.get("semester") or enrollments.CURRENT_SEMESTER
+    program_id = request.form.get("program_id", type=int)
+    replace = request.form.get("replace") == "1"
+    dry_run = request.form.get("dry_run") == "1"
+
+    conn = get_db_connection()
+    solver, snapshot = timetable.load(conn.cursor(), semester, program_id, replace)
+
+    def lines():
+        # Progress as plain text lines while the solver runs, then the result
+        yield "%d class(es) to place for %s\n" % (len(solver.tasks), semester)
+        for progress in solver.run():
+            yield timetable.describe(progress) + "\n"
+        try:
+            written = 0 if dry_run else timetable.save(conn, semester, solver, snapshot)
+        except timetable.ScheduleChanged as e:
+            conn.close()
+            yield "nothing written: %s\n" % e
+            return
+        if written:
+            notifications.publish("schedules_generated", "Class schedules generated",
+                                  "%d class(es) scheduled for %s, %d could not be placed"
+                                  % (written, semester, len(solver.unplaced)), ("admin",))
+        yield "%d placed, %d unplaced, %d written\n" % (len(solver.placed), len(solver.unplaced), written)
+        for task in solver.unplaced:
+            yield "unplaced: section %s subject #%s\n" % (task["section"], task["subject_id"])
+        conn.close()
+
+    # stream_with_context keeps the request (and its pooled connection) alive until the last line
+    return Response(stream_with_context(lines()), mimetype="text/plain", headers={"X-Accel-Buffering": "no"})
+
+# ----------------------------------
+# EXPORTS (students, enrollments, class_schedules)
+# ----------------------------------
+@bp.route("/admin/export/<name>.<fmt>")
+def admin_export(name, fmt):
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+    return exports.export_response(name, fmt)
+
+# ---------------------------
+# SEARCH (typeahead)
+# ---------------------------
+@bp.route("/admin/search")
+def admin_search():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+
+    # /admin/search?q=dela cru&kind=students,instructors&limit=10 (kind defaults to all)
+    query = request.args.get("q", "").strip()
+    kinds = [k for k in request.args.get("kind", ",".join(search.KINDS)).split(",") if k]
+    unknown = [k for k in kinds if k not in search.KINDS]
+    if unknown:
+        return {"error": "unknown kind: " + ", ".join(unknown)}, 400
+    try:
+        limit = min(max(int(request.args.get("limit", search.DEFAULT_LIMIT)), 1), 50)
+    except ValueError:
+        return {"error": "limit must be a number"}, 400
+
+    return {"query": query, "results": {kind: search.search(kind, query, limit) for kind in kinds}}
+
+# ----------------------------------
+# DB POOL STATS
+# ----------------------------------
+@bp.route("/admin/db/pool")
+def admin_db_pool():
+    if session.get("role") != "admin":
+        return "Access Denied", 403
+    return db.pool_stats()
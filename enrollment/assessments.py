@@ -0,0 +1,122 @@
+import sys
+
+import enrollments
+import stats
+from db import get_db_connection
+
+# ----------------------------------
+# FEE ASSESSMENT
+# ----------------------------------
+# total_fees = units x tuition_per_unit (the program's fee_rates row, else the
+# default row) + the program's misc_fees (+ those with no program). A term is
+# assessed by one INSERT ... SELECT: units are summed per enrollment in SQL, so the
+# cost is a few joins, not a Python loop over students. Units and payments are
+# LATERAL lookups keyed on e.id, so only the selected enrollments' rows are read
+# (and share-locked), whether that is a whole term or the one being submitted.
+# assessments has one row per enrollment; re-running updates it in place and keeps
+# the balance net of what was already paid.
+_ASSESS = """
+    INSERT INTO assessments (enrollment_id, units, tuition, misc_fees, total_fees, balance)
+    SELECT t.enrollment_id, t.units, t.tuition, t.misc, t.tuition + t.misc, t.tuition + t.misc - t.paid
+    FROM (
+        SELECT e.id AS enrollment_id,
+               COALESCE(u.units, 0) AS units,
+               COALESCE(u.units, 0) * COALESCE(pr.tuition_per_unit, dr.tuition_per_unit, 0) AS tuition,
+               COALESCE(pm.misc, 0) + COALESCE(dm.misc, 0) AS misc,
+               COALESCE(paid.amount, 0) AS paid
+        FROM enrollments e
+        JOIN students s ON s.id = e.student_id
+        LEFT JOIN LATERAL (
+            SELECT SUM(subj.units) AS units
+            FROM enrollment_subjects es
+            JOIN subjects subj ON subj.id = es.subject_id
+            WHERE es.enrollment_id = e.id
+        ) u ON TRUE
+        LEFT JOIN fee_rates pr ON pr.program_id = s.program_id
+        LEFT JOIN (
+            SELECT MAX(tuition_per_unit) AS tuition_per_unit FROM fee_rates WHERE program_id IS NULL
+        ) dr ON TRUE
+        LEFT JOIN (
+            SELECT program_id, SUM(amount) AS misc FROM misc_fees
+            WHERE program_id IS NOT NULL GROUP BY program_id
+        ) pm ON pm.program_id = s.program_id
+        LEFT JOIN (
+            SELECT SUM(amount) AS misc FROM misc_fees WHERE program_id IS NULL
+        ) dm ON TRUE
+        LEFT JOIN LATERAL (
+            SELECT SUM(p.amount) AS amount
+            FROM assessments a
+            JOIN payments p ON p.assessment_id = a.id
+            WHERE a.enrollment_id = e.id
+        ) paid ON TRUE
+        WHERE e.status <> 'rejected' AND {where}
+    ) t
+    ON DUPLICATE KEY UPDATE
+        units = t.units,
+        tuition = t.tuition,
+        misc_fees = t.misc,
+        total_fees = t.tuition + t.misc,
+        balance = t.tuition + t.misc - t.paid
+"""
+
+
+def _balances(cur, where, params, lock=False):
+    # {program_id: summed balance}
+    cur.execute(f"""
+        SELECT s.program_id, SUM(a.balance)
+        FROM assessments a
+        JOIN enrollments e ON e.id = a.enrollment_id
+        JOIN students s ON s.id = e.student_id
+        WHERE {where}
+        GROUP BY s.program_id
+        {"FOR UPDATE" if lock else ""}
+    """, params)
+    return dict(cur.fetchall())
+
+
+def _assess(cur, where, params, before):
+    # Recompute; returns (rows written, {program_id: change in outstanding balance}).
+    # The rows just written are locked by this transaction, so reading them back
+    # needs no FOR UPDATE.
+    cur.execute(_ASSESS.format(where=where), params)
+    changed = cur.rowcount
+    after = _balances(cur, where, params)
+    deltas = {program_id: (after.get(program_id) or 0) - (before.get(program_id) or 0)
+              for program_id in before.keys() | after.keys()}
+    return changed, {program_id: delta for program_id, delta in deltas.items() if delta}
+
+
+def assess_term(conn, semester, school_year):
+    # Every enrollment of the term, in one statement and one transaction; the old
+    # balances are locked first so payments wait for the recompute
+    cur = conn.cursor()
+    where, params = "e.semester = %s AND e.school_year = %s", (semester, school_year)
+    changed, deltas = _assess(cur, where, params, _balances(cur, where, params, lock=True))
+    for program_id, delta in deltas.items():
+        stats.balance_changed(cur, program_id, delta)
+    conn.commit()
+    return changed
+
+
+def assess_enrollment(cur, enrollment_id):
+    # A new enrollment, inside the transaction that created it: there is no earlier
+    # assessment, so nothing is read or locked before the INSERT. Returns
+    # {program_id: balance added}; the caller passes it to stats.balance_changed as
+    # the last thing before commit (see enrollments.submit).
+    return _assess(cur, "e.id = %s", (enrollment_id,), {})[1]
+
+
+def outstanding(cur, enrollment_ids):
+    # {program_id: balance} of these enrollments, locked (e.g. before rejecting them)
+    if not enrollment_ids:
+        return {}
+    placeholders = ",".join(["%s"] * len(enrollment_ids))
+    return _balances(cur, f"e.id IN ({placeholders})", list(enrollment_ids), lock=True)
+
+
+if __name__ == "__main__":
+    semester = sys.argv[1] if len(sys.argv) > 1 else enrollments.CURRENT_SEMESTER
+    school_year = sys.argv[2] if len(sys.argv) > 2 else enrollments.CURRENT_SCHOOL_YEAR
+    conn = get_db_connection()
+    print("%d assessment row(s) written for %s %s" % (assess_term(conn, semester, school_year), semester, school_year))
+    conn.close()
@@ -0,0 +1,85 @@
+from flask import Blueprint, current_app, render_template, request, redirect, session
+import db
+import passwords
+from db import get_db_connection
+
+# Shared landing page, login and logout for every surface
+bp = Blueprint("auth", __name__)
+
+# Roles each surface signs in, and where each role lands after login
+SURFACE_ROLES = {
+    "admin": {"admin"},
+    "portal": {"registrar", "cashier", "student"},
+    "both": {"admin", "registrar", "cashier", "student"},
+}
+ROLE_HOME = {
+    "admin": "/admin/dashboard",
+    "registrar": "/registrar/dashboard",
+    "cashier": "/cashier/dashboard",
+    "student": "/student/dashboard",
+}
+# One unique-key lookup per login attempt (migrate.py check EXPLAINs it)
+LOGIN_USER = "SELECT id, username, password, role FROM users WHERE username = %s"
+
+
+def _surface():
+    return current_app.config["APP_SURFACE"]
+
+
+# ----------------------------------
+# INDEX (Choose Role)
+# ----------------------------------
+@bp.route("/")
+def index():
+    return render_template("landing.html" if _surface() == "admin" else "index.html")
+
+# ----------------------------------
+# LOGIN
+# ----------------------------------
+@bp.route("/login", methods=["GET", "POST"])
+def login():
+    if request.method == "POST":
+        username = request.form["username"]
+        password = request.form["password"]
+
+        conn = get_db_connection()
+        cur = conn.cursor(dictionary=True)
+        cur.execute(LOGIN_USER, (username,))
+        user = cur.fetchone()
+        # Give the pooled connection back while bcrypt runs
+        db.close_db_connection()
+
+        if user and passwords.check_password(user["password"], password):
+            if user["role"] not in SURFACE_ROLES[_surface()]:
+                return "Access Denied", 403
+
+            conn = get_db_connection()
+            cur = conn.cursor(dictionary=True)
+            if passwords.rehash_if_needed(cur, user["id"], user["password"], password):
+                conn.commit()
+
+            session["role"] = user["role"]
+            session["username"] = user["username"]
+            session["user_id"] = user["id"]
+
+            # If student, fetch the linked student_id
+            if user["role"] == "student":
+                cur.execute("SELECT id FROM students WHERE user_id = %s", (user["id"],))
+                student = cur.fetchone()
+                if student:
+                    session["student_id"] = student["id"]
+
+            conn.close()
+            return redirect(ROLE_HOME[user["role"]])
+
+        return "Invalid username or password"
+
+    return render_template("admin/login.html" if _surface() == "admin" else "login.html")
+
+# ----------------------------------
+# LOGOUT
+# ----------------------------------
+@bp.route("/logout")
+def logout():
+    session.clear()
+    return redirect("/")
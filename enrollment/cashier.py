@@ -0,0 +1,271 @@
+import os
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+import mysql.connector
+from mysql.connector import errorcode
+
+import enrollments
+import stats
+from importer import read_rows
+
+# ----------------------------------
+# PAYMENTS
+# ----------------------------------
+# A payment is one conditional UPDATE of assessments.balance (it cannot take the
+# balance below zero) plus the payments row, in one transaction with the
+# collection counters (stats.payment_posted). The dashboard reads only counters
+# and the newest payments, so its cost does not grow with the payments table.
+BATCH_SIZE = int(os.environ.get("PAYMENT_BATCH_SIZE", "500"))
+RECENT_PAYMENTS = 10
+
+
+class PaymentError(Exception):
+    pass
+
+
+class DuplicatePayment(PaymentError):
+    pass
+
+
+def parse_amount(value):
+    try:
+        amount = Decimal(str(value).replace(",", "").strip()).quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError):
+        raise PaymentError("Invalid amount %r" % (value,))
+    if amount <= 0:
+        raise PaymentError("Amount must be greater than zero")
+    return amount
+
+
+def parse_day(value):
+    if value in (None, ""):
+        return date.today()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value).strip())
+    except ValueError:
+        raise PaymentError("date_paid must be YYYY-MM-DD")
+
+
+def _apply(cur, assessment_id, amount):
+    # Atomic: the balance check and the decrement are one statement
+    cur.execute("""
+        UPDATE assessments SET balance = balance - %s
+        WHERE id = %s AND balance >= %s
+    """, (amount, assessment_id, amount))
+    return cur.rowcount == 1
+
+
+def _programs(cur, assessment_ids):
+    placeholders = ",".join(["%s"] * len(assessment_ids))
+    cur.execute(f"""
+        SELECT a.id, s.program_id
+        FROM assessments a
+        JOIN enrollments e ON e.id = a.enrollment_id
+        JOIN students s ON s.id = e.student_id
+        WHERE a.id IN ({placeholders})
+    """, list(assessment_ids))
+    return dict(cur.fetchall())
+
+
+def post_payment(conn, assessment_id, amount, date_paid=None, reference=None, posted_by=None):
+    # Returns the new payment id
+    amount = parse_amount(amount)
+    day = parse_day(date_paid)
+    reference = (reference or "").strip() or None
+    cur = conn.cursor()
+
+    programs = _programs(cur, [assessment_id])
+    if assessment_id not in programs:
+        raise PaymentError("Unknown assessment %s" % assessment_id)
+
+    try:
+        if not _apply(cur, assessment_id, amount):
+            conn.rollback()
+            raise PaymentError("Amount exceeds the outstanding balance")
+        cur.execute("""
+            INSERT INTO payments (assessment_id, amount, date_paid, reference, posted_by)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (assessment_id, amount, day, reference, posted_by))
+        payment_id = cur.lastrowid
+        stats.payment_posted(cur, programs[assessment_id], amount, day)
+        conn.commit()
+    except mysql.connector.IntegrityError as e:
+        conn.rollback()
+        if e.errno != errorcode.ER_DUP_ENTRY:
+            raise
+        raise DuplicatePayment("Reference %s was already posted" % reference)
+
+    return payment_id
+
+
+# ----------------------------------
+# BANK FILE (CSV / XLSX) RECONCILIATION
+# ----------------------------------
+# Columns: reference, amount, date_paid and either assessment_id or student_id (the
+# student number, matched to that student's assessment for the term). Lines are
+# posted BATCH_SIZE at a time, one transaction per chunk; a reference already in
+# payments (or earlier in the file) is reported, never posted twice.
+def _clean_line(raw):
+    reference = str(raw.get("reference") or "").strip()
+    if not reference:
+        raise PaymentError("missing reference")
+    line = {"reference": reference, "amount": parse_amount(raw.get("amount")),
+            "date_paid": parse_day(raw.get("date_paid")),
+            "assessment_id": None, "student_id": None}
+    if raw.get("assessment_id") not in (None, ""):
+        try:
+            line["assessment_id"] = int(raw["assessment_id"])
+        except (TypeError, ValueError):
+            raise PaymentError("assessment_id must be a number")
+    elif raw.get("student_id") not in (None, ""):
+        line["student_id"] = str(raw["student_id"]).strip()
+    else:
+        raise PaymentError("missing assessment_id or student_id")
+    return line
+
+
+def _flush(conn, cur, pending, semester, school_year, seen, posted_by, report):
+    student_numbers = {line["student_id"] for _, line in pending if line["student_id"]}
+    by_student = {}
+    if student_numbers:
+        placeholders = ",".join(["%s"] * len(student_numbers))
+        cur.execute(f"""
+            SELECT st.student_id, a.id
+            FROM students st
+            JOIN enrollments e ON e.student_id = st.id AND e.semester = %s AND e.school_year = %s
+            JOIN assessments a ON a.enrollment_id = e.id
+            WHERE st.student_id IN ({placeholders})
+        """, [semester, school_year] + list(student_numbers))
+        by_student = {str(number).lower(): aid for number, aid in cur.fetchall()}
+    for _, line in pending:
+        if line["student_id"]:
+            line["assessment_id"] = by_student.get(line["student_id"].lower())
+
+    references = [line["reference"] for _, line in pending]
+    placeholders = ",".join(["%s"] * len(references))
+    cur.execute(f"SELECT reference FROM payments WHERE reference IN ({placeholders})", references)
+    taken = {str(r[0]).lower() for r in cur.fetchall()}
+    assessment_ids = {line["assessment_id"] for _, line in pending if line["assessment_id"]}
+    programs = _programs(cur, assessment_ids) if assessment_ids else {}
+
+    posted = []
+    totals = defaultdict(lambda: [Decimal("0.00"), 0])
+    for number, line in pending:
+        key = line["reference"].lower()
+        if key in taken or key in seen:
+            report["errors"].append({"row": number, "error": "reference %s already posted" % line["reference"]})
+        elif line["assessment_id"] not in programs:
+            report["errors"].append({"row": number, "error": "no assessment for this line in %s %s" % (semester, school_year)})
+        elif not _apply(cur, line["assessment_id"], line["amount"]):
+            report["errors"].append({"row": number, "error": "amount exceeds the outstanding balance"})
+        else:
+            seen.add(key)
+            posted.append((number, line))
+            total = totals[(programs[line["assessment_id"]], line["date_paid"])]
+            total[0] += line["amount"]
+            total[1] += 1
+
+    if not posted:
+        conn.rollback()
+        return
+    try:
+        cur.executemany("""
+            INSERT INTO payments (assessment_id, amount, date_paid, reference, posted_by)
+            VALUES (%s, %s, %s, %s, %s)
+        """, [(line["assessment_id"], line["amount"], line["date_paid"], line["reference"], posted_by)
+              for _, line in posted])
+        for (program_id, day), (amount, count) in totals.items():
+            stats.payment_posted(cur, program_id, amount, day, count)
+        conn.commit()
+        report["posted"] += len(posted)
+        report["amount"] += sum(line["amount"] for _, line in posted)
+    except mysql.connector.Error as e:
+        # A reference was posted concurrently; nothing in this chunk is applied
+        conn.rollback()
+        for number, _ in posted:
+            report["errors"].append({"row": number, "error": "batch failed: %s" % e.msg})
+
+
+def post_batch(conn, fileobj, filename, semester=None, school_year=None, posted_by=None):
+    semester = semester or enrollments.CURRENT_SEMESTER
+    school_year = school_year or enrollments.CURRENT_SCHOOL_YEAR
+    report = {"rows": 0, "posted": 0, "amount": Decimal("0.00"), "errors": []}
+
+    cur = conn.cursor()
+    seen = set()
+    pending = []
+    for number, raw in read_rows(fileobj, filename):
+        report["rows"] += 1
+        try:
+            line = _clean_line(raw)
+        except PaymentError as e:
+            report["errors"].append({"row": number, "error": str(e)})
+            continue
+        pending.append((number, line))
+        if len(pending) >= BATCH_SIZE:
+            _flush(conn, cur, pending, semester, school_year, seen, posted_by, report)
+            pending = []
+    if pending:
+        _flush(conn, cur, pending, semester, school_year, seen, posted_by, report)
+
+    report["amount"] = str(report["amount"])
+    return report
+
+
+# ----------------------------------
+# DASHBOARD
+# ----------------------------------
+def dashboard(cur):
+    # Counter rows for this month plus the all-time per-program rows: bounded by the
+    # number of days and programs, not by payments
+    month_start = date.today().replace(day=1).isoformat()
+    cur.execute("""
+        SELECT c.name, c.`key`, CAST(SUM(c.value) AS SIGNED) AS value, p.name AS program_name
+        FROM stat_counters c
+        LEFT JOIN programs p ON c.name IN ('outstanding_by_program', 'collections_by_program') AND p.id = c.`key`
+        WHERE c.name IN ('outstanding_by_program', 'collections_by_program')
+           OR (c.name IN ('collections_by_day', 'payments_by_day') AND c.`key` >= %s)
+        GROUP BY c.name, c.`key`, p.name
+    """, (month_start,))
+    counters = defaultdict(dict)
+    program_names = {}
+    for row in cur.fetchall():
+        counters[row["name"]][row["key"]] = row["value"]
+        if row["name"].endswith("_by_program"):
+            program_names[row["key"]] = row["program_name"] or "No program"
+
+    today = date.today().isoformat()
+    by_day = counters["collections_by_day"]
+    outstanding = counters["outstanding_by_program"]
+    collected = counters["collections_by_program"]
+    programs = [
+        {"program": program_names[key],
+         "collected": Decimal(collected.get(key, 0)) / 100,
+         "outstanding": Decimal(outstanding.get(key, 0)) / 100}
+        for key in sorted(program_names, key=lambda k: program_names[k])
+    ]
+
+    cur.execute("""
+        SELECT p.id, p.reference, p.amount, p.date_paid, s.student_id, s.first_name, s.last_name
+        FROM payments p
+        JOIN assessments a ON a.id = p.assessment_id
+        JOIN enrollments e ON e.id = a.enrollment_id
+        JOIN students s ON s.id = e.student_id
+        ORDER BY p.id DESC
+        LIMIT %s
+    """, (RECENT_PAYMENTS,))
+
+    return {
+        "collected_today": Decimal(by_day.get(today, 0)) / 100,
+        "payments_today": counters["payments_by_day"].get(today, 0),
+        "collected_this_month": Decimal(sum(by_day.values())) / 100,
+        "outstanding": Decimal(sum(outstanding.values())) / 100,
+        "programs": programs,
+        "recent_payments": cur.fetchall(),
+    }
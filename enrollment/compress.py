@@ -0,0 +1,136 @@
+import gzip
+import mimetypes
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# ----------------------------------
+# RESPONSE COMPRESSION
+# ----------------------------------
+# HTML, JSON and CSV responses of at least MIN_SIZE bytes are compressed with the
+# best encoding the client accepts (br, then gzip). Streamed responses (exports)
+# are compressed chunk by chunk. Responses with an ETag keep their compressed bytes
+# in a small LRU, so a page served from pagecache is not compressed again; the ETag
+# is made weak, as the bytes on the wire now depend on the encoding.
+#
+# Static files are compressed ahead of time (python precompress.py); the static
+# route sends the .br / .gz sibling when there is one.
+MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", "1024"))
+BROTLI_QUALITY = int(os.environ.get("COMPRESS_BROTLI_QUALITY", "5"))
+GZIP_LEVEL = int(os.environ.get("COMPRESS_GZIP_LEVEL", "6"))
+ENCODED_CACHE_SIZE = int(os.environ.get("COMPRESS_CACHE_SIZE", "128"))
+MIMETYPES = {"text/html", "application/json", "text/csv", "text/plain"}
+
+_lock = threading.Lock()
+_encoded = OrderedDict()  # (etag, encoding) -> bytes
+
+
+def encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encodings):
+    # accept_encodings: request.accept_encodings (quality-sorted)
+    for encoding in encodings():
+        if accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _stream(chunks, encoding):
+    # Flush after every chunk so each piece reaches the client as it is produced
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        for chunk in chunks:
+            data = compressor.process(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+            yield data + compressor.flush()
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+            yield data + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+def _cached(etag, encoding, data):
+    if etag is None:
+        return compress(data, encoding)
+    key = (etag, encoding)
+    with _lock:
+        body = _encoded.get(key)
+        if body is not None:
+            _encoded.move_to_end(key)
+            return body
+    body = compress(data, encoding)
+    with _lock:
+        _encoded[key] = body
+        while len(_encoded) > ENCODED_CACHE_SIZE:
+            _encoded.popitem(last=False)
+    return body
+
+
+def compress_response(response):
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.mimetype not in MIMETYPES
+            or "Content-Encoding" in response.headers
+            or response.direct_passthrough):
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _stream(response.response, encoding)
+        response.headers.pop("Content-Length", None)
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    data = response.get_data()
+    if len(data) < MIN_SIZE:
+        return response
+    etag, weak = response.get_etag()
+    response.set_data(_cached(etag, encoding, data))
+    response.headers["Content-Encoding"] = encoding
+    if etag is not None and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    app.after_request(compress_response)
+
+    static = app.view_functions.get("static")
+    if static is None:
+        return
+
+    def static_precompressed(filename):
+        # Prefer the build step's .br / .gz file when the client accepts it
+        encoding = negotiate(request.accept_encodings)
+        suffix = {"br": ".br", "gzip": ".gz"}.get(encoding)
+        if suffix and os.path.isfile(os.path.join(app.static_folder, filename + suffix)):
+            response = send_from_directory(app.static_folder, filename + suffix)
+            response.mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            response.headers["Content-Encoding"] = encoding
+            response.vary.add("Accept-Encoding")
+            return response
+        response = static(filename=filename)
+        response.vary.add("Accept-Encoding")
+        return response
+
+    app.view_functions["static"] = static_precompressed
@@ -0,0 +1,208 @@
+import bisect
+import re
+import threading
+from datetime import time as dtime, timedelta
+
+import refcache
+from db import get_db_connection
+
+# ----------------------------------
+# SCHEDULE CONFLICTS (rooms, instructors, sections)
+# ----------------------------------
+# For each semester we keep one interval index per (day, room), (day, instructor) and
+# (day, section). An index is a list of (start, end, schedule_id) sorted by start,
+# plus the longest interval it holds: anything overlapping [start, end) must begin
+# in (start - longest, end), so a check is two bisects plus the hits. The indexes
+# are built from one `WHERE semester = %s` query and rebuilt when the
+# `class_schedules` version in table_versions moves (see refcache). The index can lag
+# another worker's write by a moment, so a writer confirms with check_locked() inside
+# its own transaction before saving.
+KINDS = ("room", "instructor", "section")
+SEMESTER_SCHEDULES = "SELECT * FROM class_schedules WHERE semester = %s"
+_TIME = re.compile(r"^(\d{1,2}):(\d{2})(?::(\d{2}))?$")
+
+_lock = threading.Lock()
+_indexes = {}  # semester -> (version, {(kind, day, value): _Index}, {schedule_id: row})
+
+
+class InvalidTime(ValueError):
+    pass
+
+
+def minutes(value):
+    # MySQL TIME comes back as timedelta; forms post "HH:MM" or "HH:MM:SS"
+    if value is None or value == "":
+        return None
+    if isinstance(value, timedelta):
+        return int(value.total_seconds()) // 60
+    if isinstance(value, dtime):
+        return value.hour * 60 + value.minute
+    match = _TIME.match(str(value).strip())
+    if not match or int(match.group(1)) > 23 or int(match.group(2)) > 59:
+        raise InvalidTime("Invalid time %r, use HH:MM (24-hour)" % str(value))
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+
+def _span(row):
+    # (start, end) of a schedule being saved, (None, None) if it has no times yet
+    start, end = minutes(row.get("time_start")), minutes(row.get("time_end"))
+    if start is None or end is None:
+        return None, None
+    if end <= start:
+        raise InvalidTime("time_end must be after time_start")
+    return start, end
+
+
+def _norm(value):
+    return " ".join(str(value).split()).lower() if value not in (None, "") else None
+
+
+def keys_for(row):
+    # Instructor is an id in the admin app and free text in the portal forms
+    day = _norm(row.get("day"))
+    instructor = _norm(row.get("instructor_id") or row.get("instructor"))
+    values = {"room": _norm(row.get("room")), "instructor": instructor, "section": _norm(row.get("section"))}
+    return [(kind, day, values[kind]) for kind in KINDS if values[kind] is not None]
+
+
+class _Index:
+    __slots__ = ("starts", "items", "longest")
+
+    def __init__(self):
+        self.starts = []
+        self.items = []
+        self.longest = 0
+
+    def add(self, start, end, schedule_id):
+        i = bisect.bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.items.insert(i, (start, end, schedule_id))
+        self.longest = max(self.longest, end - start)
+
+    def overlapping(self, start, end):
+        lo = bisect.bisect_right(self.starts, start - self.longest)
+        hi = bisect.bisect_left(self.starts, end)
+        return [item for item in self.items[lo:hi] if item[1] > start]
+
+
+def _load(semester):
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+    cur.execute(SEMESTER_SCHEDULES, (semester,))
+    rows = cur.fetchall()
+    conn.close()
+
+    index = {}
+    by_id = {}
+    for row in rows:
+        start, end = minutes(row["time_start"]), minutes(row["time_end"])
+        if start is None or end is None or end <= start:
+            continue
+        by_id[row["id"]] = row
+        for key in keys_for(row):
+            index.setdefault(key, _Index()).add(start, end, row["id"])
+    return index, by_id
+
+
+def semester_index(semester):
+    version = refcache.versions().get("class_schedules", 0)
+    with _lock:
+        entry = _indexes.get(semester)
+    if entry and entry[0] == version:
+        return entry[1], entry[2]
+
+    index, by_id = _load(semester)
+    with _lock:
+        _indexes[semester] = (version, index, by_id)
+    return index, by_id
+
+
+def _conflict(kind, row, other):
+    return {
+        "kind": kind,
+        "schedule_id": row.get("id"),
+        "other_id": other["id"],
+        "day": other["day"],
+        "time_start": str(other["time_start"]),
+        "time_end": str(other["time_end"]),
+        "room": other.get("room"),
+        "section": other.get("section"),
+    }
+
+
+def check(row, exclude_id=None):
+    # `row` is a schedule about to be saved (form values); returns its conflicts.
+    # Raises InvalidTime for times the form should not have let through
+    start, end = _span(row)
+    if start is None:
+        return []
+    index, by_id = semester_index(row.get("semester"))
+    found = []
+    for key in keys_for(row):
+        bucket = index.get(key)
+        if bucket is None:
+            continue
+        for _, _, other_id in bucket.overlapping(start, end):
+            if other_id != exclude_id:
+                found.append(_conflict(key[0], row, by_id[other_id]))
+    return found
+
+
+def check_locked(cur, row, exclude_id=None):
+    # check() against the rows themselves, read FOR UPDATE on the writer's dictionary
+    # cursor. idx_schedules_time (semester, day, time_start) covers the scan, so the
+    # day's rows and the gaps between them stay locked until the writer commits and
+    # a concurrent add or move into that day waits for it.
+    start, end = _span(row)
+    if start is None:
+        return []
+    cur.execute("SELECT * FROM class_schedules WHERE semester = %s AND day = %s FOR UPDATE",
+                (row.get("semester"), row.get("day")))
+    keys = set(keys_for(row))
+    found = []
+    for other in cur.fetchall():
+        other_start, other_end = minutes(other["time_start"]), minutes(other["time_end"])
+        if other["id"] == exclude_id or other_start is None or other_end is None:
+            continue
+        if other_start < end and start < other_end:
+            found.extend(_conflict(key[0], row, other) for key in keys_for(other) if key in keys)
+    return found
+
+
+def describe(found):
+    return "; ".join(
+        "%s clash with schedule #%s (%s %s-%s)" % (c["kind"], c["other_id"], c["day"], c["time_start"], c["time_end"])
+        for c in found
+    )
+
+
+def _sweep(rows):
+    # rows share one key; yields overlapping pairs in start order
+    rows = sorted(rows, key=lambda r: (minutes(r["time_start"]), minutes(r["time_end"])))
+    active = []
+    for row in rows:
+        start = minutes(row["time_start"])
+        active = [a for a in active if minutes(a["time_end"]) > start]
+        for other in active:
+            yield other, row
+        active.append(row)
+
+
+def overlaps_within(rows):
+    # Conflicts among a set of schedules, e.g. the subjects one student picked
+    by_day = {}
+    for row in rows:
+        if minutes(row.get("time_start")) is None or minutes(row.get("time_end")) is None:
+            continue
+        by_day.setdefault(_norm(row.get("day")), []).append(row)
+    return [_conflict("time", a, b) for day_rows in by_day.values() for a, b in _sweep(day_rows)]
+
+
+def validate_semester(semester):
+    # One pass over the semester's index: every overlapping pair, per room/instructor/section
+    index, by_id = semester_index(semester)
+    found = []
+    for (kind, _, _), bucket in index.items():
+        rows = [by_id[schedule_id] for _, _, schedule_id in bucket.items]
+        found.extend(_conflict(kind, a, b) for a, b in _sweep(rows))
+    return found
@@ -1,9 +1,239 @@
+import os
+import queue
+import threading
+import time
+import logging
+
 import mysql.connector
+from flask import g, has_app_context
+
+log = logging.getLogger(__name__)
+
+# ----------------------------------
+# SETTINGS (override with environment variables)
+# ----------------------------------
+DB_CONFIG = {
+    "host": os.environ.get("DB_HOST", "localhost"),
+    "port": int(os.environ.get("DB_PORT", "3306")),
+    "user": os.environ.get("DB_USER", "root"),
+    "password": os.environ.get("DB_PASSWORD", "admin"),
+    "database": os.environ.get("DB_NAME", "enrollment"),
+}
+
+POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "10"))          # connections kept per worker
+POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "2.0"))  # seconds to wait for a free connection
+POOL_OVERFLOW = int(os.environ.get("DB_POOL_OVERFLOW", "5"))    # extra unpooled connections when exhausted
+POOL_RECYCLE = float(os.environ.get("DB_POOL_RECYCLE", "300"))  # ping connections idle longer than this
+POOL_SLOW_WAIT = float(os.environ.get("DB_POOL_SLOW_WAIT", "0.1"))
+
+
+class PoolExhausted(Exception):
+    pass
+
+
+# ----------------------------------
+# CONNECTION POOL
+# ----------------------------------
+class ConnectionPool:
+    def __init__(self, size, timeout, overflow, recycle, **connect_args):
+        self.size = size
+        self.timeout = timeout
+        self.overflow = overflow
+        self.recycle = recycle
+        self.connect_args = connect_args
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._overflow_in_use = 0
+
+        self.stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "overflow_checkouts": 0,
+            "exhausted": 0,
+            "connects": 0,
+            "reconnects": 0,
+        }
+
+    def _connect(self):
+        with self._lock:
+            self.stats["connects"] += 1
+        return mysql.connector.connect(**self.connect_args)
+
+    def acquire(self):
+        start = time.monotonic()
+        got_slot = self._slots.acquire(blocking=False)
+        if not got_slot:
+            got_slot = self._slots.acquire(timeout=self.timeout)
+            waited = time.monotonic() - start
+            with self._lock:
+                self.stats["waits"] += 1
+                self.stats["wait_seconds_total"] += waited
+                self.stats["wait_seconds_max"] = max(self.stats["wait_seconds_max"], waited)
+            if waited >= POOL_SLOW_WAIT:
+                log.warning("waited %.3fs for a pooled DB connection", waited)
+
+        if not got_slot:
+            # Pool exhausted: hand out a short-lived direct connection, bounded by POOL_OVERFLOW
+            with self._lock:
+                if self._overflow_in_use >= self.overflow:
+                    self.stats["exhausted"] += 1
+                    raise PoolExhausted("database connection pool exhausted")
+                self._overflow_in_use += 1
+                self.stats["overflow_checkouts"] += 1
+            try:
+                return self._connect(), False
+            except Exception:
+                with self._lock:
+                    self._overflow_in_use -= 1
+                raise
+
+        try:
+            conn, idle_since = self._idle.get_nowait()
+        except queue.Empty:
+            conn, idle_since = None, None
+
+        try:
+            if conn is None:
+                conn = self._connect()
+            elif time.monotonic() - idle_since > self.recycle:
+                conn.ping(reconnect=True, attempts=1)
+                with self._lock:
+                    self.stats["reconnects"] += 1
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.stats["checkouts"] += 1
+        return conn, True
+
+    def release(self, conn, pooled):
+        if not pooled:
+            with self._lock:
+                self._overflow_in_use -= 1
+            try:
+                conn.close()
+            except Exception:
+                pass
+            return
+
+        try:
+            # Drop anything the request left uncommitted before the next checkout
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put((conn, time.monotonic()))
+        except Exception:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        finally:
+            self._slots.release()
+
+    def snapshot(self):
+        with self._lock:
+            data = dict(self.stats)
+            data["overflow_in_use"] = self._overflow_in_use
+        data["size"] = self.size
+        data["idle"] = self._idle.qsize()
+        return data
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    # One pool per worker process; a forked worker must not reuse its parent's sockets
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                _pool = ConnectionPool(POOL_SIZE, POOL_TIMEOUT, POOL_OVERFLOW, POOL_RECYCLE, **DB_CONFIG)
+                _pool_pid = pid
+    return _pool
+
+
+def pool_stats():
+    return get_pool().snapshot()
+
+
+# ----------------------------------
+# CONNECTIONS
+# ----------------------------------
+class PooledConnection:
+    # Wraps a checked-out connection. close() returns it to the pool; inside a request
+    # the connection is shared and close() is deferred until app teardown.
+    # after_commit() callbacks run once commit() succeeds; a rollback or release drops them.
+
+    def __init__(self, pool, conn, pooled, request_scoped=False):
+        self._pool = pool
+        self._conn = conn
+        self._pooled = pooled
+        self._request_scoped = request_scoped
+        self._after_commit = []
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        cur = self._conn.cursor(*args, **kwargs)
+        # querystats puts a per-request recorder on g; outside a request cursors are bare
+        recorder = g.get("query_stats") if has_app_context() else None
+        return recorder.wrap(cur) if recorder is not None else cur
+
+    def after_commit(self, fn):
+        self._after_commit.append(fn)
+
+    def commit(self):
+        self._conn.commit()
+        callbacks, self._after_commit = self._after_commit, []
+        for fn in callbacks:
+            fn()
+
+    def rollback(self):
+        self._after_commit = []
+        self._conn.rollback()
+
+    def close(self):
+        if not self._request_scoped:
+            self.release()
+
+    def release(self):
+        self._after_commit = []
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.release(conn, self._pooled)
+
 
 def get_db_connection():
-    return mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="admin",
-        database="enrollment"
-    )
+    if has_app_context():
+        if "db_conn" not in g:
+            pool = get_pool()
+            conn, pooled = pool.acquire()
+            g.db_conn = PooledConnection(pool, conn, pooled, request_scoped=True)
+        return g.db_conn
+
+    pool = get_pool()
+    conn, pooled = pool.acquire()
+    return PooledConnection(pool, conn, pooled)
+
+
+def close_db_connection(exc=None):
+    conn = g.pop("db_conn", None)
+    if conn is not None:
+        conn.release()
+
+
+def init_app(app):
+    app.teardown_appcontext(close_db_connection)
+
+    @app.errorhandler(PoolExhausted)
+    def pool_exhausted(exc):
+        return "Server busy, please try again", 503, {"Retry-After": "1"}
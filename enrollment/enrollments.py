@@ -0,0 +1,299 @@
+import os
+
+import mysql.connector
+from mysql.connector import errorcode
+
+import assessments
+import conflicts
+import prereqs
+import stats
+from db import get_db_connection
+
+# ----------------------------------
+# ENROLLMENT SUBMISSION
+# ----------------------------------
+# A student has at most one enrollment per term: (student_id, semester, school_year)
+# is unique in `enrollments`, so that triple doubles as the idempotency key. A retried
+# or double-clicked submit finds the existing row and gets it back instead of a copy.
+#
+# Seats: each class_schedules row carries `capacity` (NULL = unlimited) and
+# `enrolled_count`. A seat is taken with one conditional UPDATE that only succeeds
+# while enrolled_count < capacity; there is no SELECT ... FOR UPDATE, and the hot
+# schedule rows are touched last so their locks are held only until the commit.
+CURRENT_SEMESTER = os.environ.get("CURRENT_SEMESTER", "1st")
+CURRENT_SCHOOL_YEAR = os.environ.get("CURRENT_SCHOOL_YEAR", "2025-2026")
+DECISION_CHUNK = int(os.environ.get("REGISTRAR_BATCH_SIZE", "500"))
+DECISIONS = {"approve": "approved", "reject": "rejected"}
+
+
+class EnrollmentError(Exception):
+    pass
+
+
+class SectionFull(EnrollmentError):
+    pass
+
+
+def current_term(form=None):
+    form = form or {}
+    return (form.get("semester") or CURRENT_SEMESTER,
+            form.get("school_year") or CURRENT_SCHOOL_YEAR)
+
+
+def find_existing(cur, student_id, semester, school_year):
+    cur.execute("""
+        SELECT id FROM enrollments
+        WHERE student_id = %s AND semester = %s AND school_year = %s
+    """, (student_id, semester, school_year))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+# What a section offers in a semester, as the student enroll page and the student
+# API show it (params: section, semester; run it on a dictionary cursor).
+# decorate_offerings() adds eligibility and seats.
+SECTION_OFFERINGS = """
+    SELECT cs.id AS schedule_id, s.id AS subject_id,
+           s.code, s.title, s.units, s.prerequisite_id,
+           cs.day, cs.time_start, cs.time_end, cs.room,
+           cs.instructor_id, CONCAT(i.first_name, ' ', i.last_name) AS instructor,
+           cs.capacity, cs.enrolled_count
+    FROM class_schedules cs
+    JOIN subjects s ON cs.subject_id = s.id
+    LEFT JOIN instructors i ON cs.instructor_id = i.id
+    WHERE cs.section = %s AND cs.semester = %s
+"""
+# The picked subjects' classes in that section and semester ({placeholders}: one
+# %s per subject id)
+SELECTED_SCHEDULES = """
+    SELECT cs.id, cs.subject_id, cs.day, cs.time_start, cs.time_end
+    FROM class_schedules cs
+    WHERE cs.section = %s AND cs.semester = %s AND cs.subject_id IN ({placeholders})
+"""
+
+
+def decorate_offerings(subjects, completed):
+    # Marks each SECTION_OFFERINGS row with the prerequisites still missing, whether
+    # it is blocked, and the seats left. Raises prereqs.CycleError like prereqs.missing
+    needs = prereqs.missing({subj["subject_id"] for subj in subjects}, completed)
+    for subj in subjects:
+        subj["missing_prerequisites"] = sorted(needs[subj["subject_id"]])
+        subj["blocked"] = bool(subj["missing_prerequisites"])
+        subj["seats_left"] = None if subj["capacity"] is None else max(subj["capacity"] - subj["enrolled_count"], 0)
+        subj["full"] = subj["seats_left"] == 0
+    return subjects
+
+
+def validate_subjects(cur, student_id, section, semester, subject_ids):
+    # Every selected subject must be offered in the section this semester (section
+    # names are reused from term to term), the student must have
+    # completed its whole prerequisite chain, and the picked class times must not
+    # overlap. Returns the schedule ids to seat.
+    placeholders = ",".join(["%s"] * len(subject_ids))
+    cur.execute(SELECTED_SCHEDULES.format(placeholders=placeholders), [section, semester] + list(subject_ids))
+    rows = cur.fetchall()
+    offered = {row[1] for row in rows}
+
+    missing = [sid for sid in subject_ids if sid not in offered]
+    if missing:
+        raise EnrollmentError("Subject(s) %s are not offered in section %s (%s semester)"
+                              % (", ".join(map(str, missing)), section, semester))
+
+    cur.execute("SELECT subject_id FROM student_completed_subjects WHERE student_id = %s", (student_id,))
+    completed = {row[0] for row in cur.fetchall()}
+    try:
+        needs = prereqs.missing(subject_ids, completed)
+    except prereqs.CycleError as e:
+        raise EnrollmentError(str(e))
+    blocked = sorted(sid for sid, left in needs.items() if left)
+    if blocked:
+        raise EnrollmentError("Prerequisites not met for subject(s) %s" % ", ".join(map(str, blocked)))
+
+    clashes = conflicts.overlaps_within(
+        [{"id": row[0], "day": row[2], "time_start": row[3], "time_end": row[4]} for row in rows])
+    if clashes:
+        raise EnrollmentError("Schedule conflict: " + conflicts.describe(clashes))
+    return sorted(row[0] for row in rows)
+
+
+def reserve_seats(cur, schedule_ids):
+    # Ascending id order so concurrent reservations lock rows in the same order
+    placeholders = ",".join(["%s"] * len(schedule_ids))
+    cur.execute(f"""
+        UPDATE class_schedules
+        SET enrolled_count = enrolled_count + 1
+        WHERE id IN ({placeholders})
+          AND (capacity IS NULL OR enrolled_count < capacity)
+        ORDER BY id
+    """, list(schedule_ids))
+    return cur.rowcount == len(schedule_ids)
+
+
+def release_seats(cur, enrollment_ids):
+    # Give back the seats held by enrollments that are being rejected or removed
+    if not enrollment_ids:
+        return
+    placeholders = ",".join(["%s"] * len(enrollment_ids))
+    cur.execute(f"""
+        UPDATE class_schedules cs
+        JOIN (
+            SELECT cs2.id, COUNT(*) AS taken
+            FROM enrollments e
+            JOIN enrollment_subjects es ON es.enrollment_id = e.id
+            JOIN class_schedules cs2
+              ON cs2.section = e.section AND cs2.semester = e.semester AND cs2.subject_id = es.subject_id
+            WHERE e.id IN ({placeholders})
+            GROUP BY cs2.id
+        ) r ON r.id = cs.id
+        SET cs.enrolled_count = GREATEST(cs.enrolled_count - r.taken, 0)
+    """, list(enrollment_ids))
+
+
+def set_current(cur, student_id, enrollment_id):
+    # students.current_enrollment_id always points at the student's newest enrollment
+    cur.execute("""
+        UPDATE students SET current_enrollment_id = %s
+        WHERE id = %s AND (current_enrollment_id IS NULL OR current_enrollment_id < %s)
+    """, (enrollment_id, student_id, enrollment_id))
+
+
+def submit(conn, student_id, section, subject_ids, semester, school_year):
+    # Returns (enrollment_id, created)
+    try:
+        subject_ids = sorted({int(sid) for sid in subject_ids})
+    except (TypeError, ValueError):
+        raise EnrollmentError("Invalid subject selection")
+    if not subject_ids:
+        raise EnrollmentError("No subjects selected")
+
+    cur = conn.cursor()
+
+    existing = find_existing(cur, student_id, semester, school_year)
+    if existing:
+        return existing, False
+
+    schedule_ids = validate_subjects(cur, student_id, section, semester, subject_ids)
+
+    # Short transaction: header row, one multi-row insert for the subjects, then seats
+    try:
+        cur.execute("""
+            INSERT INTO enrollments (student_id, section, semester, school_year)
+            VALUES (%s, %s, %s, %s)
+        """, (student_id, section, semester, school_year))
+        enrollment_id = cur.lastrowid
+
+        cur.executemany("INSERT INTO enrollment_subjects (enrollment_id, subject_id) VALUES (%s, %s)",
+                        [(enrollment_id, sid) for sid in subject_ids])
+        set_current(cur, student_id, enrollment_id)
+        balances = assessments.assess_enrollment(cur, enrollment_id)
+
+        if not reserve_seats(cur, schedule_ids):
+            conn.rollback()
+            raise SectionFull("Section %s is full for one or more of the selected subjects" % section)
+        # Shared counter rows last, so their locks are held only for the commit
+        stats.enrollment_added(cur)
+        for program_id, delta in balances.items():
+            stats.balance_changed(cur, program_id, delta)
+        conn.commit()
+    except mysql.connector.IntegrityError as e:
+        conn.rollback()
+        if e.errno != errorcode.ER_DUP_ENTRY:
+            raise
+        # A concurrent request for the same student/term won the race
+        return find_existing(cur, student_id, semester, school_year), False
+
+    return enrollment_id, True
+
+
+# ----------------------------------
+# REGISTRAR DECISIONS (approve / reject in bulk)
+# ----------------------------------
+def select_pending(cur, program_id=None, section=None, semester=None, school_year=None):
+    where = ["e.status = 'pending'"]
+    params = []
+    if program_id:
+        where.append("s.program_id = %s")
+        params.append(program_id)
+    if section:
+        where.append("e.section = %s")
+        params.append(section)
+    if semester:
+        where.append("e.semester = %s")
+        params.append(semester)
+    if school_year:
+        where.append("e.school_year = %s")
+        params.append(school_year)
+    cur.execute(f"""
+        SELECT e.id FROM enrollments e
+        JOIN students s ON e.student_id = s.id
+        WHERE {" AND ".join(where)}
+        ORDER BY e.id
+    """, params)
+    return [row[0] for row in cur.fetchall()]
+
+
+def decide(conn, enrollment_ids, action):
+    # Moves pending enrollments to approved/rejected, DECISION_CHUNK ids per short
+    # transaction. Only rows still 'pending' change, so when two registrars send
+    # overlapping batches each enrollment is decided once; the rest count as skipped.
+    status = DECISIONS[action]
+    ids = sorted({int(eid) for eid in enrollment_ids})
+    cur = conn.cursor()
+    updated = 0
+
+    for start in range(0, len(ids), DECISION_CHUNK):
+        chunk = ids[start:start + DECISION_CHUNK]
+        placeholders = ",".join(["%s"] * len(chunk))
+        if status == "rejected":
+            # Lock the still-pending rows first: exactly those give their seats back
+            cur.execute(f"""
+                SELECT id FROM enrollments
+                WHERE id IN ({placeholders}) AND status = 'pending'
+                ORDER BY id FOR UPDATE
+            """, chunk)
+            chunk = [row[0] for row in cur.fetchall()]
+            if not chunk:
+                conn.commit()
+                continue
+            placeholders = ",".join(["%s"] * len(chunk))
+            release_seats(cur, chunk)
+            # Rejected enrollments no longer count as outstanding (nor are they re-assessed)
+            balances = assessments.outstanding(cur, chunk)
+
+        cur.execute(f"""
+            UPDATE enrollments SET status = %s
+            WHERE id IN ({placeholders}) AND status = 'pending'
+        """, [status] + chunk)
+        updated += cur.rowcount
+        if status == "rejected":
+            for program_id, balance in balances.items():
+                stats.balance_changed(cur, program_id, -(balance or 0))
+        conn.commit()
+
+    return {"action": action, "status": status, "requested": len(ids),
+            "updated": updated, "skipped": len(ids) - updated}
+
+
+# ----------------------------------
+# BACKFILL (existing data, or repair)
+# ----------------------------------
+def backfill_current():
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("""
+        UPDATE students s
+        LEFT JOIN (
+            SELECT id, student_id,
+                   ROW_NUMBER() OVER (PARTITION BY student_id ORDER BY id DESC) AS rn
+            FROM enrollments
+        ) latest ON latest.student_id = s.id AND latest.rn = 1
+        SET s.current_enrollment_id = latest.id
+    """)
+    updated = cur.rowcount
+    conn.commit()
+    conn.close()
+    return updated
+
+
+if __name__ == "__main__":
+    print("current_enrollment_id set on %d students" % backfill_current())
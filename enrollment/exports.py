@@ -0,0 +1,126 @@
+import csv
+import io
+import tempfile
+from datetime import date
+
+from flask import Response, stream_with_context
+
+from db import get_db_connection
+
+# ----------------------------------
+# STREAMING EXPORTS (CSV / XLSX)
+# ----------------------------------
+FLUSH_ROWS = 500        # rows per chunk written to the client
+XLSX_CHUNK = 64 * 1024  # bytes per chunk when sending the finished workbook
+
+EXPORTS = {
+    "students": (
+        ["ID", "Student ID", "Last Name", "First Name", "Middle Name", "Birthdate",
+         "Address", "Contact", "Program", "Year Level", "Created At"],
+        """
+        SELECT s.id, s.student_id, s.last_name, s.first_name, s.middle_name, s.birthdate,
+               s.address, s.contact, p.name AS program_name, s.year_level, s.created_at
+        FROM students s
+        LEFT JOIN programs p ON s.program_id = p.id
+        ORDER BY s.id
+        """,
+    ),
+    "enrollments": (
+        ["Enrollment ID", "Student ID", "Last Name", "First Name", "Section", "Semester",
+         "School Year", "Status", "Subject Code", "Subject Title", "Units"],
+        """
+        SELECT e.id, s.student_id, s.last_name, s.first_name, e.section, e.semester,
+               e.school_year, e.status, subj.code, subj.title, subj.units
+        FROM enrollments e
+        JOIN students s ON e.student_id = s.id
+        LEFT JOIN enrollment_subjects es ON es.enrollment_id = e.id
+        LEFT JOIN subjects subj ON es.subject_id = subj.id
+        ORDER BY e.id, es.id
+        """,
+    ),
+    "class_schedules": (
+        ["ID", "Subject", "Program", "Semester", "Day", "Time Start", "Time End",
+         "Room", "Instructor Last Name", "Instructor First Name", "Section"],
+        """
+        SELECT cs.id, s.title, p.name, cs.semester, cs.day, cs.time_start, cs.time_end,
+               cs.room, i.last_name, i.first_name, cs.section
+        FROM class_schedules cs
+        LEFT JOIN subjects s ON cs.subject_id = s.id
+        LEFT JOIN programs p ON s.program_id = p.id
+        LEFT JOIN instructors i ON cs.instructor_id = i.id
+        ORDER BY cs.semester, cs.day, cs.time_start
+        """,
+    ),
+}
+
+
+def _rows(sql):
+    # Unbuffered cursor: rows come off the socket as they are consumed
+    conn = get_db_connection()
+    cur = conn.cursor(buffered=False)
+    try:
+        cur.execute(sql)
+        while True:
+            chunk = cur.fetchmany(FLUSH_ROWS)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        # The client may disconnect mid-export; drain the result so the connection can be reused
+        conn.consume_results()
+        cur.close()
+        conn.close()
+
+
+def _csv_stream(header, sql):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(header)
+    yield buf.getvalue()
+
+    for chunk in _rows(sql):
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(chunk)
+        yield buf.getvalue()
+
+
+def _xlsx_stream(title, header, sql):
+    from openpyxl import Workbook
+
+    # An XLSX is a zip that can only be finished once every row is known, so rows are
+    # streamed into a write-only workbook on disk and the file is sent in chunks afterwards.
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    ws.append(header)
+    for chunk in _rows(sql):
+        for row in chunk:
+            ws.append(row)
+
+    with tempfile.TemporaryFile() as tmp:
+        wb.save(tmp)
+        tmp.seek(0)
+        while True:
+            data = tmp.read(XLSX_CHUNK)
+            if not data:
+                break
+            yield data
+
+
+def export_response(name, fmt):
+    if name not in EXPORTS or fmt not in ("csv", "xlsx"):
+        return "Unknown export", 404
+
+    header, sql = EXPORTS[name]
+    filename = "%s-%s.%s" % (name, date.today().isoformat(), fmt)
+    headers = {"Content-Disposition": 'attachment; filename="%s"' % filename}
+
+    if fmt == "csv":
+        body = _csv_stream(header, sql)
+        mimetype = "text/csv"
+    else:
+        body = _xlsx_stream(name, header, sql)
+        mimetype = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    # stream_with_context keeps the request (and its pooled connection) alive until the last chunk
+    return Response(stream_with_context(body), mimetype=mimetype, headers=headers)
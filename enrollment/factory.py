@@ -0,0 +1,48 @@
+import os
+
+from flask import Flask
+
+import auth
+import compress
+import db
+import notifications
+import passwords
+import querystats
+
+# ----------------------------------
+# APP FACTORY
+# ----------------------------------
+# One Flask app, one connection pool, one set of caches per worker process.
+# APP_SURFACE picks what a deployment serves:
+#   admin   - admin pages (what admin_app.py used to be)
+#   portal  - registrar, cashier and student pages (what app.py used to be)
+#   both    - everything from one gunicorn deployment (default)
+#
+#   gunicorn "factory:create_app()"
+#   APP_SURFACE=portal gunicorn "factory:create_app()"
+SURFACES = ("admin", "portal", "both")
+
+
+def create_app(surface=None):
+    surface = surface or os.environ.get("APP_SURFACE", "both")
+    if surface not in SURFACES:
+        raise ValueError("APP_SURFACE must be one of %s, not %r" % (", ".join(SURFACES), surface))
+
+    app = Flask(__name__)
+    app.secret_key = os.environ.get("SECRET_KEY", "secretkey123")
+    app.config["APP_SURFACE"] = surface
+
+    db.init_app(app)
+    passwords.init_app(app)
+    querystats.init_app(app)
+    compress.init_app(app)
+
+    app.register_blueprint(auth.bp)
+    app.register_blueprint(notifications.bp)
+    if surface in ("admin", "both"):
+        import admin_views
+        app.register_blueprint(admin_views.bp)
+    if surface in ("portal", "both"):
+        import portal_views
+        app.register_blueprint(portal_views.bp)
+    return app
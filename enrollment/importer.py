@@ -0,0 +1,184 @@
+import csv
+import io
+import os
+import secrets
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+import mysql.connector
+
+import refcache
+import stats
+
+# ----------------------------------
+# BULK STUDENT IMPORT (CSV / XLSX)
+# ----------------------------------
+BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", "500"))
+HASH_WORKERS = int(os.environ.get("IMPORT_HASH_WORKERS", str(os.cpu_count() or 2)))
+PASSWORD_BYTES = 9  # generated passwords: 12 URL-safe characters
+
+COLUMNS = ["student_id", "first_name", "middle_name", "last_name", "birthdate",
+           "address", "contact", "program_id", "year_level", "username", "password"]
+REQUIRED = ["student_id", "first_name", "last_name", "program_id"]
+
+
+def read_rows(fileobj, filename):
+    # Yields (row_number, dict) one row at a time; the upload is never loaded whole
+    if filename.lower().endswith(".xlsx"):
+        from openpyxl import load_workbook
+
+        wb = load_workbook(fileobj, read_only=True, data_only=True)
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(h or "").strip().lower() for h in next(rows, [])]
+        for number, values in enumerate(rows, start=2):
+            if not any(v not in (None, "") for v in values):
+                continue
+            yield number, dict(zip(header, values))
+        wb.close()
+    else:
+        text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+        reader = csv.DictReader(text)
+        reader.fieldnames = [h.strip().lower() for h in reader.fieldnames or []]
+        for row in reader:
+            if not any((v or "").strip() for v in row.values() if isinstance(v, str)):
+                continue
+            yield reader.line_num, row
+        text.detach()
+
+
+def clean_row(raw, program_ids):
+    row = {}
+    for col in COLUMNS:
+        value = raw.get(col)
+        if isinstance(value, str):
+            value = value.strip()
+        row[col] = value if value not in ("", None) else None
+
+    missing = [col for col in REQUIRED if row[col] is None]
+    if missing:
+        return None, "missing " + ", ".join(missing)
+
+    row["student_id"] = str(row["student_id"])
+    try:
+        row["program_id"] = int(row["program_id"])
+        row["year_level"] = int(row["year_level"]) if row["year_level"] is not None else 1
+    except (TypeError, ValueError):
+        return None, "program_id and year_level must be numbers"
+    if row["program_id"] not in program_ids:
+        return None, "unknown program_id %s" % row["program_id"]
+
+    birthdate = row["birthdate"]
+    if isinstance(birthdate, datetime):
+        row["birthdate"] = birthdate.date()
+    elif isinstance(birthdate, str):
+        try:
+            row["birthdate"] = date.fromisoformat(birthdate)
+        except ValueError:
+            return None, "birthdate must be YYYY-MM-DD"
+
+    # The username defaults to the student number. A row without a password gets a
+    # random one, handed back once in the import report (never the student number)
+    row["username"] = str(row["username"] or row["student_id"])
+    row["generated"] = row["password"] is None
+    row["password"] = secrets.token_urlsafe(PASSWORD_BYTES) if row["generated"] else str(row["password"])
+    return row, None
+
+
+def _existing(cur, sql, values):
+    if not values:
+        return set()
+    placeholders = ",".join(["%s"] * len(values))
+    cur.execute(sql % placeholders, list(values))
+    # MySQL compares these case-insensitively, so do the same here
+    return {str(r[0]).lower() for r in cur.fetchall()}
+
+
+def _insert_batch(conn, cur, batch, hasher, hash_password):
+    hashes = list(hasher.map(hash_password, [row["password"] for _, row in batch]))
+
+    cur.executemany(
+        "INSERT INTO users (username, password, role) VALUES (%s, %s, 'student')",
+        [(row["username"], pw) for (_, row), pw in zip(batch, hashes)]
+    )
+    placeholders = ",".join(["%s"] * len(batch))
+    cur.execute("SELECT username, id FROM users WHERE username IN (%s)" % placeholders,
+                [row["username"] for _, row in batch])
+    user_ids = {username.lower(): id for username, id in cur.fetchall()}
+
+    cur.executemany("""
+        INSERT INTO students
+        (student_id, first_name, middle_name, last_name, birthdate, address, contact, program_id, year_level, user_id, created_at)
+        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,NOW())
+    """, [(row["student_id"], row["first_name"], row["middle_name"], row["last_name"], row["birthdate"],
+           row["address"], row["contact"], row["program_id"], row["year_level"], user_ids[row["username"].lower()])
+          for _, row in batch])
+
+    stats.user_added(cur, "student", len(batch))
+    # Typeahead indexes pick the batch up with a rebuild (see search.py)
+    refcache.bump(cur, "users")
+    refcache.bump(cur, "students")
+    for program_id, count in Counter(row["program_id"] for _, row in batch).items():
+        stats.student_added(cur, program_id, count)
+    conn.commit()
+
+
+def _flush(conn, cur, pending, seen_ids, seen_users, hasher, hash_password, report):
+    taken_ids = _existing(cur, "SELECT student_id FROM students WHERE student_id IN (%s)",
+                          {row["student_id"] for _, row in pending})
+    taken_users = _existing(cur, "SELECT username FROM users WHERE username IN (%s)",
+                            {row["username"] for _, row in pending})
+
+    batch = []
+    for number, row in pending:
+        student_key = row["student_id"].lower()
+        user_key = row["username"].lower()
+        if student_key in taken_ids or student_key in seen_ids:
+            report["errors"].append({"row": number, "error": "student_id %s already exists" % row["student_id"]})
+        elif user_key in taken_users or user_key in seen_users:
+            report["errors"].append({"row": number, "error": "username %s already exists" % row["username"]})
+        else:
+            seen_ids.add(student_key)
+            seen_users.add(user_key)
+            batch.append((number, row))
+
+    if not batch:
+        return
+    try:
+        _insert_batch(conn, cur, batch, hasher, hash_password)
+        report["inserted"] += len(batch)
+        report["passwords"].extend({"row": number, "username": row["username"], "password": row["password"]}
+                                   for number, row in batch if row["generated"])
+    except mysql.connector.Error as e:
+        # Someone else inserted a conflicting row meanwhile; report the whole chunk
+        conn.rollback()
+        for number, _ in batch:
+            report["errors"].append({"row": number, "error": "batch failed: %s" % e.msg})
+
+
+def import_students(conn, fileobj, filename, hash_password):
+    report = {"rows": 0, "inserted": 0, "errors": [], "passwords": []}
+
+    cur = conn.cursor()
+    cur.execute("SELECT id FROM programs")
+    program_ids = {r[0] for r in cur.fetchall()}
+
+    seen_ids = set()
+    seen_users = set()
+    pending = []
+
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as hasher:
+        for number, raw in read_rows(fileobj, filename):
+            report["rows"] += 1
+            row, error = clean_row(raw, program_ids)
+            if error:
+                report["errors"].append({"row": number, "error": error})
+                continue
+            pending.append((number, row))
+            if len(pending) >= BATCH_SIZE:
+                _flush(conn, cur, pending, seen_ids, seen_users, hasher, hash_password, report)
+                pending = []
+        if pending:
+            _flush(conn, cur, pending, seen_ids, seen_users, hasher, hash_password, report)
+
+    return report
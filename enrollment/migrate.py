@@ -0,0 +1,165 @@
+import hashlib
+import os
+import re
+import sys
+
+import admin_views
+import assessments
+import auth
+import conflicts
+import enrollments
+import notifications
+import portal_views
+from db import get_db_connection
+
+# ----------------------------------
+# SCHEMA MIGRATIONS
+# ----------------------------------
+# enroll.sql is the baseline snapshot and is never edited. Every later change is a
+# numbered file in migrations/ (NNNN_description.sql) and is applied once, in order;
+# applied versions are recorded in `schema_migrations` together with a checksum of
+# the file. A new database is enroll.sql followed by `python migrate.py`, then
+# `python stats.py` to fill the dashboard counters.
+#
+#   python migrate.py            apply pending migrations
+#   python migrate.py status     list applied / pending migrations
+#   python migrate.py check      EXPLAIN the hot queries, fail on full table scans
+#
+# MySQL commits DDL implicitly, so a migration is recorded only after all of its
+# statements ran; keep one change per file so a failure is easy to pick up again.
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+FILENAME = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+
+def discover():
+    found = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = FILENAME.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(MIGRATIONS_DIR, filename), encoding="utf-8") as f:
+            sql = f.read()
+        found.append({
+            "version": int(match.group(1)),
+            "name": match.group(2),
+            "sql": sql,
+            "checksum": hashlib.sha256(sql.encode("utf-8")).hexdigest(),
+        })
+    return found
+
+
+def statements(sql):
+    # Drop "--" comment lines, split on ";" at the end of a line
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [stmt.strip() for stmt in re.split(r";\s*$", "\n".join(lines), flags=re.M) if stmt.strip()]
+
+
+def _ensure_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version int NOT NULL,
+            name varchar(100) NOT NULL,
+            checksum char(64) NOT NULL,
+            applied_at datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (version)
+        )
+    """)
+
+
+def applied(cur):
+    _ensure_table(cur)
+    cur.execute("SELECT version, checksum FROM schema_migrations")
+    return dict(cur.fetchall())
+
+
+def migrate():
+    conn = get_db_connection()
+    cur = conn.cursor()
+    done = applied(cur)
+
+    count = 0
+    for migration in discover():
+        if migration["version"] in done:
+            if done[migration["version"]] != migration["checksum"]:
+                print("warning: %04d_%s changed after it was applied" % (migration["version"], migration["name"]))
+            continue
+        print("applying %04d_%s" % (migration["version"], migration["name"]))
+        for stmt in statements(migration["sql"]):
+            cur.execute(stmt)
+        cur.execute("INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                    (migration["version"], migration["name"], migration["checksum"]))
+        conn.commit()
+        count += 1
+
+    conn.close()
+    return count
+
+
+def status():
+    conn = get_db_connection()
+    cur = conn.cursor()
+    done = applied(cur)
+    conn.close()
+    for migration in discover():
+        state = "applied" if migration["version"] in done else "pending"
+        print("%04d_%-40s %s" % (migration["version"], migration["name"], state))
+
+
+# ----------------------------------
+# EXPLAIN CHECK
+# ----------------------------------
+# The filtered/paged queries the apps run on every page view, imported from the
+# modules that run them (so the check cannot drift from the code), with
+# representative parameters. Each must reach its rows through an index: an EXPLAIN
+# row with access type ALL on one of these tables fails the check. Small lookup
+# tables (programs, instructors, ...) are allowed to be scanned, as are derived
+# tables (<derivedN>, whose own tables are checked) and an INSERT's target row. Run
+# it against a database with realistic row counts; on a near-empty table MySQL may
+# prefer a scan anyway.
+SCAN_OK = {"programs", "instructors", "fee_rates", "misc_fees", "table_versions", "stat_counters", "schema_migrations"}
+
+HOT_QUERIES = [
+    ("login", auth.LOGIN_USER, ("student1",)),
+    ("registrar pending queue", portal_views.PENDING_ENROLLMENTS, ()),
+    ("registrar dashboard page",
+     portal_views.REGISTRAR_STUDENTS.format(where="WHERE (s.last_name, s.first_name, s.id) > (%s, %s, %s)",
+                                            order="ASC"),
+     ("M", "", 0, 51)),
+    ("admin students page",
+     admin_views.STUDENT_LIST.format(where="WHERE s.id < %s", order="DESC"), (1000, 51)),
+    ("student current enrollment", portal_views.LATEST_ENROLLMENT, (1,)),
+    ("section subjects", enrollments.SECTION_OFFERINGS, ("1", "1st")),
+    ("enrollment validation", enrollments.SELECTED_SCHEDULES.format(placeholders="%s, %s"), ("1", "1st", 1, 2)),
+    ("conflict index load", conflicts.SEMESTER_SCHEDULES, ("1st",)),
+    ("assess one enrollment", assessments._ASSESS.format(where="e.id = %s"), (1,)),
+    ("notifications replay", notifications.LATEST, ("admin", 50)),
+]
+
+
+def check():
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+    failures = 0
+    for name, sql, params in HOT_QUERIES:
+        cur.execute("EXPLAIN " + sql, params)
+        plan = cur.fetchall()
+        scans = [row["table"] for row in plan
+                 if row["type"] == "ALL" and row["table"] not in SCAN_OK
+                 and not str(row["table"]).startswith("<") and row["select_type"] != "INSERT"]
+        keys = ", ".join("%s:%s" % (row["table"], row["key"] or row["type"]) for row in plan)
+        print("%-4s %-28s %s" % ("FAIL" if scans else "ok", name, keys))
+        failures += bool(scans)
+    conn.close()
+    return failures
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "up"
+    if command == "up":
+        print("%d migration(s) applied" % migrate())
+    elif command == "status":
+        status()
+    elif command == "check":
+        sys.exit(1 if check() else 0)
+    else:
+        sys.exit("usage: python migrate.py [up|status|check]")
@@ -0,0 +1,8 @@
+-- Counters behind the admin dashboard (stats.py). Fill them for existing data
+-- with: python stats.py
+CREATE TABLE IF NOT EXISTS stat_counters (
+  name varchar(50) NOT NULL,
+  `key` varchar(100) NOT NULL DEFAULT '',
+  value bigint NOT NULL DEFAULT '0',
+  PRIMARY KEY (name, `key`)
+);
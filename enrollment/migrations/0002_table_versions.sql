@@ -0,0 +1,8 @@
+-- One row per cached table (refcache.py); writers bump the version, workers reload
+-- when it moves. A missing row reads as version 0.
+CREATE TABLE IF NOT EXISTS table_versions (
+  name varchar(50) NOT NULL,
+  version bigint NOT NULL DEFAULT '0',
+  updated_at datetime DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (name)
+);
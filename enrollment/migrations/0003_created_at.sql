@@ -0,0 +1,4 @@
+-- Dashboard counters group students and enrollments by the month they were added
+ALTER TABLE students ADD COLUMN created_at datetime DEFAULT CURRENT_TIMESTAMP;
+
+ALTER TABLE enrollments ADD COLUMN created_at datetime DEFAULT CURRENT_TIMESTAMP;
@@ -0,0 +1,19 @@
+-- A student has one enrollment per term, and a subject appears once per enrollment
+-- (enrollments.submit relies on both for idempotent retries). The enrollment
+-- remembers its section so seats can be given back.
+--
+-- Duplicate enrollments for the same student and term must be merged by hand
+-- before this runs; duplicate subject rows are dropped here.
+ALTER TABLE enrollments ADD COLUMN section varchar(45) DEFAULT NULL;
+
+DELETE es FROM enrollment_subjects es
+JOIN enrollment_subjects keep
+  ON keep.enrollment_id = es.enrollment_id AND keep.subject_id = es.subject_id AND keep.id < es.id;
+
+ALTER TABLE enrollments ADD UNIQUE KEY uq_enrollment_term (student_id, semester, school_year);
+
+ALTER TABLE enrollments DROP KEY student_id;
+
+ALTER TABLE enrollment_subjects ADD UNIQUE KEY uq_enrollment_subject (enrollment_id, subject_id);
+
+ALTER TABLE enrollment_subjects DROP KEY enrollment_id;
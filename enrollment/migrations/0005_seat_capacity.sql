@@ -0,0 +1,16 @@
+-- Seat capacity per class (NULL = unlimited) and the seats taken, kept by
+-- enrollments.reserve_seats / release_seats. Existing enrollments are counted in.
+ALTER TABLE class_schedules
+  ADD COLUMN capacity int DEFAULT NULL,
+  ADD COLUMN enrolled_count int NOT NULL DEFAULT '0';
+
+UPDATE class_schedules cs
+JOIN (
+  SELECT cs2.id, COUNT(*) AS taken
+  FROM enrollments e
+  JOIN enrollment_subjects es ON es.enrollment_id = e.id
+  JOIN class_schedules cs2 ON cs2.subject_id = es.subject_id AND cs2.section = e.section
+  WHERE e.status <> 'rejected'
+  GROUP BY cs2.id
+) r ON r.id = cs.id
+SET cs.enrolled_count = r.taken;
@@ -0,0 +1,10 @@
+-- The registrar dashboard joins each student's newest enrollment through this column
+-- (enrollments.set_current keeps it up to date; backfilled here)
+ALTER TABLE students
+  ADD COLUMN current_enrollment_id int DEFAULT NULL,
+  ADD KEY current_enrollment_id (current_enrollment_id);
+
+UPDATE students s
+JOIN (SELECT student_id, MAX(id) AS id FROM enrollments GROUP BY student_id) latest
+  ON latest.student_id = s.id
+SET s.current_enrollment_id = latest.id;
@@ -0,0 +1,2 @@
+-- Registrar queues filter on status (pending list, dashboard filter)
+CREATE INDEX idx_enrollments_status ON enrollments (status, id);
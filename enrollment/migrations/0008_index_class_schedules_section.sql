@@ -0,0 +1,2 @@
+-- Section pages and enrollment validation look schedules up by section and subject
+CREATE INDEX idx_schedules_section ON class_schedules (section, subject_id);
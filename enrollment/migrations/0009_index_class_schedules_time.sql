@@ -0,0 +1,2 @@
+-- Conflict index loads and the schedule list go by semester, then day and start time
+CREATE INDEX idx_schedules_time ON class_schedules (semester, day, time_start);
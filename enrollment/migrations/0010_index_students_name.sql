@@ -0,0 +1,2 @@
+-- Registrar dashboard sorts and pages students by name
+CREATE INDEX idx_students_name ON students (last_name, first_name);
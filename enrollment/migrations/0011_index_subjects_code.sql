@@ -0,0 +1,2 @@
+-- Subject list is ordered by code
+CREATE INDEX idx_subjects_code ON subjects (code);
@@ -0,0 +1,2 @@
+-- User management lists accounts per role
+CREATE INDEX idx_users_role ON users (role);
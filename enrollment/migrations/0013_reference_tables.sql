@@ -0,0 +1,25 @@
+-- Tables and columns the apps already query but enroll.sql never had:
+-- prerequisite checks read student_completed_subjects, the admin schedule pages
+-- join instructors through class_schedules.instructor_id
+CREATE TABLE IF NOT EXISTS student_completed_subjects (
+  student_id int NOT NULL,
+  subject_id int NOT NULL,
+  completed_at datetime DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (student_id, subject_id),
+  KEY subject_id (subject_id),
+  CONSTRAINT completed_student_fk FOREIGN KEY (student_id) REFERENCES students (id),
+  CONSTRAINT completed_subject_fk FOREIGN KEY (subject_id) REFERENCES subjects (id)
+);
+
+CREATE TABLE IF NOT EXISTS instructors (
+  id int NOT NULL AUTO_INCREMENT,
+  first_name varchar(50) DEFAULT NULL,
+  middle_name varchar(50) DEFAULT NULL,
+  last_name varchar(50) DEFAULT NULL,
+  contact varchar(20) DEFAULT NULL,
+  email varchar(100) DEFAULT NULL,
+  PRIMARY KEY (id),
+  KEY idx_instructors_name (last_name, first_name)
+);
+
+ALTER TABLE class_schedules ADD COLUMN instructor_id int DEFAULT NULL, ADD KEY instructor_id (instructor_id);
@@ -0,0 +1,30 @@
+-- Fee configuration for assessments.py: tuition per unit by program (program_id
+-- NULL is the default rate) and miscellaneous fees (program_id NULL applies to
+-- every program). assessments gets the computed parts and one row per enrollment.
+CREATE TABLE IF NOT EXISTS fee_rates (
+  id int NOT NULL AUTO_INCREMENT,
+  program_id int DEFAULT NULL,
+  tuition_per_unit decimal(10,2) NOT NULL DEFAULT '0.00',
+  PRIMARY KEY (id),
+  UNIQUE KEY uq_fee_rates_program (program_id),
+  CONSTRAINT fee_rates_program_fk FOREIGN KEY (program_id) REFERENCES programs (id)
+);
+
+CREATE TABLE IF NOT EXISTS misc_fees (
+  id int NOT NULL AUTO_INCREMENT,
+  program_id int DEFAULT NULL,
+  name varchar(100) NOT NULL,
+  amount decimal(10,2) NOT NULL DEFAULT '0.00',
+  PRIMARY KEY (id),
+  KEY program_id (program_id),
+  CONSTRAINT misc_fees_program_fk FOREIGN KEY (program_id) REFERENCES programs (id)
+);
+
+ALTER TABLE assessments
+  ADD COLUMN units int NOT NULL DEFAULT 0,
+  ADD COLUMN tuition decimal(10,2) NOT NULL DEFAULT '0.00',
+  ADD COLUMN misc_fees decimal(10,2) NOT NULL DEFAULT '0.00',
+  ADD COLUMN assessed_at datetime DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  ADD UNIQUE KEY uq_assessment_enrollment (enrollment_id);
+
+ALTER TABLE assessments DROP KEY enrollment_id;
@@ -0,0 +1,7 @@
+-- Payments posted by the cashier: who posted them, when, and the bank/OR reference.
+-- The unique reference makes re-uploading a bank file safe.
+ALTER TABLE payments
+  ADD COLUMN reference varchar(64) DEFAULT NULL,
+  ADD COLUMN posted_by int DEFAULT NULL,
+  ADD COLUMN created_at datetime DEFAULT CURRENT_TIMESTAMP,
+  ADD UNIQUE KEY uq_payment_reference (reference);
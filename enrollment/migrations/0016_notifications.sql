@@ -0,0 +1,13 @@
+-- The admin notifications page has always read this table; it was never created.
+-- One row per audience role (see notifications.py), newest first per role.
+CREATE TABLE IF NOT EXISTS notifications (
+  id int NOT NULL AUTO_INCREMENT,
+  audience varchar(20) NOT NULL,
+  kind varchar(50) NOT NULL,
+  title varchar(150) NOT NULL,
+  message varchar(500) DEFAULT NULL,
+  is_read tinyint(1) NOT NULL DEFAULT '0',
+  created_at datetime DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (id),
+  KEY idx_notifications_audience (audience, id)
+);
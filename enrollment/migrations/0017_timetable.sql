@@ -0,0 +1,52 @@
+-- Inputs for the timetable generator (timetable.py). A section takes every subject of
+-- its program and year level; each class gets one time slot, a room that seats the
+-- section and an instructor who may teach the subject and is available then.
+-- An instructor with no availability rows is available in every slot; a subject
+-- with no instructor_subjects rows may be taught by any instructor.
+CREATE TABLE IF NOT EXISTS rooms (
+  id int NOT NULL AUTO_INCREMENT,
+  name varchar(50) NOT NULL,
+  capacity int DEFAULT NULL,
+  PRIMARY KEY (id),
+  UNIQUE KEY uq_rooms_name (name)
+);
+
+CREATE TABLE IF NOT EXISTS sections (
+  id int NOT NULL AUTO_INCREMENT,
+  name varchar(45) NOT NULL,
+  program_id int NOT NULL,
+  year_level int NOT NULL,
+  size int DEFAULT NULL,
+  PRIMARY KEY (id),
+  UNIQUE KEY uq_sections_name (name),
+  KEY idx_sections_program (program_id, year_level),
+  CONSTRAINT sections_program_fk FOREIGN KEY (program_id) REFERENCES programs (id)
+);
+
+CREATE TABLE IF NOT EXISTS time_slots (
+  id int NOT NULL AUTO_INCREMENT,
+  day varchar(20) NOT NULL,
+  time_start time NOT NULL,
+  time_end time NOT NULL,
+  PRIMARY KEY (id)
+);
+
+CREATE TABLE IF NOT EXISTS instructor_availability (
+  id int NOT NULL AUTO_INCREMENT,
+  instructor_id int NOT NULL,
+  day varchar(20) NOT NULL,
+  time_start time NOT NULL,
+  time_end time NOT NULL,
+  PRIMARY KEY (id),
+  KEY instructor_id (instructor_id),
+  CONSTRAINT availability_instructor_fk FOREIGN KEY (instructor_id) REFERENCES instructors (id)
+);
+
+CREATE TABLE IF NOT EXISTS instructor_subjects (
+  instructor_id int NOT NULL,
+  subject_id int NOT NULL,
+  PRIMARY KEY (instructor_id, subject_id),
+  KEY subject_id (subject_id),
+  CONSTRAINT instructor_subjects_instructor_fk FOREIGN KEY (instructor_id) REFERENCES instructors (id),
+  CONSTRAINT instructor_subjects_subject_fk FOREIGN KEY (subject_id) REFERENCES subjects (id)
+);
@@ -0,0 +1,7 @@
+-- Hot counters (enrollments per month, balances per program) are spread over
+-- several rows per key so concurrent writers do not queue on one row; readers sum
+-- the shards (see stats.py)
+ALTER TABLE stat_counters
+  ADD COLUMN shard smallint NOT NULL DEFAULT '0',
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (name, `key`, shard);
@@ -0,0 +1,3 @@
+-- The admin subject forms have always saved a semester; the column was never
+-- created. Subjects without one are offered in every semester.
+ALTER TABLE subjects ADD COLUMN semester varchar(20) DEFAULT NULL;
@@ -0,0 +1,19 @@
+-- Section names are reused from term to term, so schedules are looked up by
+-- section, semester and subject (enrollments.SECTION_OFFERINGS, validate_subjects,
+-- release_seats); this index replaces idx_schedules_section (section, subject_id).
+CREATE INDEX idx_schedules_section_term ON class_schedules (section, semester, subject_id);
+
+DROP INDEX idx_schedules_section ON class_schedules;
+
+-- 0005 counted seats by section and subject alone; recount them per semester
+UPDATE class_schedules cs
+LEFT JOIN (
+  SELECT cs2.id, COUNT(*) AS taken
+  FROM enrollments e
+  JOIN enrollment_subjects es ON es.enrollment_id = e.id
+  JOIN class_schedules cs2
+    ON cs2.section = e.section AND cs2.semester = e.semester AND cs2.subject_id = es.subject_id
+  WHERE e.status <> 'rejected'
+  GROUP BY cs2.id
+) r ON r.id = cs.id
+SET cs.enrolled_count = COALESCE(r.taken, 0);
@@ -0,0 +1,225 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from flask import Blueprint, Response, request, session
+
+import db
+from db import get_db_connection
+
+# ----------------------------------
+# NOTIFICATIONS
+# ----------------------------------
+# publish() stores one `notifications` row per audience role and hands the events to
+# this worker's in-process bus, which fans them out to every open SSE stream for
+# that role. Events written by other workers are picked up by one tail thread per
+# worker (a single indexed query every POLL_SECONDS, however many streams are open),
+# so a stream itself never queries the database.
+#
+# Streams are long-lived responses: serve them from a worker that does not tie up
+# a thread per connection, e.g. gunicorn -k gevent, or enough --threads.
+AUDIENCES = ("admin", "registrar")
+POLL_SECONDS = float(os.environ.get("NOTIFY_POLL_SECONDS", "1.0"))
+KEEPALIVE_SECONDS = float(os.environ.get("NOTIFY_KEEPALIVE_SECONDS", "15"))
+STREAM_QUEUE = 100    # events buffered per stream before it is dropped as too slow
+REPLAY_LIMIT = 50     # events re-sent to a reconnecting stream (Last-Event-ID)
+RECENT_IDS = 1000     # ids already delivered locally, so the tail does not repeat them
+TAIL_WINDOW = 50      # ids below the newest seen that the tail reads again: AUTO_INCREMENT
+                      # ids from other workers can commit out of order
+
+# The newest events for one audience (params: audience, limit)
+LATEST = """
+    SELECT id, audience, kind, title, message, created_at, is_read
+    FROM notifications WHERE audience = %s ORDER BY id DESC LIMIT %s
+"""
+
+bp = Blueprint("notifications", __name__)
+log = logging.getLogger(__name__)
+
+
+def _event(row):
+    created = row["created_at"]
+    return {
+        "id": row["id"],
+        "audience": row["audience"],
+        "kind": row["kind"],
+        "title": row["title"],
+        "message": row["message"],
+        "time": created.strftime("%Y-%m-%d %H:%M") if hasattr(created, "strftime") else created,
+    }
+
+
+class Bus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {audience: set() for audience in AUDIENCES}
+        self._recent = deque(maxlen=RECENT_IDS)
+        self._recent_set = set()
+        self._tail_id = None
+        self._tail = None
+
+    def subscribe(self, audience):
+        q = queue.Queue(maxsize=STREAM_QUEUE)
+        with self._lock:
+            self._subscribers[audience].add(q)
+            if self._tail is None or not self._tail.is_alive():
+                self._tail = threading.Thread(target=self._follow, name="notifications-tail", daemon=True)
+                self._tail.start()
+        return q
+
+    def unsubscribe(self, audience, q):
+        with self._lock:
+            self._subscribers[audience].discard(q)
+
+    def subscribers(self):
+        with self._lock:
+            return {audience: len(queues) for audience, queues in self._subscribers.items()}
+
+    def _remember(self, event_id):
+        # Caller holds _lock; False if the id was delivered already
+        if event_id in self._recent_set:
+            return False
+        if len(self._recent) == self._recent.maxlen:
+            self._recent_set.discard(self._recent[0])
+        self._recent.append(event_id)
+        self._recent_set.add(event_id)
+        return True
+
+    def deliver(self, events):
+        with self._lock:
+            for event in events:
+                if not self._remember(event["id"]):
+                    continue
+                for q in list(self._subscribers.get(event["audience"], ())):
+                    try:
+                        q.put_nowait(event)
+                    except queue.Full:
+                        # A stream that stopped reading: end it, the browser reconnects
+                        # with Last-Event-ID and catches up from the table
+                        self._subscribers[event["audience"]].discard(q)
+                        with q.mutex:
+                            q.queue.clear()
+                        q.put_nowait(None)
+
+    def _follow(self):
+        # Tail thread: picks up rows other workers wrote, while anyone is listening
+        while True:
+            with self._lock:
+                if not any(self._subscribers.values()):
+                    # The next subscriber starts from the table's end, not from here
+                    self._tail = None
+                    self._tail_id = None
+                    return
+            conn = None
+            try:
+                conn = get_db_connection()
+                cur = conn.cursor(dictionary=True)
+                if self._tail_id is None:
+                    # Start at the newest rows; the ones in the window count as delivered
+                    cur.execute("SELECT id FROM notifications ORDER BY id DESC LIMIT %s", (TAIL_WINDOW,))
+                    ids = [row["id"] for row in cur.fetchall()]
+                    with self._lock:
+                        for event_id in reversed(ids):
+                            self._remember(event_id)
+                    self._tail_id = ids[0] if ids else 0
+                else:
+                    # Re-read the window below the newest id too: a row with a lower id
+                    # may have committed after it; deliver() drops the repeats
+                    cur.execute("""
+                        SELECT id, audience, kind, title, message, created_at
+                        FROM notifications WHERE id > %s ORDER BY id LIMIT 500
+                    """, (max(self._tail_id - TAIL_WINDOW, 0),))
+                    rows = cur.fetchall()
+                    if rows:
+                        self._tail_id = max(self._tail_id, rows[-1]["id"])
+                        self.deliver([_event(row) for row in rows])
+                conn.commit()
+            except Exception:  # keep tailing through database hiccups
+                log.exception("notifications tail failed")
+            finally:
+                if conn is not None:
+                    conn.close()
+            time.sleep(POLL_SECONDS)
+
+
+_bus = Bus()
+
+
+def publish(kind, title, message, audiences=AUDIENCES):
+    # Call after the change itself was committed: writes the rows, commits, pushes
+    conn = get_db_connection()
+    cur = conn.cursor()
+    created = time.strftime("%Y-%m-%d %H:%M")
+    events = []
+    for audience in audiences:
+        cur.execute("INSERT INTO notifications (audience, kind, title, message) VALUES (%s, %s, %s, %s)",
+                    (audience, kind, title, message))
+        events.append({"id": cur.lastrowid, "audience": audience, "kind": kind, "title": title,
+                       "message": message, "time": created})
+    conn.commit()
+    conn.close()
+    _bus.deliver(events)
+
+
+def recent(cur, audience, after_id=None, limit=REPLAY_LIMIT):
+    if after_id is None:
+        cur.execute(LATEST, (audience, limit))
+        return cur.fetchall()
+    cur.execute("""
+        SELECT id, audience, kind, title, message, created_at, is_read
+        FROM notifications WHERE audience = %s AND id > %s ORDER BY id LIMIT %s
+    """, (audience, after_id, limit))
+    return cur.fetchall()
+
+
+def _sse(event):
+    return "id: %d\nevent: notification\ndata: %s\n\n" % (event["id"], json.dumps(event))
+
+
+@bp.route("/notifications/stream")
+def stream():
+    audience = session.get("role")
+    if audience not in AUDIENCES:
+        return "Access Denied", 403
+
+    # Subscribe before catching up on what a reconnecting client missed, so nothing
+    # published in between is lost; events() skips what the catch-up already sent.
+    # Then give the connection back: the stream itself holds no database connection
+    q = _bus.subscribe(audience)
+    missed = []
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("last_id")
+    try:
+        if last_id and last_id.isdigit():
+            conn = get_db_connection()
+            missed = [_event(row) for row in recent(conn.cursor(dictionary=True), audience, int(last_id))]
+            conn.close()
+        db.close_db_connection()
+    except Exception:
+        _bus.unsubscribe(audience, q)
+        raise
+    replayed = missed[-1]["id"] if missed else 0
+
+    def events():
+        try:
+            yield "retry: 3000\n\n"
+            for event in missed:
+                yield _sse(event)
+            while True:
+                try:
+                    event = q.get(timeout=KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    return
+                if event["id"] > replayed:
+                    yield _sse(event)
+        finally:
+            _bus.unsubscribe(audience, q)
+
+    return Response(events(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
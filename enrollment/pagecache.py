@@ -0,0 +1,101 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import make_response, request, session
+
+from db import get_db_connection
+
+# ----------------------------------
+# CONDITIONAL GET + RENDERED PAGE CACHE
+# ----------------------------------
+# A list page declares the tables it shows. Their table_versions numbers plus the
+# path, query string and role make the ETag; their updated_at is Last-Modified. The
+# versions are read from the table on every request (one primary-key lookup), not
+# from refcache's copy, which may be up to CHECK_INTERVAL old: right after a write
+# on another worker that copy would still vouch for the old page. A matching
+# If-None-Match / If-Modified-Since gets a 304 before the view runs, and a miss on
+# the browser side is served from a small per-worker LRU of rendered HTML. Neither
+# path runs the page's own queries or Jinja. Only 200 responses are kept. A page
+# limited to one role names it (role="admin"): anyone else gets the 403 before
+# either shortcut.
+PAGE_CACHE_SIZE = int(os.environ.get("PAGE_CACHE_SIZE", "64"))
+
+_lock = threading.Lock()
+_pages = OrderedDict()  # etag -> (body, content type)
+
+
+def _versions(tables):
+    # {table: (version, updated_at)}, as committed right now
+    conn = get_db_connection()
+    cur = conn.cursor()
+    placeholders = ",".join(["%s"] * len(tables))
+    cur.execute(f"SELECT name, version, updated_at FROM table_versions WHERE name IN ({placeholders})", list(tables))
+    rows = cur.fetchall()
+    conn.close()
+    return {name: (version, updated) for name, version, updated in rows}
+
+
+def _stamp(tables, ttl):
+    versions = _versions(tables)
+    parts = [request.path, request.query_string.decode("latin-1"), session.get("role") or ""]
+    parts += ["%s=%s" % (table, versions.get(table, (0, None))[0]) for table in tables]
+    changed = [versions.get(table, (0, None))[1] for table in tables]
+    changed = [c.replace(tzinfo=timezone.utc) for c in changed if isinstance(c, datetime)]
+    if ttl:
+        # Columns no version tracks (e.g. seat counts): a new ETag every ttl seconds
+        bucket = int(time.time() // ttl)
+        parts.append("t=%d" % bucket)
+        changed.append(datetime.fromtimestamp(bucket * ttl, timezone.utc))
+    etag = hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:20]
+    return etag, max(changed) if changed else None
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        # Weak comparison: compress.py hands out W/"..." for compressed bodies
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    return since is not None and last_modified is not None and last_modified.replace(microsecond=0) <= since
+
+
+def _finish(response, etag, last_modified):
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Let the browser keep the page but ask every time; the answer is usually a 304
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def conditional(*tables, ttl=None, role=None):
+    def decorate(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if role is not None and session.get("role") != role:
+                return "Access Denied", 403
+            etag, last_modified = _stamp(tables, ttl)
+            if _not_modified(etag, last_modified):
+                return _finish(make_response("", 304), etag, last_modified)
+
+            with _lock:
+                page = _pages.get(etag)
+                if page is not None:
+                    _pages.move_to_end(etag)
+            if page is not None:
+                return _finish(make_response(page[0], 200, {"Content-Type": page[1]}), etag, last_modified)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            with _lock:
+                _pages[etag] = (response.get_data(), response.headers.get("Content-Type"))
+                while len(_pages) > PAGE_CACHE_SIZE:
+                    _pages.popitem(last=False)
+            return _finish(response, etag, last_modified)
+        return wrapper
+    return decorate
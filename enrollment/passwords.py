@@ -0,0 +1,90 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import bcrypt
+
+# ----------------------------------
+# PASSWORD HASHING
+# ----------------------------------
+# bcrypt is deliberately slow, so it runs on a small dedicated pool instead of on the
+# request threads. When more than HASH_QUEUE_LIMIT hashes are already waiting, new
+# work is refused (HTTP 503) rather than letting a login burst pile up behind it; a
+# hash still not done after HASH_TIMEOUT seconds gets the same answer.
+LOG_ROUNDS = int(os.environ.get("BCRYPT_LOG_ROUNDS", "12"))
+HASH_WORKERS = int(os.environ.get("BCRYPT_WORKERS", str(os.cpu_count() or 2)))
+HASH_QUEUE_LIMIT = int(os.environ.get("BCRYPT_QUEUE_LIMIT", str(HASH_WORKERS * 8)))
+HASH_TIMEOUT = float(os.environ.get("BCRYPT_TIMEOUT", "10"))
+
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+_slots = threading.BoundedSemaphore(HASH_WORKERS + HASH_QUEUE_LIMIT)
+
+
+class HashQueueFull(Exception):
+    pass
+
+
+class HashTimeout(HashQueueFull):
+    pass
+
+
+def hash_now(password):
+    # Runs on the calling thread; for scripts and bulk jobs with their own worker pool
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(LOG_ROUNDS)).decode("utf-8")
+
+
+def _check(pw_hash, password):
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), pw_hash.encode("utf-8"))
+    except ValueError:
+        # not a bcrypt hash
+        return False
+
+
+def _submit(fn, *args):
+    if not _slots.acquire(blocking=False):
+        raise HashQueueFull()
+    try:
+        future = _executor.submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda f: _slots.release())
+    try:
+        return future.result(timeout=HASH_TIMEOUT)
+    except FutureTimeout:
+        # Drops it if it is still queued; one already running finishes on its own
+        future.cancel()
+        raise HashTimeout()
+
+
+def hash_password(password):
+    return _submit(hash_now, password)
+
+
+def check_password(pw_hash, password):
+    return _submit(_check, pw_hash, password)
+
+
+def needs_rehash(pw_hash):
+    # $2b$<cost>$<salt+hash>
+    try:
+        return int(pw_hash.split("$")[2]) != LOG_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+def rehash_if_needed(cur, user_id, pw_hash, password):
+    # Called after a successful login, while the plain password is at hand
+    if not needs_rehash(pw_hash):
+        return False
+    new_hash = hash_password(password)
+    # Only replace the hash we verified; a concurrent password change wins
+    cur.execute("UPDATE users SET password=%s WHERE id=%s AND password=%s", (new_hash, user_id, pw_hash))
+    return True
+
+
+def init_app(app):
+    @app.errorhandler(HashQueueFull)
+    def hash_queue_full(exc):
+        return "Too many sign-in attempts right now, please try again", 503, {"Retry-After": "2"}
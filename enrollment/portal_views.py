@@ -0,0 +1,437 @@
+from flask import Blueprint, render_template, request, redirect, session
+import assessments
+import cashier
+import enrollments
+import exports
+import notifications
+import prereqs
+import refcache
+from db import get_db_connection
+
+# Portal surface: registrar, cashier and student pages
+bp = Blueprint("portal", __name__)
+
+REGISTRAR_PAGE_SIZE = 50
+
+# One row per student with the latest enrollment's status, a page at a time in
+# (last_name, first_name, id) order ({where}: filters and keyset bound; {order}:
+# ASC, or DESC when paging back)
+REGISTRAR_STUDENTS = """
+    SELECT s.id AS student_id,
+           s.first_name, s.middle_name, s.last_name,
+           e.id AS enrollment_id,
+           e.status
+    FROM students s
+    LEFT JOIN enrollments e ON e.id = s.current_enrollment_id
+    {where}
+    ORDER BY s.last_name {order}, s.first_name {order}, s.id {order}
+    LIMIT %s
+"""
+PENDING_ENROLLMENTS = """
+    SELECT e.id as enrollment_id, s.first_name, s.last_name, e.semester, e.school_year, e.status
+    FROM enrollments e
+    JOIN students s ON e.student_id = s.id
+    WHERE e.status='pending'
+"""
+LATEST_ENROLLMENT = "SELECT id, section FROM enrollments WHERE student_id = %s ORDER BY id DESC LIMIT 1"
+
+# ----------------------------------
+# REGISTRAR ROUTES
+# ----------------------------------
+
+# ----------------------------------
+# REGISTRAR DASHBOARD
+# ----------------------------------
+@bp.route("/registrar/dashboard")
+def registrar_dashboard():
+    if "role" not in session or session["role"] != "registrar":
+        return "Access Denied", 403
+
+    status = request.args.get("status", "")
+    after = request.args.get("after", type=int)    # next page: students after this one
+    before = request.args.get("before", type=int)  # previous page: students before this one
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+
+    # One row per student: the maintained pointer to the latest enrollment, never a
+    # join against every enrollment the student ever had
+    where = []
+    params = []
+    if status == "none":
+        where.append("s.current_enrollment_id IS NULL")
+    elif status:
+        where.append("e.status = %s")
+        params.append(status)
+
+    # Keyset pagination on (last_name, first_name, id), which idx_students_name covers (migration 0010)
+    anchor = None
+    if before or after:
+        cur.execute("SELECT last_name, first_name, id FROM students WHERE id = %s", (before or after,))
+        anchor = cur.fetchone()
+    if anchor:
+        where.append("(s.last_name, s.first_name, s.id) %s (%%s, %%s, %%s)" % ("<" if before else ">"))
+        params += [anchor["last_name"], anchor["first_name"], anchor["id"]]
+    order = "DESC" if anchor and before else "ASC"
+
+    cur.execute(REGISTRAR_STUDENTS.format(where="WHERE " + " AND ".join(where) if where else "", order=order),
+                params + [REGISTRAR_PAGE_SIZE + 1])
+    students = cur.fetchall()
+    conn.close()
+
+    has_more = len(students) > REGISTRAR_PAGE_SIZE
+    students = students[:REGISTRAR_PAGE_SIZE]
+    if anchor and before:
+        students.reverse()
+
+    next_after = prev_before = None
+    if students:
+        if has_more or (anchor and before):
+            next_after = students[-1]["student_id"]
+        if (has_more and before) or (anchor and after):
+            prev_before = students[0]["student_id"]
+
+    return render_template("Registrar/dashboard_registrar.html",
+                           students=students,
+                           filters={"status": status},
+                           next_after=next_after,
+                           prev_before=prev_before)
+@bp.route("/registrar/student/<int:student_id>")
+def registrar_view_student(student_id):
+    if "role" not in session or session["role"] != "registrar":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+
+    # Get student details
+    cur.execute("SELECT * FROM students WHERE id = %s", (student_id,))
+    student = cur.fetchone()
+
+    # Get student active enrollment
+    enrollment = None
+    if student and student["current_enrollment_id"]:
+        cur.execute("SELECT * FROM enrollments WHERE id = %s", (student["current_enrollment_id"],))
+        enrollment = cur.fetchone()
+
+    subjects = []
+    schedule = []
+
+    if enrollment:
+        # enrolled subjects
+        cur.execute("""
+            SELECT es.id, subj.code, subj.title, subj.units
+            FROM enrollment_subjects es
+            JOIN subjects subj ON es.subject_id = subj.id
+            WHERE es.enrollment_id = %s
+        """, (enrollment["id"],))
+        subjects = cur.fetchall()
+
+        # class schedule for each subject
+        cur.execute("""
+            SELECT cs.*, subj.code, subj.title
+            FROM class_schedules cs
+            JOIN subjects subj ON cs.subject_id = subj.id
+            WHERE cs.section = %s AND cs.semester = %s AND subj.id IN (
+                SELECT subject_id FROM enrollment_subjects WHERE enrollment_id = %s
+            )
+            ORDER BY cs.day, cs.time_start
+        """, (enrollment["section"], enrollment["semester"], enrollment["id"]))
+        schedule = cur.fetchall()
+
+    conn.close()
+    return render_template(
+        "Registrar/view_student.html",
+        student=student,
+        enrollment=enrollment,
+        subjects=subjects,
+        schedule=schedule
+    )
+
+
+@bp.route("/registrar/enrollments")
+def registrar_enrollments():
+    if session.get("role") != "registrar":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+    cur.execute(PENDING_ENROLLMENTS)
+    enrollments = cur.fetchall()
+    conn.close()
+    return render_template("enrollment/registrar_enrollments.html", enrollments=enrollments)
+
+@bp.route("/registrar/validate/<int:enrollment_id>")
+def registrar_validate_enrollment(enrollment_id):
+    if "role" not in session or session["role"] != "registrar":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    enrollments.decide(conn, [enrollment_id], "approve")
+    conn.close()
+
+    return redirect("/registrar/dashboard")
+
+
+@bp.route("/registrar/enrollments/batch", methods=["POST"])
+def registrar_batch_decision():
+    if session.get("role") != "registrar":
+        return "Access Denied", 403
+
+    # JSON or form: action=approve|reject plus either ids or filters
+    data = request.get_json(silent=True)
+    if data is None:
+        data = request.form.to_dict()
+        data["ids"] = request.form.getlist("ids") or None
+    action = data.get("action")
+    if action not in enrollments.DECISIONS:
+        return {"error": "action must be 'approve' or 'reject'"}, 400
+
+    ids = data.get("ids")
+
+    conn = get_db_connection()
+    try:
+        if ids is None:
+            filters = {k: data.get(k) or None for k in ("program_id", "section", "semester", "school_year")}
+            if not any(filters.values()):
+                conn.close()
+                return {"error": "give ids or at least one filter (program_id, section, semester, school_year)"}, 400
+            cur = conn.cursor()
+            ids = enrollments.select_pending(cur, **filters)
+            conn.commit()
+        result = enrollments.decide(conn, ids, action)
+    except (TypeError, ValueError):
+        conn.close()
+        return {"error": "ids must be enrollment ids"}, 400
+
+    if result["updated"]:
+        notifications.publish("enrollments_" + result["status"], "Enrollments %s" % result["status"],
+                              "%d enrollment(s) %s by %s" % (result["updated"], result["status"], session.get("username")))
+    conn.close()
+    return result
+
+
+@bp.route("/registrar/export/<name>.<fmt>")
+def registrar_export(name, fmt):
+    if "role" not in session or session["role"] != "registrar":
+        return "Access Denied", 403
+    return exports.export_response(name, fmt)
+
+# ----------------------------------
+# CASHIER ROUTES
+# ----------------------------------
+
+@bp.route("/cashier/dashboard")
+def cashier_dashboard():
+    if "role" not in session or session["role"] != "cashier":
+        return "Access Denied", 403
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+    data = cashier.dashboard(cur)
+    conn.close()
+
+    return render_template("dashboard_cashier.html", **data)
+
+
+@bp.route("/cashier/payments", methods=["POST"])
+def cashier_post_payment():
+    if session.get("role") != "cashier":
+        return "Access Denied", 403
+
+    try:
+        assessment_id = int(request.form.get("assessment_id", ""))
+    except ValueError:
+        return {"error": "assessment_id must be a number"}, 400
+
+    conn = get_db_connection()
+    try:
+        payment_id = cashier.post_payment(conn, assessment_id, request.form.get("amount"),
+                                          request.form.get("date_paid"), request.form.get("reference"),
+                                          session.get("user_id"))
+    except cashier.DuplicatePayment as e:
+        conn.close()
+        return {"error": str(e)}, 409
+    except cashier.PaymentError as e:
+        conn.close()
+        return {"error": str(e)}, 400
+
+    conn.close()
+    return {"payment_id": payment_id}
+
+
+@bp.route("/cashier/payments/batch", methods=["POST"])
+def cashier_post_batch():
+    if session.get("role") != "cashier":
+        return "Access Denied", 403
+
+    upload = request.files.get("file")
+    if not upload or not upload.filename:
+        return {"error": "No file uploaded"}, 400
+    if not upload.filename.lower().endswith((".csv", ".xlsx")):
+        return {"error": "Upload a .csv or .xlsx file"}, 400
+
+    semester, school_year = enrollments.current_term(request.form)
+    conn = get_db_connection()
+    report = cashier.post_batch(conn, upload.stream, upload.filename, semester, school_year,
+                                session.get("user_id"))
+    if report["posted"]:
+        notifications.publish("payments_posted", "Bank file posted",
+                              "%d payment(s), %s total, from %s" % (report["posted"], report["amount"], upload.filename),
+                              ("admin",))
+    conn.close()
+    return report
+
+
+@bp.route("/cashier/assess", methods=["POST"])
+def cashier_assess_term():
+    if session.get("role") != "cashier":
+        return "Access Denied", 403
+
+    # Re-run after fee_rates / misc_fees change; safe to repeat
+    semester, school_year = enrollments.current_term(request.form)
+    conn = get_db_connection()
+    changed = assessments.assess_term(conn, semester, school_year)
+    conn.close()
+    return {"semester": semester, "school_year": school_year, "changed": changed}
+
+# ----------------------------------
+# STUDENT ROUTES
+# ----------------------------------
+
+@bp.route("/student/dashboard")
+def student_dashboard():
+    if session.get("role") != "student":
+        return redirect("/login")
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+
+    cur.execute("""
+        SELECT s.*, p.name AS program_name
+        FROM students s
+        LEFT JOIN programs p ON s.program_id = p.id
+        WHERE s.id = %s
+    """, (session["student_id"],))
+    
+    student = cur.fetchone()
+    conn.close()
+
+    return render_template("student_dashboard.html", student=student, title="Student Dashboard")
+# STEP 1 — STUDENT SELECTS SECTION
+@bp.route("/student/enroll", methods=["GET", "POST"])
+def student_enroll():
+    if "role" not in session or session["role"] != "student":
+        return "Access Denied", 403
+
+    if request.method == "POST":
+        conn = get_db_connection()
+        cur = conn.cursor(dictionary=True)
+
+        student_id = session["student_id"]
+        program_id = request.form["program_id"]
+        year_level = request.form["year_level"]
+        semester = request.form["semester"]
+        school_year = request.form["school_year"]
+        notes = request.form["notes"]
+
+        cur.execute("""
+            INSERT INTO enrollment_requests 
+            (student_id, program_id, year_level, semester, school_year, notes)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, (student_id, program_id, year_level, semester, school_year, notes))
+
+        conn.commit()
+        conn.close()
+        return redirect("/student/dashboard")
+
+    # Programs for dropdown
+    return render_template("Student/enroll.html", programs=refcache.programs())
+
+
+# STEP 2 — DISPLAY SUBJECTS IN SECTION
+@bp.route("/student/enroll/<section>")
+def student_enroll_section(section):
+    if "role" not in session or session["role"] != "student":
+        return "Access Denied", 403
+    
+    student_id = session["student_id"]
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+
+    semester, _ = enrollments.current_term()
+    cur.execute(enrollments.SECTION_OFFERINGS, (section, semester))
+    subjects = cur.fetchall()
+
+    cur.execute("SELECT subject_id FROM student_completed_subjects WHERE student_id = %s", (student_id,))
+    completed = {row["subject_id"] for row in cur.fetchall()}
+
+    try:
+        enrollments.decorate_offerings(subjects, completed)
+    except prereqs.CycleError as e:
+        conn.close()
+        return str(e), 409
+
+    conn.close()
+    return render_template("enrollment/enrollment_subjects.html", section=section, subjects=subjects)  # <- changed
+
+# STEP 3 — SUBMIT & SAVE ENROLLMENT
+@bp.route("/student/enroll/submit", methods=["POST"])
+def student_enroll_submit():
+    if "role" not in session or session["role"] != "student":
+        return "Access Denied", 403
+
+    student_id = session["student_id"]
+    section = request.form["section"]
+    selected_subjects = request.form.getlist("subject_ids")
+    # The server picks the term: it is half of the one-enrollment-per-term key
+    semester, school_year = enrollments.current_term()
+
+    if not selected_subjects:
+        return "No subjects selected"
+
+    conn = get_db_connection()
+    try:
+        # Retries and double-clicks land on the student's existing enrollment for the term
+        enrollment_id, created = enrollments.submit(conn, student_id, section, selected_subjects, semester, school_year)
+    except enrollments.SectionFull as e:
+        conn.close()
+        return str(e), 409
+    except enrollments.EnrollmentError as e:
+        conn.close()
+        return str(e), 400
+
+    if created:
+        notifications.publish("enrollment_submitted", "New enrollment",
+                              "Enrollment #%s for section %s (%s %s) is pending" % (enrollment_id, section, semester, school_year))
+    conn.close()
+    return redirect("/student/enrolled")
+
+# VIEW ENROLLED SUBJECTS
+@bp.route("/student/enrolled")
+def student_enrolled():
+    if "role" not in session or session["role"] != "student":
+        return "Access Denied", 403
+
+    student_id = session["student_id"]
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+
+    cur.execute(LATEST_ENROLLMENT, (student_id,))
+    enrollment = cur.fetchone()
+
+    if not enrollment:
+        return render_template("enrollment/enrollment_view.html", enrolled=[], section=None)  # <- changed
+
+    cur.execute("""
+        SELECT es.id, s.code, s.title, s.units
+        FROM enrollment_subjects es
+        JOIN subjects s ON es.subject_id = s.id
+        WHERE es.enrollment_id = %s
+    """, (enrollment["id"],))
+
+    enrolled_subjects = cur.fetchall()
+    conn.close()
+    return render_template("enrollment/enrollment_view.html", enrolled=enrolled_subjects, section=enrollment["section"])
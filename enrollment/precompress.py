@@ -0,0 +1,76 @@
+import gzip
+import os
+import sys
+
+from compress import brotli
+
+# ----------------------------------
+# STATIC PRECOMPRESSION (build step)
+# ----------------------------------
+# Writes name.css.br / name.css.gz next to each static asset at the highest
+# settings, once, so requests never pay for compressing them (see compress.py,
+# which serves these siblings). Re-run after changing static files; unchanged
+# files are skipped. Siblings that would not be smaller are not written.
+#
+#   python precompress.py            compress static/
+#   python precompress.py --clean    remove the .br / .gz files
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+EXTENSIONS = (".css", ".js", ".svg", ".json", ".html", ".txt", ".map")
+MIN_SIZE = 256
+
+
+def _encoders():
+    encoders = [(".gz", lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        encoders.append((".br", lambda data: brotli.compress(data, quality=11)))
+    return encoders
+
+
+def assets():
+    for root, _, files in os.walk(STATIC_DIR):
+        for filename in sorted(files):
+            if filename.endswith(EXTENSIONS):
+                yield os.path.join(root, filename)
+
+
+def precompress():
+    totals = {"files": 0, "bytes": 0}
+    for path in assets():
+        size = os.path.getsize(path)
+        if size < MIN_SIZE:
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        totals["files"] += 1
+        totals["bytes"] += size
+        for suffix, encode in _encoders():
+            target = path + suffix
+            if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                continue
+            body = encode(data)
+            if len(body) >= size:
+                if os.path.exists(target):
+                    os.remove(target)
+                continue
+            with open(target, "wb") as f:
+                f.write(body)
+            print("%-50s %7d -> %7d %s" % (os.path.relpath(path, STATIC_DIR), size, len(body), suffix))
+    return totals
+
+
+def clean():
+    removed = 0
+    for root, _, files in os.walk(STATIC_DIR):
+        for filename in files:
+            if filename.endswith((".br", ".gz")):
+                os.remove(os.path.join(root, filename))
+                removed += 1
+    return removed
+
+
+if __name__ == "__main__":
+    if "--clean" in sys.argv[1:]:
+        print("%d compressed file(s) removed" % clean())
+    else:
+        totals = precompress()
+        print("%d static file(s), %d bytes checked" % (totals["files"], totals["bytes"]))
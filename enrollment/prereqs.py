@@ -0,0 +1,135 @@
+import threading
+
+import refcache
+
+# ----------------------------------
+# PREREQUISITE GRAPH
+# ----------------------------------
+# subjects.prerequisite_id is an edge subject -> prerequisite. The edges come from the
+# cached subject list (refcache), and the transitive closure (every subject that must
+# be completed first) is computed per program the first time that program is asked
+# for. When the subject list reloads, only the subjects whose edge actually changed,
+# and everything that depends on them, are dropped from the closure cache. Writes
+# are checked by check_edge against the rows themselves, never against the cache.
+
+_lock = threading.Lock()
+_state = {
+    "rows": None,       # refcache subject list the graph was built from
+    "prereq": {},       # subject_id -> prerequisite_id (or None)
+    "program": {},      # subject_id -> program_id
+    "dependents": {},   # prerequisite_id -> {subject_id, ...}
+    "closure": {},      # subject_id -> frozenset of all prerequisites
+    "programs": set(),  # programs whose closures are filled in
+}
+
+
+class CycleError(Exception):
+    pass
+
+
+def _dependents_of(dependents, subject_ids):
+    # subject_ids plus everything that (transitively) requires them
+    seen = set()
+    stack = list(subject_ids)
+    while stack:
+        sid = stack.pop()
+        if sid in seen:
+            continue
+        seen.add(sid)
+        stack.extend(dependents.get(sid, ()))
+    return seen
+
+
+def _refresh(rows):
+    # Caller holds _lock; rows come from refcache.subjects(), read before taking it
+    # so a reload's query never runs with every other request waiting on _lock
+    if rows is _state["rows"]:
+        return
+
+    prereq = {row["id"]: row["prerequisite_id"] for row in rows}
+    program = {row["id"]: row["program_id"] for row in rows}
+    dependents = {}
+    for sid, pid in prereq.items():
+        if pid is not None:
+            dependents.setdefault(pid, set()).add(sid)
+
+    old = _state["prereq"]
+    changed = {sid for sid in prereq.keys() | old.keys() if prereq.get(sid) != old.get(sid)}
+    stale = _dependents_of(dependents, changed) | _dependents_of(_state["dependents"], changed)
+
+    closure = _state["closure"]
+    for sid in stale:
+        closure.pop(sid, None)
+    stale_programs = {program.get(sid) for sid in stale} | {_state["program"].get(sid) for sid in stale}
+
+    _state.update(rows=rows, prereq=prereq, program=program, dependents=dependents)
+    _state["programs"] -= stale_programs
+
+
+def _closure_of(sid, prereq, closure, path=()):
+    if sid in closure:
+        return closure[sid]
+    if sid in path:
+        # A cycle already in the data: report it rather than recurse forever
+        raise CycleError("Prerequisite cycle through subject %s" % sid)
+    pid = prereq.get(sid)
+    result = frozenset() if pid is None else _closure_of(pid, prereq, closure, path + (sid,)) | {pid}
+    closure[sid] = result
+    return result
+
+
+def _ensure_program(program_id):
+    # Caller holds _lock
+    if program_id in _state["programs"]:
+        return
+    prereq, closure = _state["prereq"], _state["closure"]
+    for sid, pid in _state["program"].items():
+        if pid == program_id:
+            _closure_of(sid, prereq, closure)
+    _state["programs"].add(program_id)
+
+
+def closure(subject_ids):
+    # {subject_id: frozenset(all prerequisites)}; CycleError if the data has a loop
+    rows = refcache.subjects()
+    with _lock:
+        _refresh(rows)
+        for program_id in {_state["program"].get(sid) for sid in subject_ids}:
+            _ensure_program(program_id)
+        return {sid: _closure_of(sid, _state["prereq"], _state["closure"]) for sid in subject_ids}
+
+
+def missing(subject_ids, completed):
+    # {subject_id: prerequisites not yet completed}; empty set means eligible
+    completed = set(completed)
+    return {sid: needs - completed for sid, needs in closure(subject_ids).items()}
+
+
+def eligible(subject_ids, completed):
+    return {sid for sid, needs in missing(subject_ids, completed).items() if not needs}
+
+
+def check_edge(cur, subject_id, prerequisite_id):
+    # Raise CycleError if making prerequisite_id a prerequisite of subject_id closes a loop.
+    # Run on the writer's cursor before the UPDATE: the chain is read from subjects, not
+    # the cache, and every row on it is locked FOR UPDATE, so an edit committing on another
+    # connection cannot close the loop between this check and the commit.
+    if prerequisite_id in (None, ""):
+        return
+    subject_id, prerequisite_id = int(subject_id), int(prerequisite_id)
+    if subject_id == prerequisite_id:
+        raise CycleError("A subject cannot be its own prerequisite")
+    seen = set()
+    sid = prerequisite_id
+    while sid is not None:
+        if sid == subject_id:
+            raise CycleError("Subject %s already requires subject %s (directly or indirectly)"
+                             % (prerequisite_id, subject_id))
+        if sid in seen:
+            raise CycleError("Prerequisite cycle through subject %s" % sid)
+        seen.add(sid)
+        cur.execute("SELECT prerequisite_id FROM subjects WHERE id = %s FOR UPDATE", (sid,))
+        row = cur.fetchone()
+        if row is None:
+            break
+        sid = row["prerequisite_id"] if isinstance(row, dict) else row[0]
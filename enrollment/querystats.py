@@ -0,0 +1,206 @@
+import heapq
+import hmac
+import logging
+import os
+import re
+import threading
+import time
+
+from flask import g, request, session
+
+import db
+
+log = logging.getLogger(__name__)
+
+# ----------------------------------
+# PER-REQUEST QUERY STATS
+# ----------------------------------
+# Every cursor handed out during a request is wrapped (see db.PooledConnection.cursor)
+# and reports statement count, DB time, rows fetched and the slowest statements to the
+# request's RequestStats. At the end of the request the numbers are added to
+# per-endpoint totals, served as Prometheus text on /metrics (per worker process).
+# A statement shape run N_PLUS_ONE_THRESHOLD or more times in one request is logged
+# as an N+1 candidate. In debug mode the request's numbers go out as X-DB-Stats.
+#
+# /metrics is for admins and for a scraper that sends "Authorization: Bearer
+# <METRICS_TOKEN>"; with METRICS_TOKEN unset only an admin session gets in.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+N_PLUS_ONE_THRESHOLD = int(os.environ.get("N_PLUS_ONE_THRESHOLD", "5"))
+SLOW_QUERY_SECONDS = float(os.environ.get("SLOW_QUERY_SECONDS", "0.2"))
+SLOWEST_KEPT = 3
+
+_SHAPE_LITERALS = re.compile(r"'(?:[^'\\]|\\.)*'|\b\d+(?:\.\d+)?\b")
+_SHAPE_LISTS = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+
+
+def shape(sql):
+    # "SELECT * FROM t WHERE id IN (%s,%s,%s) AND x = 5" -> "select * from t where id in (?) and x = ?"
+    sql = " ".join(str(sql).split()).lower()
+    sql = _SHAPE_LITERALS.sub("?", sql)
+    return _SHAPE_LISTS.sub("(?)", sql)
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.slowest = []  # min-heap of (seconds, statement)
+        self.shapes = {}
+
+    def record(self, sql, seconds):
+        self.queries += 1
+        self.seconds += seconds
+        statement = shape(sql)
+        self.shapes[statement] = self.shapes.get(statement, 0) + 1
+        item = (seconds, statement)
+        if len(self.slowest) < SLOWEST_KEPT:
+            heapq.heappush(self.slowest, item)
+        elif item > self.slowest[0]:
+            heapq.heapreplace(self.slowest, item)
+        if seconds >= SLOW_QUERY_SECONDS:
+            log.warning("slow query (%.3fs) on %s: %s", seconds, request.endpoint, statement[:300])
+
+    def repeated(self):
+        return {s: n for s, n in self.shapes.items() if n >= N_PLUS_ONE_THRESHOLD}
+
+    def wrap(self, cursor):
+        return InstrumentedCursor(cursor, self)
+
+    def header(self):
+        slow = ", ".join("%.1fms %s" % (sec * 1000, stmt[:60]) for sec, stmt in sorted(self.slowest, reverse=True))
+        return "queries=%d; db_ms=%.1f; rows=%d; n_plus_one=%d; slowest=%s" % (
+            self.queries, self.seconds * 1000, self.rows, len(self.repeated()), slow)
+
+
+class InstrumentedCursor:
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._cursor.__exit__(*exc)
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._stats.rows += 1
+            yield row
+
+    def execute(self, sql, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, *args, **kwargs)
+        finally:
+            self._stats.record(sql, time.perf_counter() - started)
+
+    def executemany(self, sql, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, *args, **kwargs)
+        finally:
+            self._stats.record(sql, time.perf_counter() - started)
+
+    def _fetched(self, rows):
+        self._stats.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        return self._fetched(self._cursor.fetchall())
+
+    def fetchmany(self, *args, **kwargs):
+        return self._fetched(self._cursor.fetchmany(*args, **kwargs))
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows += 1
+        return row
+
+
+# ----------------------------------
+# PER-ENDPOINT TOTALS
+# ----------------------------------
+METRICS = [
+    # (name, type, help)
+    ("app_requests_total", "counter", "Requests handled"),
+    ("app_request_seconds_total", "counter", "Wall time spent in requests"),
+    ("app_db_queries_total", "counter", "SQL statements executed"),
+    ("app_db_seconds_total", "counter", "Time spent executing SQL statements"),
+    ("app_db_rows_total", "counter", "Rows fetched from the database"),
+    ("app_db_n_plus_one_total", "counter", "Requests that repeated one statement shape N_PLUS_ONE_THRESHOLD+ times"),
+]
+
+_lock = threading.Lock()
+_totals = {}  # endpoint -> {metric name: value}
+
+
+def _finish(stats, endpoint):
+    repeated = stats.repeated()
+    for statement, count in repeated.items():
+        log.warning("possible N+1 on %s: %d x %s", endpoint, count, statement[:300])
+
+    with _lock:
+        totals = _totals.setdefault(endpoint, dict.fromkeys((name for name, _, _ in METRICS), 0))
+        totals["app_requests_total"] += 1
+        totals["app_request_seconds_total"] += time.perf_counter() - stats.started
+        totals["app_db_queries_total"] += stats.queries
+        totals["app_db_seconds_total"] += stats.seconds
+        totals["app_db_rows_total"] += stats.rows
+        totals["app_db_n_plus_one_total"] += bool(repeated)
+
+
+def render():
+    lines = []
+    with _lock:
+        totals = {endpoint: dict(values) for endpoint, values in _totals.items()}
+    for name, kind, help_text in METRICS:
+        lines.append("# HELP %s %s" % (name, help_text))
+        lines.append("# TYPE %s %s" % (name, kind))
+        for endpoint in sorted(totals):
+            lines.append('%s{endpoint="%s"} %s' % (name, endpoint, _number(totals[endpoint][name])))
+    for key, value in sorted(db.pool_stats().items()):
+        if isinstance(value, (int, float)):
+            lines.append("# TYPE app_db_pool_%s gauge" % key)
+            lines.append("app_db_pool_%s %s" % (key, _number(value)))
+    return "\n".join(lines) + "\n"
+
+
+def _allowed():
+    if session.get("role") == "admin":
+        return True
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return bool(METRICS_TOKEN) and scheme.lower() == "bearer" and hmac.compare_digest(
+        token.strip().encode("utf-8"), METRICS_TOKEN.encode("utf-8"))
+
+
+def _number(value):
+    return "%d" % value if isinstance(value, int) else "%.6f" % value
+
+
+def init_app(app):
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = RequestStats()
+
+    @app.after_request
+    def finish_query_stats(response):
+        stats = g.pop("query_stats", None)
+        if stats is not None and request.endpoint != "metrics":
+            _finish(stats, request.endpoint or "unmatched")
+            if app.debug:
+                response.headers["X-DB-Stats"] = stats.header()
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        if not _allowed():
+            return "Access Denied", 403
+        return render(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
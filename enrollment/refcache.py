@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+
+from db import get_db_connection
+
+# ----------------------------------
+# REFERENCE DATA CACHE (programs, subjects, instructors)
+# ----------------------------------
+# Each worker keeps the lookup lists in memory together with the version they were
+# loaded at. Writers bump the row in `table_versions`; every worker re-reads that
+# (tiny) table at most once per CHECK_INTERVAL seconds and reloads a list only when
+# its version has moved, so all workers converge within CHECK_INTERVAL.
+CHECK_INTERVAL = float(os.environ.get("REFCACHE_CHECK_INTERVAL", "1.0"))
+
+QUERIES = {
+    "programs": "SELECT id, code, name FROM programs ORDER BY name",
+    "subjects": """
+        SELECT id, code, title, units, program_id, year_level, semester, prerequisite_id
+        FROM subjects ORDER BY title
+    """,
+    "instructors": "SELECT id, first_name, last_name FROM instructors ORDER BY last_name, first_name",
+}
+
+_lock = threading.Lock()
+_versions = {"data": {}, "updated": {}, "checked": 0.0}
+_entries = {}  # name -> (version, rows)
+
+
+def versions():
+    now = time.monotonic()
+    with _lock:
+        if now - _versions["checked"] < CHECK_INTERVAL:
+            return _versions["data"]
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT name, version, updated_at FROM table_versions")
+    rows = cur.fetchall()
+    conn.close()
+
+    data = {name: version for name, version, _ in rows}
+    with _lock:
+        _versions["data"] = data
+        _versions["updated"] = {name: updated for name, _, updated in rows}
+        _versions["checked"] = now
+    return data
+
+
+def updated_at(name):
+    # When `name` last changed (as of the last versions() read), or None
+    versions()
+    with _lock:
+        return _versions["updated"].get(name)
+
+
+def get(name):
+    # Rows are shared between requests: read them, never modify them
+    version = versions().get(name, 0)
+    with _lock:
+        entry = _entries.get(name)
+    if entry and entry[0] == version:
+        return entry[1]
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+    cur.execute(QUERIES[name])
+    rows = cur.fetchall()
+    conn.close()
+
+    with _lock:
+        _entries[name] = (version, rows)
+    return rows
+
+
+def programs():
+    return get("programs")
+
+
+def subjects():
+    return get("subjects")
+
+
+def instructors():
+    return get("instructors")
+
+
+def bump(cur, name):
+    # Call with the writer's cursor before conn.commit()
+    cur.execute("""
+        INSERT INTO table_versions (name, version, updated_at) VALUES (%s, 1, NOW())
+        ON DUPLICATE KEY UPDATE version = version + 1, updated_at = NOW()
+    """, (name,))
+    with _lock:
+        _entries.pop(name, None)
+        _versions["checked"] = 0.0
@@ -0,0 +1,246 @@
+import re
+import threading
+from array import array
+from bisect import bisect_left, insort
+
+import refcache
+from db import get_db_connection
+
+# ----------------------------------
+# TYPEAHEAD SEARCH (students, users, subjects, instructors)
+# ----------------------------------
+# Each worker keeps one in-memory index per kind: a sorted (token, id) list for
+# prefix lookups and trigram -> sorted id arrays for matches inside a word. A query
+# never touches the database. The index remembers the table_versions version it
+# was built at and is rebuilt when another worker's write moves it; writes made
+# through this worker are applied by touch(), which also bumps the version.
+#
+# A published index is never modified, so queries read it without a lock: touch()
+# applies a write to a copy once the writer's transaction commits and swaps the
+# copy in. A rolled-back write leaves the published index alone.
+MIN_TRIGRAM = 3
+DEFAULT_LIMIT = 10
+
+KINDS = {
+    # kind: (query, label, detail)
+    "students": (
+        "SELECT id, student_id, first_name, middle_name, last_name FROM students",
+        lambda r: " ".join(p for p in (r["last_name"] and r["last_name"] + ",", r["first_name"], r["middle_name"]) if p),
+        lambda r: r["student_id"] or "",
+    ),
+    "users": (
+        "SELECT id, username, role FROM users",
+        lambda r: r["username"] or "",
+        lambda r: r["role"] or "",
+    ),
+    "subjects": (
+        "SELECT id, code, title FROM subjects",
+        lambda r: r["title"] or "",
+        lambda r: r["code"] or "",
+    ),
+    "instructors": (
+        "SELECT id, first_name, middle_name, last_name, email FROM instructors",
+        lambda r: " ".join(p for p in (r["last_name"] and r["last_name"] + ",", r["first_name"], r["middle_name"]) if p),
+        lambda r: r["email"] or "",
+    ),
+}
+
+_WORD = re.compile(r"\w+")
+
+
+def tokens(text):
+    return _WORD.findall(str(text or "").lower())
+
+
+def _trigrams(token):
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+class _Index:
+    def __init__(self, version):
+        self.version = version
+        self.docs = {}     # id -> (label, detail, tokens)
+        self.words = []    # sorted (token, id)
+        self.grams = {}    # trigram -> array of ids, sorted
+
+    def build(self, docs):
+        self.docs = docs
+        self.words = sorted((tok, did) for did, (_, _, toks) in docs.items() for tok in toks)
+        grams = {}
+        for did, (_, _, toks) in docs.items():
+            for gram in {g for tok in toks for g in _trigrams(tok)}:
+                grams.setdefault(gram, []).append(did)
+        self.grams = {gram: array("i", sorted(ids)) for gram, ids in grams.items()}
+
+    def copy(self):
+        # Shares the id arrays: add() and remove() replace an array, never edit it
+        other = _Index(self.version)
+        other.docs = dict(self.docs)
+        other.words = list(self.words)
+        other.grams = dict(self.grams)
+        return other
+
+    def remove(self, did):
+        doc = self.docs.pop(did, None)
+        if doc is None:
+            return
+        for tok in doc[2]:
+            i = bisect_left(self.words, (tok, did))
+            if i < len(self.words) and self.words[i] == (tok, did):
+                del self.words[i]
+        for gram in {g for tok in doc[2] for g in _trigrams(tok)}:
+            ids = self.grams.get(gram)
+            if ids is not None and _has(ids, did):
+                ids = array("i", ids)
+                del ids[bisect_left(ids, did)]
+                self.grams[gram] = ids
+
+    def add(self, did, doc):
+        self.remove(did)
+        self.docs[did] = doc
+        for tok in doc[2]:
+            insort(self.words, (tok, did))
+        for gram in {g for tok in doc[2] for g in _trigrams(tok)}:
+            ids = array("i", self.grams.get(gram, ()))
+            ids.insert(bisect_left(ids, did), did)
+            self.grams[gram] = ids
+
+    def _prefixed(self, term):
+        # ids with a token starting with term, in token order
+        i = bisect_left(self.words, (term,))
+        while i < len(self.words) and self.words[i][0].startswith(term):
+            yield self.words[i][1]
+            i += 1
+
+    def _words_match(self, did, terms, inside=False):
+        toks = self.docs[did][2]
+        if inside:
+            return all(any(t in tok if len(t) >= MIN_TRIGRAM else tok.startswith(t) for tok in toks) for t in terms)
+        return all(any(tok.startswith(t) for tok in toks) for t in terms)
+
+    def search(self, query, limit):
+        # Records where every term starts a word come first, then records where a
+        # 3+ letter term only appears inside a word; each group alphabetical
+        terms = sorted(set(tokens(query)), key=len, reverse=True)
+        if not terms:
+            return []
+        label = lambda did: (self.docs[did][0].lower(), did)  # noqa: E731
+
+        # 1. walk the token list from the longest term, stop after `limit` hits
+        prefix_hits = {}
+        for did in self._prefixed(terms[0]):
+            if did not in prefix_hits and self._words_match(did, terms[1:]):
+                prefix_hits[did] = True
+                if len(prefix_hits) >= limit:
+                    break
+        found = sorted(prefix_hits, key=label)
+        if len(found) >= limit or len(terms[0]) < MIN_TRIGRAM:
+            return found
+
+        # 2. fill up from the trigram postings: walk the shortest list, keep ids
+        # present in all the others, check the terms against the words
+        postings = []
+        for term in terms:
+            for gram in _trigrams(term):
+                ids = self.grams.get(gram)
+                if not ids:
+                    return found
+                postings.append(ids)
+        postings.sort(key=len)
+        smallest, rest = postings[0], postings[1:]
+
+        inside_hits = []
+        for did in smallest:
+            if did in prefix_hits or not all(_has(ids, did) for ids in rest):
+                continue
+            if self._words_match(did, terms, inside=True):
+                inside_hits.append(did)
+                if len(found) + len(inside_hits) >= limit:
+                    break
+        return found + sorted(inside_hits, key=label)
+
+
+def _has(ids, did):
+    i = bisect_left(ids, did)
+    return i < len(ids) and ids[i] == did
+
+
+_lock = threading.Lock()
+_build_lock = threading.Lock()
+_indexes = {}  # kind -> _Index
+
+
+def _doc(kind, row):
+    _, label, detail = KINDS[kind]
+    label, detail = label(row), detail(row)
+    return label, detail, tuple(dict.fromkeys(tokens(label) + tokens(detail)))
+
+
+def _load(kind, version):
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+    cur.execute(KINDS[kind][0])
+    index = _Index(version)
+    index.build({row["id"]: _doc(kind, row) for row in cur.fetchall()})
+    conn.close()
+    return index
+
+
+def index(kind):
+    version = refcache.versions().get(kind, 0)
+    with _lock:
+        current = _indexes.get(kind)
+    if current is not None and current.version >= version:
+        return current
+
+    with _build_lock:
+        with _lock:
+            current = _indexes.get(kind)
+        if current is not None and current.version >= version:
+            return current
+        current = _load(kind, version)
+        with _lock:
+            _indexes[kind] = current
+    return current
+
+
+def search(kind, query, limit=DEFAULT_LIMIT):
+    idx = index(kind)
+    return [{"id": did, "label": idx.docs[did][0], "detail": idx.docs[did][1]}
+            for did in idx.search(query, limit)]
+
+
+def _apply(kind, version, ids, docs):
+    # After the commit: if this worker's index was current, publish a copy with the change
+    with _lock:
+        current = _indexes.get(kind)
+        if current is None or current.version != version - 1:
+            return
+        updated = current.copy()
+        for did in ids:
+            if did in docs:
+                updated.add(did, docs[did])
+            else:
+                updated.remove(did)
+        updated.version = version
+        _indexes[kind] = updated
+
+
+def touch(conn, cur, kind, ids):
+    # Call with the writer's connection and cursor before conn.commit(), after the rows
+    # were written (or deleted). Bumps the kind's version like refcache.bump; once the
+    # commit goes through, the change is applied to this worker's index if it was current.
+    ids = [int(i) for i in ids if i is not None]
+    refcache.bump(cur, kind)
+    cur.execute("SELECT version FROM table_versions WHERE name = %s", (kind,))
+    row = cur.fetchone()
+    version = row["version"] if isinstance(row, dict) else row[0]
+
+    rows = []
+    if ids:
+        placeholders = ",".join(["%s"] * len(ids))
+        cur.execute(KINDS[kind][0] + f" WHERE id IN ({placeholders})", ids)
+        rows = [r if isinstance(r, dict) else dict(zip(cur.column_names, r)) for r in cur.fetchall()]
+
+    docs = {r["id"]: _doc(kind, r) for r in rows}
+    conn.after_commit(lambda: _apply(kind, version, ids, docs))
@@ -0,0 +1,244 @@
+import os
+import random
+import threading
+import time
+from datetime import date
+
+from db import get_db_connection
+
+# ----------------------------------
+# DASHBOARD STATISTICS
+# ----------------------------------
+# Counters live in `stat_counters` (name, key, shard, value) and are bumped with the
+# same cursor, inside the same transaction, as the write they describe. Counters
+# every student enrollment touches go to one of SHARDS rows picked at random, so
+# concurrent transactions rarely wait on the same row; readers sum the shards.
+# The dashboard reads them all in one query and keeps the result for DASHBOARD_TTL
+# seconds.
+DASHBOARD_TTL = float(os.environ.get("DASHBOARD_TTL", "10"))
+SHARDS = int(os.environ.get("STAT_COUNTER_SHARDS", "16"))
+TREND_MONTHS = 6
+
+_cache = {"data": None, "expires": 0.0}
+_cache_lock = threading.Lock()
+
+
+def _month(when=None):
+    return (when or date.today()).strftime("%Y-%m")
+
+
+def bump(cur, name, key="", delta=1, sharded=False):
+    if not delta:
+        return
+    shard = random.randrange(SHARDS) if sharded else 0
+    cur.execute("""
+        INSERT INTO stat_counters (name, `key`, shard, value) VALUES (%s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE value = value + %s
+    """, (name, str(key), shard, delta, delta))
+    invalidate()
+
+
+def invalidate():
+    with _cache_lock:
+        _cache["expires"] = 0.0
+
+
+# ----------------------------------
+# WRITE HOOKS (call before conn.commit(); on hot paths, as the last statement)
+# ----------------------------------
+def student_added(cur, program_id, count=1):
+    bump(cur, "students", "", count)
+    bump(cur, "students_by_month", _month(), count)
+    if program_id:
+        bump(cur, "students_by_program", program_id, count)
+
+
+def student_removed(cur, program_id, created_at=None):
+    bump(cur, "students", "", -1)
+    if created_at:
+        bump(cur, "students_by_month", _month(created_at), -1)
+    if program_id:
+        bump(cur, "students_by_program", program_id, -1)
+
+
+def student_moved(cur, old_program_id, new_program_id):
+    if str(old_program_id or "") == str(new_program_id or ""):
+        return
+    if old_program_id:
+        bump(cur, "students_by_program", old_program_id, -1)
+    if new_program_id:
+        bump(cur, "students_by_program", new_program_id, 1)
+
+
+def user_added(cur, role, count=1):
+    bump(cur, "users_by_role", role, count)
+
+
+def user_removed(cur, role):
+    bump(cur, "users_by_role", role, -1)
+
+
+def user_role_changed(cur, old_role, new_role):
+    if old_role != new_role:
+        bump(cur, "users_by_role", old_role, -1)
+        bump(cur, "users_by_role", new_role, 1)
+
+
+def enrollment_added(cur):
+    bump(cur, "enrollments_by_month", _month(), sharded=True)
+
+
+# Money counters are kept in centavos so they fit the bigint value column
+def cents(amount):
+    return int(round(amount * 100))
+
+
+def payment_posted(cur, program_id, amount, day=None, count=1):
+    day = (day or date.today()).isoformat()
+    bump(cur, "payments_by_day", day, count)
+    bump(cur, "collections_by_day", day, cents(amount))
+    bump(cur, "collections_by_program", program_id or "", cents(amount))
+    bump(cur, "outstanding_by_program", program_id or "", -cents(amount), sharded=True)
+
+
+def balance_changed(cur, program_id, delta):
+    # Assessment (re)computed or enrollment rejected: delta = new balance - old balance
+    bump(cur, "outstanding_by_program", program_id or "", cents(delta), sharded=True)
+
+
+# ----------------------------------
+# READ
+# ----------------------------------
+def _load(cur):
+    cur.execute("""
+        SELECT c.name, c.`key`, CAST(SUM(c.value) AS SIGNED) AS value, p.name AS program_name
+        FROM stat_counters c
+        LEFT JOIN programs p ON c.name = 'students_by_program' AND p.id = c.`key`
+        GROUP BY c.name, c.`key`, p.name
+    """)
+    counters = {}
+    program_names = {}
+    for row in cur.fetchall():
+        counters.setdefault(row["name"], {})[row["key"]] = row["value"]
+        if row["program_name"]:
+            program_names[row["key"]] = row["program_name"]
+
+    # Recent students: newest rows by primary key, never a scan
+    cur.execute("""
+        SELECT s.id, s.student_id, s.first_name, s.last_name,
+               s.year_level, s.created_at AS date,
+               p.name AS program_name
+        FROM students s
+        LEFT JOIN programs p ON s.program_id = p.id
+        ORDER BY s.id DESC
+        LIMIT 5
+    """)
+    recent_students = cur.fetchall()
+
+    roles = counters.get("users_by_role", {})
+    by_program = counters.get("students_by_program", {})
+    programs = sorted(((program_names[k], v) for k, v in by_program.items() if k in program_names and v > 0))
+
+    today = date.today()
+    months = []
+    for i in range(TREND_MONTHS - 1, -1, -1):
+        y, m = divmod(today.year * 12 + today.month - 1 - i, 12)
+        months.append(date(y, m + 1, 1))
+    by_month = counters.get("enrollments_by_month", {})
+
+    return {
+        "total_students": counters.get("students", {}).get("", 0),
+        "active_users": sum(roles.values()),
+        "total_admins": roles.get("admin", 0),
+        "new_this_month": counters.get("students_by_month", {}).get(_month(), 0),
+        "months": [m.strftime("%b %Y") for m in months],
+        "enroll_counts": [by_month.get(_month(m), 0) for m in months],
+        "program_labels": [name for name, _ in programs],
+        "program_counts": [count for _, count in programs],
+        "recent_students": recent_students,
+    }
+
+
+def dashboard():
+    now = time.monotonic()
+    with _cache_lock:
+        if _cache["data"] is not None and now < _cache["expires"]:
+            return _cache["data"]
+
+    conn = get_db_connection()
+    cur = conn.cursor(dictionary=True)
+    data = _load(cur)
+    conn.close()
+
+    with _cache_lock:
+        _cache["data"] = data
+        _cache["expires"] = now + DASHBOARD_TTL
+    return data
+
+
+# ----------------------------------
+# REBUILD (backfill or repair drift)
+# ----------------------------------
+def rebuild():
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM stat_counters")
+    cur.execute("""
+        INSERT INTO stat_counters (name, `key`, value)
+        SELECT 'students', '', COUNT(*) FROM students
+    """)
+    cur.execute("""
+        INSERT INTO stat_counters (name, `key`, value)
+        SELECT 'students_by_program', program_id, COUNT(*) FROM students
+        WHERE program_id IS NOT NULL GROUP BY program_id
+    """)
+    cur.execute("""
+        INSERT INTO stat_counters (name, `key`, value)
+        SELECT 'students_by_month', DATE_FORMAT(created_at, '%Y-%m'), COUNT(*) FROM students
+        WHERE created_at IS NOT NULL GROUP BY DATE_FORMAT(created_at, '%Y-%m')
+    """)
+    cur.execute("""
+        INSERT INTO stat_counters (name, `key`, value)
+        SELECT 'users_by_role', role, COUNT(*) FROM users GROUP BY role
+    """)
+    cur.execute("""
+        INSERT INTO stat_counters (name, `key`, value)
+        SELECT 'enrollments_by_month', DATE_FORMAT(created_at, '%Y-%m'), COUNT(*) FROM enrollments
+        WHERE created_at IS NOT NULL GROUP BY DATE_FORMAT(created_at, '%Y-%m')
+    """)
+    cur.execute("""
+        INSERT INTO stat_counters (name, `key`, value)
+        SELECT 'payments_by_day', date_paid, COUNT(*) FROM payments
+        WHERE date_paid IS NOT NULL GROUP BY date_paid
+    """)
+    cur.execute("""
+        INSERT INTO stat_counters (name, `key`, value)
+        SELECT 'collections_by_day', date_paid, ROUND(SUM(amount) * 100) FROM payments
+        WHERE date_paid IS NOT NULL GROUP BY date_paid
+    """)
+    cur.execute("""
+        INSERT INTO stat_counters (name, `key`, value)
+        SELECT 'collections_by_program', COALESCE(s.program_id, ''), ROUND(SUM(p.amount) * 100)
+        FROM payments p
+        JOIN assessments a ON a.id = p.assessment_id
+        JOIN enrollments e ON e.id = a.enrollment_id
+        JOIN students s ON s.id = e.student_id
+        GROUP BY COALESCE(s.program_id, '')
+    """)
+    cur.execute("""
+        INSERT INTO stat_counters (name, `key`, value)
+        SELECT 'outstanding_by_program', COALESCE(s.program_id, ''), ROUND(SUM(a.balance) * 100)
+        FROM assessments a
+        JOIN enrollments e ON e.id = a.enrollment_id
+        JOIN students s ON s.id = e.student_id
+        WHERE e.status <> 'rejected'
+        GROUP BY COALESCE(s.program_id, '')
+    """)
+    conn.commit()
+    conn.close()
+    invalidate()
+
+
+if __name__ == "__main__":
+    rebuild()
+    print("stat_counters rebuilt")
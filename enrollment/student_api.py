@@ -0,0 +1,256 @@
+import asyncio
+import datetime
+import decimal
+import json
+import logging
+import os
+import re
+from http.cookies import SimpleCookie
+from urllib.parse import parse_qs
+
+import aiomysql
+
+import enrollments
+import prereqs
+import refcache
+from db import DB_CONFIG
+from factory import create_app
+
+# ----------------------------------
+# STUDENT READ API (asyncio)
+# ----------------------------------
+# Read-only JSON for the student portal: the student's profile, a section's
+# offerings with seats and prerequisite eligibility, and the current enrollment.
+# It is a plain ASGI app on an aiomysql pool, so one worker holds thousands of
+# slow clients open on a single thread; a connection is taken only while a query
+# runs and is back in the pool before the response is sent.
+#
+#   uvicorn student_api:app --workers 1
+#   gunicorn -k uvicorn.workers.UvicornWorker student_api:app
+#
+# Logins stay on the Flask portal: the API reads the same signed session cookie
+# (same SECRET_KEY, cookie name and lifetime) and accepts role == "student" only.
+# Prerequisite checks use prereqs.py's cached graph, run on a thread because a
+# refresh may read the database through db.py's pool.
+POOL_MIN = int(os.environ.get("API_DB_POOL_MIN", "1"))
+POOL_MAX = int(os.environ.get("API_DB_POOL_SIZE", "20"))
+POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "300"))
+
+log = logging.getLogger(__name__)
+
+_flask = create_app("portal")
+_sessions = _flask.session_interface.get_signing_serializer(_flask)
+_cookie_name = _flask.config["SESSION_COOKIE_NAME"]
+_max_age = int(_flask.permanent_session_lifetime.total_seconds())
+
+_pool = None
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _json_default(value):
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat(sep=" ") if isinstance(value, datetime.datetime) else value.isoformat()
+    if isinstance(value, datetime.timedelta):  # TIME columns
+        minutes = int(value.total_seconds()) // 60
+        return "%02d:%02d" % (minutes // 60, minutes % 60)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError("%r is not JSON serializable" % type(value).__name__)
+
+
+async def _fetchall(sql, params=()):
+    async with _pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
+            await cur.execute(sql, params)
+            return await cur.fetchall()
+
+
+async def _fetchone(sql, params=()):
+    rows = await _fetchall(sql, params)
+    return rows[0] if rows else None
+
+
+def _student(headers):
+    # The Flask portal's session, or HTTPError
+    cookie = SimpleCookie()
+    try:
+        cookie.load(headers.get(b"cookie", b"").decode("latin-1"))
+    except Exception:
+        raise HTTPError(401, "Not logged in")
+    morsel = cookie.get(_cookie_name)
+    if morsel is None:
+        raise HTTPError(401, "Not logged in")
+    try:
+        session = _sessions.loads(morsel.value, max_age=_max_age)
+    except Exception:
+        raise HTTPError(401, "Not logged in")
+    if session.get("role") != "student" or not session.get("student_id"):
+        raise HTTPError(403, "Access Denied")
+    return session["student_id"]
+
+
+async def _missing(subject_ids, completed):
+    try:
+        return await asyncio.to_thread(prereqs.missing, subject_ids, completed)
+    except prereqs.CycleError as e:
+        raise HTTPError(409, str(e))
+
+
+async def _completed(student_id):
+    rows = await _fetchall("SELECT subject_id FROM student_completed_subjects WHERE student_id = %s",
+                           (student_id,))
+    return {row["subject_id"] for row in rows}
+
+
+# ----------------------------------
+# ENDPOINTS
+# ----------------------------------
+async def me(student_id, query):
+    student = await _fetchone("""
+        SELECT s.id, s.student_id, s.first_name, s.middle_name, s.last_name,
+               s.year_level, s.program_id, p.name AS program_name
+        FROM students s
+        LEFT JOIN programs p ON s.program_id = p.id
+        WHERE s.id = %s
+    """, (student_id,))
+    if student is None:
+        raise HTTPError(404, "Student not found")
+    return student
+
+
+async def section_offerings(student_id, query, section):
+    # This term's classes (?semester= to pick another)
+    semester, _ = enrollments.current_term({k: v[-1] for k, v in query.items()})
+    subjects, completed = await asyncio.gather(_fetchall(enrollments.SECTION_OFFERINGS, (section, semester)),
+                                               _completed(student_id))
+    try:
+        await asyncio.to_thread(enrollments.decorate_offerings, subjects, completed)
+    except prereqs.CycleError as e:
+        raise HTTPError(409, str(e))
+    return {"section": section, "semester": semester, "subjects": subjects}
+
+
+async def eligibility(student_id, query):
+    # ?subject_ids=1,2,3 ; without it, every subject of the student's program
+    raw = ",".join(query.get("subject_ids", []))
+    try:
+        subject_ids = {int(sid) for sid in raw.split(",") if sid.strip()}
+    except ValueError:
+        raise HTTPError(400, "subject_ids must be a comma-separated list of ids")
+
+    completed = await _completed(student_id)
+    if not subject_ids:
+        student = await me(student_id, query)
+        subjects = await asyncio.to_thread(refcache.subjects)
+        subject_ids = {s["id"] for s in subjects if s["program_id"] == student["program_id"]}
+
+    needs = await _missing(subject_ids, completed)
+    return {"subjects": [{"subject_id": sid,
+                          "eligible": not needs[sid],
+                          "completed": sid in completed,
+                          "missing_prerequisites": sorted(needs[sid])}
+                         for sid in sorted(subject_ids)]}
+
+
+async def current_enrollment(student_id, query):
+    # This term's enrollment (?semester=&school_year= to pick another), else the latest
+    semester, school_year = enrollments.current_term({k: v[-1] for k, v in query.items()})
+    enrollment = await _fetchone("""
+        SELECT e.id, e.section, e.semester, e.school_year, e.status, e.created_at,
+               a.units, a.tuition, a.misc_fees, a.total_fees, a.balance
+        FROM enrollments e
+        LEFT JOIN assessments a ON a.enrollment_id = e.id
+        WHERE e.student_id = %s
+        ORDER BY (e.semester = %s AND e.school_year = %s) DESC, e.id DESC
+        LIMIT 1
+    """, (student_id, semester, school_year))
+    if enrollment is None:
+        return {"enrollment": None, "subjects": []}
+
+    subjects = await _fetchall("""
+        SELECT s.id AS subject_id, s.code, s.title, s.units,
+               cs.id AS schedule_id, cs.day, cs.time_start, cs.time_end, cs.room,
+               cs.instructor_id, CONCAT(i.first_name, ' ', i.last_name) AS instructor
+        FROM enrollment_subjects es
+        JOIN subjects s ON es.subject_id = s.id
+        LEFT JOIN class_schedules cs
+          ON cs.section = %s AND cs.semester = %s AND cs.subject_id = es.subject_id
+        LEFT JOIN instructors i ON cs.instructor_id = i.id
+        WHERE es.enrollment_id = %s
+        ORDER BY s.code
+    """, (enrollment["section"], enrollment["semester"], enrollment["id"]))
+    return {"enrollment": enrollment, "subjects": subjects}
+
+
+ROUTES = [
+    (re.compile(r"^/api/student/me$"), me),
+    (re.compile(r"^/api/student/sections/(?P<section>[^/]+)$"), section_offerings),
+    (re.compile(r"^/api/student/eligibility$"), eligibility),
+    (re.compile(r"^/api/student/enrollment$"), current_enrollment),
+]
+
+
+# ----------------------------------
+# ASGI APP
+# ----------------------------------
+async def _send_json(send, status, payload):
+    body = json.dumps(payload, default=_json_default).encode("utf-8")
+    await send({"type": "http.response.start", "status": status, "headers": [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode("ascii")),
+        (b"cache-control", b"private, no-store"),
+    ]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _lifespan(receive, send):
+    global _pool
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            _pool = await aiomysql.create_pool(
+                host=DB_CONFIG["host"], port=DB_CONFIG["port"], user=DB_CONFIG["user"],
+                password=DB_CONFIG["password"], db=DB_CONFIG["database"],
+                minsize=POOL_MIN, maxsize=POOL_MAX, pool_recycle=POOL_RECYCLE, autocommit=True)
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if _pool is not None:
+                _pool.close()
+                await _pool.wait_closed()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+
+    for pattern, handler in ROUTES:
+        match = pattern.match(scope["path"])
+        if match:
+            break
+    else:
+        return await _send_json(send, 404, {"error": "Not found"})
+    if scope["method"] not in ("GET", "HEAD"):
+        return await _send_json(send, 405, {"error": "Method not allowed"})
+
+    try:
+        student_id = _student(dict(scope["headers"]))
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        payload = await handler(student_id, query, **match.groupdict())
+    except HTTPError as e:
+        return await _send_json(send, e.status, {"error": e.message})
+    except Exception:
+        log.exception("student API request failed: %s", scope["path"])
+        return await _send_json(send, 500, {"error": "Internal error"})
+    await _send_json(send, 200, payload)
@@ -0,0 +1,312 @@
+import argparse
+import os
+import sys
+import time
+from bisect import bisect_left
+
+import conflicts
+import enrollments
+import refcache
+from db import get_db_connection
+
+# ----------------------------------
+# TIMETABLE GENERATOR
+# ----------------------------------
+# Fills class_schedules for a semester: every section takes each subject of its
+# program, year level and semester (subjects without a semester: every term) once,
+# in one of the `time_slots`, in the smallest free room that seats it, with the
+# least-loaded free instructor who may teach the subject and is available then.
+# Rows already in class_schedules stay where they are and block their room,
+# instructor and section.
+#
+# The search is greedy, hardest classes first (fewest instructor/slot/room options,
+# biggest sections), spreading a section's classes over the week. Classes that
+# could not be placed are moved to the front and the whole pass runs again
+# ("squeaky wheel"), up to ROUNDS times; the best pass is written in one
+# transaction. Busy rooms, instructors and sections are kept per slot, so placing
+# a class is a few set lookups and one bisect over the free rooms.
+#
+#   python timetable.py 1st                 fill in missing classes
+#   python timetable.py 1st --replace       regenerate (classes with enrolled seats stay)
+#   python timetable.py 1st --dry-run       solve and report, write nothing
+#
+# The solve reads class_schedules without locks, as it takes a while. save() locks
+# the semester's rows and writes nothing (ScheduleChanged) if a class was added,
+# removed or, with --replace, took an enrollment in the meantime.
+ROUNDS = int(os.environ.get("TIMETABLE_ROUNDS", "8"))
+PROGRESS_EVERY = int(os.environ.get("TIMETABLE_PROGRESS_EVERY", "2000"))
+WRITE_CHUNK = 1000
+ANY_SIZE = 10 ** 6  # rooms without a capacity seat anyone
+
+
+class ScheduleChanged(Exception):
+    pass
+
+
+def _norm(value):
+    return " ".join(str(value).split()).lower() if value not in (None, "") else None
+
+
+def _clock(minutes):
+    return "%02d:%02d" % (minutes // 60, minutes % 60)
+
+
+class Solver:
+    """
+    slots:       [{"day", "start", "end"}], start/end in minutes
+    rooms:       [{"name", "capacity"}]
+    available:   {instructor_id: set of slot indexes}, absent = every slot
+    tasks:       [{"section", "subject_id", "size", "instructors"}], instructors = [ids]
+                 ([None] when the class goes out without an instructor)
+    fixed:       existing classes, [{"day", "start", "end", "room", "instructor_id", "section"}]
+    """
+
+    def __init__(self, slots, rooms, available, tasks, fixed=(), rounds=ROUNDS):
+        self.slots = slots
+        self.rooms = rooms
+        self.available = available
+        self.tasks = tasks
+        self.rounds = rounds
+        self.placed = []    # (task, slot index, room index, instructor id) of the best pass
+        self.unplaced = list(tasks)
+
+        n = len(slots)
+        # slot -> every slot it overlaps (itself included): taking one blocks them all
+        self.overlaps = [[j for j in range(n)
+                          if _norm(slots[j]["day"]) == _norm(slots[k]["day"])
+                          and slots[j]["start"] < slots[k]["end"] and slots[k]["start"] < slots[j]["end"]]
+                         for k in range(n)]
+        self.room_index = {_norm(room["name"]): i for i, room in enumerate(rooms)}
+        capacities = [room["capacity"] or ANY_SIZE for room in rooms]
+        self._free = [sorted((capacities[i], i) for i in range(len(rooms))) for _ in range(n)]
+        self._instructor_busy = [set() for _ in range(n)]
+        self._section_busy = {}
+        for row in fixed:
+            self._block_fixed(row)
+        self._capacities = sorted(capacities)
+
+    def _block_fixed(self, row):
+        day = _norm(row["day"])
+        for k, slot in enumerate(self.slots):
+            if _norm(slot["day"]) != day or not (slot["start"] < row["end"] and row["start"] < slot["end"]):
+                continue
+            room = self.room_index.get(_norm(row.get("room")))
+            if room is not None:
+                cap = self.rooms[room]["capacity"] or ANY_SIZE
+                i = bisect_left(self._free[k], (cap, room))
+                if i < len(self._free[k]) and self._free[k][i] == (cap, room):
+                    del self._free[k][i]
+            if row.get("instructor_id") is not None:
+                self._instructor_busy[k].add(row["instructor_id"])
+            if row.get("section") is not None:
+                self._section_busy.setdefault(_norm(row["section"]), set()).add(k)
+
+    def _options(self, task):
+        # How many (instructor, slot) pairs and rooms could take this class at all
+        n = len(self.slots)
+        pairs = sum(len(self.available.get(i, ())) if i in self.available else n for i in task["instructors"])
+        rooms = len(self._capacities) - bisect_left(self._capacities, task["size"] or 0)
+        return pairs * rooms
+
+    def _pass(self, order):
+        free = [list(rooms) for rooms in self._free]
+        instructor_busy = [set(busy) for busy in self._instructor_busy]
+        section_busy = {section: set(busy) for section, busy in self._section_busy.items()}
+        load = {}
+        slot_use = [0] * len(self.slots)
+        per_day = {}  # (section, day) -> classes that day
+        placed, failed = [], []
+
+        for done, task in enumerate(order, start=1):
+            section = _norm(task["section"])
+            busy = section_busy.setdefault(section, set())
+            size = task["size"] or 0
+            candidates = sorted((k for k in range(len(self.slots)) if k not in busy),
+                                key=lambda k: (per_day.get((section, self.slots[k]["day"]), 0), slot_use[k], k))
+            choice = None
+            for k in candidates:
+                rooms = free[k]
+                i = bisect_left(rooms, (size, -1))
+                if i == len(rooms):
+                    continue
+                teachers = [t for t in task["instructors"]
+                            if t is None or (t not in instructor_busy[k]
+                                             and (t not in self.available or k in self.available[t]))]
+                if not teachers:
+                    continue
+                choice = (k, rooms[i], min(teachers, key=lambda t: load.get(t, 0)))
+                break
+
+            if choice is None:
+                failed.append(task)
+            else:
+                k, room, teacher = choice
+                for j in self.overlaps[k]:
+                    i = bisect_left(free[j], room)
+                    if i < len(free[j]) and free[j][i] == room:
+                        del free[j][i]
+                    if teacher is not None:
+                        instructor_busy[j].add(teacher)
+                    busy.add(j)
+                load[teacher] = load.get(teacher, 0) + 1
+                slot_use[k] += 1
+                per_day[(section, self.slots[k]["day"])] = per_day.get((section, self.slots[k]["day"]), 0) + 1
+                placed.append((task, k, room[1], teacher))
+
+            if done % PROGRESS_EVERY == 0 and done < len(order):
+                yield done, len(placed)
+        self._last = (placed, failed)
+
+    def run(self):
+        # Generator: yields {"round", "done", "total", "placed"} as it goes; the best
+        # pass ends up in self.placed / self.unplaced
+        order = sorted(self.tasks, key=lambda t: (self._options(t), -(t["size"] or 0), str(t["section"])))
+        total = len(order)
+        for round_no in range(1, self.rounds + 1):
+            for done, placed in self._pass(order):
+                yield {"round": round_no, "done": done, "total": total, "placed": placed}
+            placed, failed = self._last
+            if round_no == 1 or len(failed) < len(self.unplaced):
+                self.placed, self.unplaced = placed, failed
+            yield {"round": round_no, "done": total, "total": total, "placed": len(placed)}
+            if not failed:
+                return
+            hard = {id(task) for task in failed}
+            order = failed + [task for task in order if id(task) not in hard]
+
+
+# ----------------------------------
+# LOADING AND SAVING
+# ----------------------------------
+def _windows(rows):
+    # {key: [(day, start, end)]}
+    found = {}
+    for key, day, start, end in rows:
+        found.setdefault(key, []).append((_norm(day), conflicts.minutes(start), conflicts.minutes(end)))
+    return found
+
+
+def load(cur, semester, program_id=None, replace=False):
+    # Returns (Solver, snapshot); the snapshot is the class_schedules ids the solve
+    # kept and replaced, which save() checks again under lock
+    cur.execute("SELECT day, time_start, time_end FROM time_slots ORDER BY id")
+    slots = [{"day": day, "start": conflicts.minutes(start), "end": conflicts.minutes(end)}
+             for day, start, end in cur.fetchall()]
+
+    cur.execute("SELECT name, capacity FROM rooms ORDER BY capacity, name")
+    rooms = [{"name": name, "capacity": capacity} for name, capacity in cur.fetchall()]
+
+    cur.execute("SELECT instructor_id, day, time_start, time_end FROM instructor_availability")
+    available = {}
+    for instructor_id, windows in _windows(cur.fetchall()).items():
+        available[instructor_id] = {k for k, slot in enumerate(slots)
+                                    if any(day == _norm(slot["day"]) and start <= slot["start"] and slot["end"] <= end
+                                           for day, start, end in windows)}
+
+    cur.execute("SELECT instructor_id, subject_id FROM instructor_subjects")
+    qualified = {}
+    for instructor_id, subject_id in cur.fetchall():
+        qualified.setdefault(subject_id, []).append(instructor_id)
+    everyone = [row["id"] for row in refcache.instructors()] or [None]
+
+    if program_id:
+        cur.execute("SELECT name, program_id, year_level, size FROM sections WHERE program_id = %s ORDER BY name",
+                    (program_id,))
+    else:
+        cur.execute("SELECT name, program_id, year_level, size FROM sections ORDER BY name")
+    sections = cur.fetchall()
+    generated = {_norm(name) for name, _, _, _ in sections}
+
+    cur.execute("""
+        SELECT id, subject_id, day, time_start, time_end, room, instructor_id, section, enrolled_count
+        FROM class_schedules WHERE semester = %s
+    """, (semester,))
+    fixed, replaced, kept, scheduled = [], [], [], set()
+    for sid, subject_id, day, start, end, room, instructor_id, section, enrolled in cur.fetchall():
+        if replace and _norm(section) in generated and not enrolled:
+            replaced.append(sid)
+            continue
+        kept.append(sid)
+        scheduled.add((_norm(section), subject_id))
+        if conflicts.minutes(start) is not None and conflicts.minutes(end) is not None:
+            fixed.append({"day": day, "start": conflicts.minutes(start), "end": conflicts.minutes(end),
+                          "room": room, "instructor_id": instructor_id, "section": section})
+
+    by_level = {}
+    for subject in refcache.subjects():
+        if subject["semester"] not in (None, "") and _norm(subject["semester"]) != _norm(semester):
+            continue
+        by_level.setdefault((subject["program_id"], subject["year_level"]), []).append(subject["id"])
+    tasks = [{"section": name, "subject_id": subject_id, "size": size,
+              "instructors": qualified.get(subject_id, everyone)}
+             for name, sec_program, year_level, size in sections
+             for subject_id in by_level.get((sec_program, year_level), ())
+             if (_norm(name), subject_id) not in scheduled]
+    return Solver(slots, rooms, available, tasks, fixed), {"kept": kept, "replaced": replaced}
+
+
+def _changed(conn, semester):
+    conn.rollback()
+    raise ScheduleChanged("Class schedules for %s changed while the timetable was being generated; "
+                          "run it again" % semester)
+
+
+def save(conn, semester, solver, snapshot):
+    # One transaction: check the semester against the snapshot under lock, drop the
+    # replaced rows, insert the new ones in batches
+    cur = conn.cursor()
+    cur.execute("SELECT id, enrolled_count FROM class_schedules WHERE semester = %s FOR UPDATE", (semester,))
+    current = dict(cur.fetchall())
+    replaced = snapshot["replaced"]
+    if current.keys() != set(snapshot["kept"]) | set(replaced) or any(current[sid] for sid in replaced):
+        _changed(conn, semester)
+    for i in range(0, len(replaced), WRITE_CHUNK):
+        chunk = replaced[i:i + WRITE_CHUNK]
+        cur.execute("DELETE FROM class_schedules WHERE id IN (%s) AND enrolled_count = 0"
+                    % ",".join(["%s"] * len(chunk)), chunk)
+        if cur.rowcount != len(chunk):
+            _changed(conn, semester)
+    rows = [(task["subject_id"], semester, solver.slots[k]["day"],
+             _clock(solver.slots[k]["start"]), _clock(solver.slots[k]["end"]),
+             solver.rooms[room]["name"], teacher, task["section"],
+             task["size"] or solver.rooms[room]["capacity"])
+            for task, k, room, teacher in solver.placed]
+    for i in range(0, len(rows), WRITE_CHUNK):
+        cur.executemany("""
+            INSERT INTO class_schedules
+                (subject_id, semester, day, time_start, time_end, room, instructor_id, section, capacity)
+            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
+        """, rows[i:i + WRITE_CHUNK])
+    refcache.bump(cur, "class_schedules")
+    conn.commit()
+    return len(rows)
+
+
+def describe(progress):
+    return "round %(round)d: %(done)d/%(total)d classes tried, %(placed)d placed" % progress
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate class_schedules for a semester")
+    parser.add_argument("semester", nargs="?", default=enrollments.CURRENT_SEMESTER)
+    parser.add_argument("--program", type=int, help="only this program's sections")
+    parser.add_argument("--replace", action="store_true", help="regenerate the sections' existing classes")
+    parser.add_argument("--dry-run", action="store_true", help="solve and report, write nothing")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    conn = get_db_connection()
+    solver, snapshot = load(conn.cursor(), args.semester, args.program, args.replace)
+    for progress in solver.run():
+        print(describe(progress), file=sys.stderr)
+    try:
+        written = 0 if args.dry_run else save(conn, args.semester, solver, snapshot)
+    except ScheduleChanged as e:
+        sys.exit(str(e))
+    finally:
+        conn.close()
+
+    print("%d class(es) placed, %d unplaced, %d written in %.1fs"
+          % (len(solver.placed), len(solver.unplaced), written, time.perf_counter() - started))
+    for task in solver.unplaced:
+        print("  unplaced: section %s subject #%s" % (task["section"], task["subject_id"]))
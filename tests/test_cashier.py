@@ -0,0 +1,53 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+import cashier
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1500", Decimal("1500.00")),
+    ("1,250.5", Decimal("1250.50")),
+    (" 99.999 ", Decimal("100.00")),
+    (Decimal("0.01"), Decimal("0.01")),
+    (750, Decimal("750.00")),
+])
+def test_parse_amount(value, expected):
+    assert cashier.parse_amount(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "abc", None, "1.2.3", "0", "-5", "0.001"])
+def test_parse_amount_rejects(value):
+    with pytest.raises(cashier.PaymentError):
+        cashier.parse_amount(value)
+
+
+def test_clean_line_by_assessment():
+    line = cashier._clean_line({"reference": " OR-1 ", "amount": "2,000", "date_paid": "2025-08-01",
+                                "assessment_id": "12", "student_id": "2025-0001"})
+    assert line == {"reference": "OR-1", "amount": Decimal("2000.00"), "date_paid": date(2025, 8, 1),
+                    "assessment_id": 12, "student_id": None}
+
+
+def test_clean_line_by_student_number():
+    line = cashier._clean_line({"reference": "OR-2", "amount": 500, "date_paid": datetime(2025, 8, 2, 10, 0),
+                                "student_id": " 2025-0001 "})
+    assert (line["assessment_id"], line["student_id"], line["date_paid"]) == (None, "2025-0001", date(2025, 8, 2))
+
+
+def test_clean_line_defaults_to_today():
+    line = cashier._clean_line({"reference": "OR-3", "amount": "1", "assessment_id": 1})
+    assert line["date_paid"] == date.today()
+
+
+@pytest.mark.parametrize("raw, message", [
+    ({"amount": "1", "assessment_id": 1}, "missing reference"),
+    ({"reference": "OR-4", "amount": "1"}, "missing assessment_id or student_id"),
+    ({"reference": "OR-5", "amount": "1", "assessment_id": "x"}, "assessment_id must be a number"),
+    ({"reference": "OR-6", "amount": "1", "assessment_id": 1, "date_paid": "08/01/2025"}, "YYYY-MM-DD"),
+    ({"reference": "OR-7", "amount": "-1", "assessment_id": 1}, "greater than zero"),
+])
+def test_clean_line_rejects(raw, message):
+    with pytest.raises(cashier.PaymentError, match=message):
+        cashier._clean_line(raw)
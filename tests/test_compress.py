@@ -0,0 +1,79 @@
+import gzip
+
+import pytest
+from flask import Flask, Response
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+import compress
+
+
+def accept(header):
+    return parse_accept_header(header, Accept)
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    monkeypatch.setattr(compress, "brotli", object())
+
+
+def test_negotiate_gzip_only(monkeypatch):
+    monkeypatch.setattr(compress, "brotli", None)
+    assert compress.negotiate(accept("gzip, deflate, br")) == "gzip"
+    assert compress.negotiate(accept("br")) is None
+    assert compress.negotiate(accept("")) is None
+
+
+def test_negotiate_prefers_brotli(with_brotli):
+    assert compress.negotiate(accept("gzip, deflate, br")) == "br"
+    assert compress.negotiate(accept("gzip")) == "gzip"
+
+
+def test_negotiate_honours_q_zero(with_brotli):
+    assert compress.negotiate(accept("br;q=0, gzip")) == "gzip"
+    assert compress.negotiate(accept("br;q=0, gzip;q=0")) is None
+    assert compress.negotiate(accept("*")) == "br"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(compress, "brotli", None)
+    app = Flask(__name__)
+    compress.init_app(app)
+
+    @app.route("/page")
+    def page():
+        response = Response("<p>row</p>" * 500, mimetype="text/html")
+        response.set_etag("abc")
+        return response
+
+    @app.route("/small")
+    def small():
+        return "<p>tiny</p>"
+
+    @app.route("/stream")
+    def stream():
+        return Response((("line %d\n" % i) for i in range(100)), mimetype="text/csv")
+
+    return app.test_client()
+
+
+def test_compresses_large_responses_and_weakens_the_etag(client):
+    response = client.get("/page", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.headers["ETag"] == 'W/"abc"'
+    assert gzip.decompress(response.data) == b"<p>row</p>" * 500
+
+
+def test_leaves_small_and_unaccepted_responses_alone(client):
+    assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    response = client.get("/page")
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["ETag"] == '"abc"'
+
+
+def test_compresses_streams(client):
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data) == "".join("line %d\n" % i for i in range(100)).encode()
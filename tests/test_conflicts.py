@@ -0,0 +1,70 @@
+import datetime
+import random
+
+import pytest
+
+import conflicts
+
+
+def test_index_matches_brute_force():
+    rng = random.Random(7)
+    index = conflicts._Index()
+    items = []
+    for schedule_id in range(300):
+        start = rng.randrange(420, 1260, 15)
+        end = start + rng.choice([30, 60, 90, 180, 300])
+        index.add(start, end, schedule_id)
+        items.append((start, end, schedule_id))
+
+    for _ in range(200):
+        start = rng.randrange(400, 1300, 5)
+        end = start + rng.randrange(5, 240, 5)
+        expected = {item for item in items if item[0] < end and start < item[1]}
+        assert set(index.overlapping(start, end)) == expected
+
+
+def test_index_touching_intervals_do_not_overlap():
+    index = conflicts._Index()
+    index.add(480, 570, 1)
+    assert index.overlapping(570, 660) == []
+    assert index.overlapping(390, 480) == []
+    assert index.overlapping(569, 600) == [(480, 570, 1)]
+
+
+def test_index_longest_interval_is_found_from_far_behind():
+    index = conflicts._Index()
+    index.add(420, 1200, 1)  # all-day block
+    for i in range(10):
+        index.add(900 + i * 10, 905 + i * 10, 10 + i)
+    assert (420, 1200, 1) in index.overlapping(1150, 1160)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("08:00", 480), ("8:05", 485), ("13:30:00", 810), (" 07:15 ", 435),
+    (datetime.timedelta(hours=9, minutes=30), 570), (datetime.time(10, 45), 645),
+    ("", None), (None, None),
+])
+def test_minutes(value, expected):
+    assert conflicts.minutes(value) == expected
+
+
+@pytest.mark.parametrize("value", ["8am", "08", "24:00", "12:60", "noon", "8:5"])
+def test_minutes_rejects_malformed_times(value):
+    with pytest.raises(conflicts.InvalidTime):
+        conflicts.minutes(value)
+
+
+def test_check_rejects_end_before_start():
+    with pytest.raises(conflicts.InvalidTime):
+        conflicts.check({"semester": "1st", "day": "Mon", "time_start": "10:00", "time_end": "09:00"})
+
+
+def test_overlaps_within_same_day_only():
+    rows = [
+        {"id": 1, "day": "Mon", "time_start": "08:00", "time_end": "09:30"},
+        {"id": 2, "day": "mon", "time_start": "09:00", "time_end": "10:00"},
+        {"id": 3, "day": "Tue", "time_start": "08:00", "time_end": "09:30"},
+        {"id": 4, "day": "Mon", "time_start": "10:00", "time_end": "11:00"},
+    ]
+    found = conflicts.overlaps_within(rows)
+    assert [(c["schedule_id"], c["other_id"]) for c in found] == [(1, 2)]
@@ -0,0 +1,229 @@
+import datetime
+from decimal import Decimal
+
+import mysql.connector
+import pytest
+from mysql.connector import errorcode
+
+import enrollments
+import refcache
+
+
+class FakeConn:
+    # Answers each statement from `script`: the first (substring, answer) pair whose
+    # substring is in the SQL. An answer is a list of rows, an int rowcount, an
+    # exception to raise, or a callable(params) returning one of those.
+    def __init__(self, script):
+        self.script = script
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        pass
+
+    def ran(self, fragment):
+        return [params for sql, params in self.statements if fragment in sql]
+
+
+class FakeCursor:
+    lastrowid = 40
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=()):
+        sql = " ".join(sql.split())
+        self.conn.statements.append((sql, params))
+        answer = next((answer for key, answer in self.conn.script if key in sql), [])
+        if callable(answer):
+            answer = answer(params)
+        if isinstance(answer, Exception):
+            raise answer
+        if isinstance(answer, int):
+            self.rows, self.rowcount = [], answer
+        else:
+            self.rows, self.rowcount = list(answer), len(answer)
+
+    def executemany(self, sql, seq):
+        seq = list(seq)
+        self.conn.statements.append((" ".join(sql.split()), seq))
+        self.rowcount = len(seq)
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return self.rows
+
+
+def hours(h, m=0):
+    return datetime.timedelta(hours=h, minutes=m)
+
+
+OFFERED = [(100, 1, "Mon", hours(8), hours(9, 30)), (101, 2, "Tue", hours(8), hours(9, 30))]
+
+
+@pytest.fixture(autouse=True)
+def subjects(monkeypatch):
+    rows = [{"id": 1, "prerequisite_id": None, "program_id": 10},
+            {"id": 2, "prerequisite_id": None, "program_id": 10},
+            {"id": 3, "prerequisite_id": 1, "program_id": 10}]
+    monkeypatch.setattr(refcache, "subjects", lambda: rows)
+
+
+def submit_script(**overrides):
+    script = {
+        "SELECT id FROM enrollments": [],
+        "FROM class_schedules cs": OFFERED,
+        "FROM student_completed_subjects": [],
+        "INSERT INTO enrollments": 1,
+        "UPDATE class_schedules": 2,
+        "INSERT INTO assessments": 1,
+        "SUM(a.balance)": [(10, Decimal("3000.00"))],
+    }
+    script.update(overrides)
+    return list(script.items())
+
+
+def submit(conn, subject_ids=("2", "1", "1")):
+    return enrollments.submit(conn, 7, "BSCS-1A", list(subject_ids), "1st", "2025-2026")
+
+
+# ----------------------------------
+# SUBMIT
+# ----------------------------------
+def test_submit_creates_the_enrollment_in_one_transaction():
+    conn = FakeConn(submit_script())
+    assert submit(conn) == (40, True)
+    assert (conn.commits, conn.rollbacks) == (1, 0)
+
+    assert conn.ran("FROM class_schedules cs")[0] == ["BSCS-1A", "1st", 1, 2]
+    assert conn.ran("INSERT INTO enrollment_subjects")[0] == [(40, 1), (40, 2)]
+    assert conn.ran("UPDATE class_schedules")[0] == [100, 101]
+    # shared counters come after the seats, right before the commit
+    sqls = [sql for sql, _ in conn.statements]
+    seats = next(i for i, sql in enumerate(sqls) if sql.startswith("UPDATE class_schedules"))
+    counters = [i for i, sql in enumerate(sqls) if "INSERT INTO stat_counters" in sql]
+    assert len(counters) == 2 and min(counters) > seats
+    assert conn.ran("INSERT INTO stat_counters")[1][3] == 300000  # balance in centavos
+
+
+def test_submit_returns_the_existing_enrollment_for_the_term():
+    conn = FakeConn(submit_script(**{"SELECT id FROM enrollments": [(9,)]}))
+    assert submit(conn) == (9, False)
+    assert conn.ran("INSERT") == [] and conn.commits == 0
+    assert conn.ran("SELECT id FROM enrollments")[0] == (7, "1st", "2025-2026")
+
+
+def test_submit_losing_the_race_returns_the_winner():
+    lookups = iter([[], [(12,)]])
+    duplicate = mysql.connector.IntegrityError(msg="Duplicate entry", errno=errorcode.ER_DUP_ENTRY)
+    conn = FakeConn(submit_script(**{"SELECT id FROM enrollments": lambda params: next(lookups),
+                                     "INSERT INTO enrollments": duplicate}))
+    assert submit(conn) == (12, False)
+    assert (conn.commits, conn.rollbacks) == (0, 1)
+
+
+def test_submit_reraises_other_integrity_errors():
+    broken = mysql.connector.IntegrityError(msg="foreign key", errno=errorcode.ER_NO_REFERENCED_ROW_2)
+    conn = FakeConn(submit_script(**{"INSERT INTO enrollments": broken}))
+    with pytest.raises(mysql.connector.IntegrityError):
+        submit(conn)
+    assert conn.rollbacks == 1
+
+
+def test_submit_full_section_rolls_everything_back():
+    conn = FakeConn(submit_script(**{"UPDATE class_schedules": 1}))
+    with pytest.raises(enrollments.SectionFull):
+        submit(conn)
+    assert (conn.commits, conn.rollbacks) == (0, 1)
+    assert conn.ran("INSERT INTO stat_counters") == []
+
+
+@pytest.mark.parametrize("overrides, subject_ids, message", [
+    ({}, ["x"], "Invalid subject selection"),
+    ({}, [], "No subjects selected"),
+    ({"FROM class_schedules cs": OFFERED[:1]}, ["1", "2"], "not offered in section BSCS-1A"),
+    ({"FROM class_schedules cs": [(102, 3, "Wed", hours(8), hours(9))]}, ["3"], "Prerequisites not met"),
+    ({"FROM class_schedules cs": [OFFERED[0], (101, 2, "Mon", hours(9), hours(10))]}, ["1", "2"],
+     "Schedule conflict"),
+])
+def test_submit_rejects_invalid_selections(overrides, subject_ids, message):
+    conn = FakeConn(submit_script(**overrides))
+    with pytest.raises(enrollments.EnrollmentError, match=message):
+        submit(conn, subject_ids)
+    assert conn.ran("INSERT") == [] and conn.commits == 0
+
+
+# ----------------------------------
+# DECIDE / RELEASE SEATS
+# ----------------------------------
+def test_approve_in_chunks(monkeypatch):
+    monkeypatch.setattr(enrollments, "DECISION_CHUNK", 2)
+    conn = FakeConn([("UPDATE enrollments SET", lambda params: len(params) - 1)])
+    result = enrollments.decide(conn, ["3", 1, 2, 3, 5], "approve")
+    assert conn.ran("UPDATE enrollments SET") == [["approved", 1, 2], ["approved", 3, 5]]
+    assert conn.ran("class_schedules") == []
+    assert conn.commits == 2
+    assert result == {"action": "approve", "status": "approved", "requested": 4, "updated": 4, "skipped": 0}
+
+
+def test_reject_releases_seats_of_still_pending_rows_only():
+    conn = FakeConn([
+        ("SUM(a.balance)", [(10, Decimal("1500.00"))]),
+        ("FOR UPDATE", [(1,), (3,)]),          # 2 was decided by someone else meanwhile
+        ("UPDATE enrollments SET", 2),
+    ])
+    result = enrollments.decide(conn, [1, 2, 3], "reject")
+    assert conn.ran("UPDATE class_schedules cs") == [[1, 3]]
+    assert conn.ran("UPDATE enrollments SET") == [["rejected", 1, 3]]
+    assert conn.ran("INSERT INTO stat_counters")[0][3] == -150000
+    assert (result["updated"], result["skipped"], conn.commits) == (2, 1, 1)
+
+
+def test_reject_with_nothing_pending_changes_nothing():
+    conn = FakeConn([("FOR UPDATE", [])])
+    result = enrollments.decide(conn, [4], "reject")
+    assert conn.ran("UPDATE enrollments SET") == conn.ran("UPDATE class_schedules") == []
+    assert conn.commits == 1
+    assert (result["updated"], result["skipped"]) == (0, 1)
+
+
+def test_release_seats_matches_the_enrollments_term():
+    conn = FakeConn([])
+    cur = conn.cursor()
+    enrollments.release_seats(cur, [])
+    assert conn.statements == []
+    enrollments.release_seats(cur, [5, 6])
+    sql, params = conn.statements[0]
+    assert "cs2.section = e.section AND cs2.semester = e.semester" in sql
+    assert params == [5, 6]
+
+
+def test_portal_submit_ignores_a_posted_term(monkeypatch):
+    import factory
+    import portal_views
+
+    calls = []
+    monkeypatch.setattr(portal_views, "get_db_connection", lambda: FakeConn([]))
+    monkeypatch.setattr(enrollments, "submit", lambda conn, *args: calls.append(args) or (9, False))
+    client = factory.create_app("portal").test_client()
+    with client.session_transaction() as session:
+        session.update(role="student", student_id=7)
+
+    response = client.post("/student/enroll/submit", data={"section": "BSCS-1A", "subject_ids": ["1", "2"],
+                                                          "semester": "Summer", "school_year": "1999-2000"})
+    assert response.status_code == 302
+    assert calls == [(7, "BSCS-1A", ["1", "2"], enrollments.CURRENT_SEMESTER, enrollments.CURRENT_SCHOOL_YEAR)]
@@ -0,0 +1,75 @@
+import datetime
+
+import pytest
+from flask import Flask, session
+
+import pagecache
+
+
+@pytest.fixture
+def app(monkeypatch):
+    versions = {"programs": (3, datetime.datetime(2025, 8, 1, 9, 0))}
+
+    class Conn:
+        def cursor(self):
+            return self
+
+        def execute(self, sql, params):
+            self.rows = [(name, *versions[name]) for name in params if name in versions]
+
+        def fetchall(self):
+            return self.rows
+
+        def close(self):
+            pass
+
+    reads = []
+    monkeypatch.setattr(pagecache, "get_db_connection", lambda: reads.append(1) or Conn())
+    monkeypatch.setattr(pagecache, "_pages", type(pagecache._pages)())
+
+    app = Flask(__name__)
+    app.secret_key = "test"
+    renders = []
+
+    @app.route("/programs")
+    @pagecache.conditional("programs", role="admin")
+    def programs():
+        renders.append(1)
+        return "<p>programs v%d</p>" % versions["programs"][0]
+
+    @app.route("/login-as/<role>")
+    def login_as(role):
+        session["role"] = role
+        return ""
+
+    app.versions, app.reads, app.renders = versions, reads, renders
+    return app
+
+
+def test_other_roles_get_403_before_any_lookup(app):
+    client = app.test_client()
+    response = client.get("/programs", headers={"If-Modified-Since": "Wed, 01 Jan 2031 00:00:00 GMT"})
+    assert response.status_code == 403
+    client.get("/login-as/registrar")
+    assert client.get("/programs").status_code == 403
+    assert app.reads == [] and app.renders == []
+
+
+def test_304_and_cached_page_follow_the_committed_version(app):
+    client = app.test_client()
+    client.get("/login-as/admin")
+    first = client.get("/programs")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.last_modified == datetime.datetime(2025, 8, 1, 9, 0,
+                                                                                tzinfo=datetime.timezone.utc)
+
+    assert client.get("/programs", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/programs").data == b"<p>programs v3</p>"
+    assert len(app.renders) == 1
+
+    # A write committed elsewhere: the very next request sees the new version
+    app.versions["programs"] = (4, datetime.datetime(2025, 8, 1, 9, 5))
+    response = client.get("/programs", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.data == b"<p>programs v4</p>"
+    assert response.headers["ETag"] != etag
+    assert len(app.reads) == 4
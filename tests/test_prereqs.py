@@ -0,0 +1,81 @@
+import pytest
+
+import prereqs
+import refcache
+
+
+def test_closure_of_follows_the_chain():
+    prereq = {1: None, 2: 1, 3: 2, 4: 2, 5: None}
+    closure = {}
+    assert prereqs._closure_of(4, prereq, closure) == {1, 2}
+    assert prereqs._closure_of(3, prereq, closure) == {1, 2}
+    assert prereqs._closure_of(5, prereq, closure) == frozenset()
+    # every subject on the way is cached
+    assert closure[2] == {1} and closure[1] == frozenset()
+
+
+def test_closure_of_reports_a_cycle():
+    prereq = {1: 3, 2: 1, 3: 2, 4: 1}
+    with pytest.raises(prereqs.CycleError):
+        prereqs._closure_of(4, prereq, {})
+
+
+def test_closure_of_reports_a_self_loop():
+    with pytest.raises(prereqs.CycleError):
+        prereqs._closure_of(1, {1: 1}, {})
+
+
+def test_missing_and_refresh(monkeypatch):
+    rows = [
+        {"id": 1, "prerequisite_id": None, "program_id": 10},
+        {"id": 2, "prerequisite_id": 1, "program_id": 10},
+        {"id": 3, "prerequisite_id": 2, "program_id": 10},
+    ]
+    monkeypatch.setattr(refcache, "subjects", lambda: rows)
+    assert prereqs.missing({2, 3}, {1}) == {2: set(), 3: {2}}
+    assert prereqs.eligible({1, 2, 3}, {1}) == {1, 2}
+
+    # A new subject list: only the changed edge and its dependents are recomputed
+    rows = [dict(row) for row in rows]
+    rows[1]["prerequisite_id"] = None
+    assert prereqs.missing({3}, set()) == {3: {2}}
+
+
+class ChainCursor:
+    # Answers the prerequisite walk from a dict, recording each locked row
+    def __init__(self, prereq, dictionary=False):
+        self.prereq, self.dictionary, self.locked = prereq, dictionary, []
+
+    def execute(self, sql, params):
+        assert "FOR UPDATE" in sql
+        self.locked.append(params[0])
+        self.sid = params[0]
+
+    def fetchone(self):
+        if self.sid not in self.prereq:
+            return None
+        pid = self.prereq[self.sid]
+        return {"prerequisite_id": pid} if self.dictionary else (pid,)
+
+
+def test_check_edge(monkeypatch):
+    # The cache is stale (no edges at all); the check must go by the rows
+    monkeypatch.setattr(refcache, "subjects", lambda: [])
+    prereq = {1: None, 2: 1, 3: 2}
+    cur = ChainCursor(prereq, dictionary=True)
+    prereqs.check_edge(cur, 3, 1)
+    assert cur.locked == [1]
+    prereqs.check_edge(cur, 3, "")
+    cur = ChainCursor(prereq)
+    with pytest.raises(prereqs.CycleError):
+        prereqs.check_edge(cur, 1, 3)
+    assert cur.locked == [3, 2]
+    with pytest.raises(prereqs.CycleError):
+        prereqs.check_edge(cur, 2, 2)
+
+
+def test_check_edge_stops_on_a_loop_in_the_data():
+    cur = ChainCursor({1: 2, 2: 1})
+    with pytest.raises(prereqs.CycleError):
+        prereqs.check_edge(cur, 5, 1)
+    assert cur.locked == [1, 2]
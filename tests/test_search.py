@@ -0,0 +1,66 @@
+import search
+
+
+def make_index(rows):
+    index = search._Index(1)
+    index.build({row["id"]: search._doc("students", row) for row in rows})
+    return index
+
+
+ROWS = [
+    {"id": 1, "student_id": "2025-0001", "first_name": "Maria", "middle_name": "Santos", "last_name": "Reyes"},
+    {"id": 2, "student_id": "2025-0002", "first_name": "Mario", "middle_name": None, "last_name": "Cruz"},
+    {"id": 3, "student_id": "2025-0003", "first_name": "Ana", "middle_name": "Maria", "last_name": "Delacruz"},
+    {"id": 4, "student_id": "2024-0104", "first_name": "Jose", "middle_name": None, "last_name": "Rizal"},
+]
+
+
+def test_doc_label_and_tokens():
+    label, detail, tokens = search._doc("students", ROWS[0])
+    assert (label, detail) == ("Reyes, Maria Santos", "2025-0001")
+    assert tokens == ("reyes", "maria", "santos", "2025", "0001")
+
+
+def test_prefix_matches_sorted_by_label():
+    index = make_index(ROWS)
+    assert index.search("mari", 10) == [2, 3, 1]
+    assert index.search("MARIA", 10) == [3, 1]
+
+
+def test_every_term_must_match():
+    index = make_index(ROWS)
+    assert index.search("maria reyes", 10) == [1]
+    assert index.search("maria 2025-0003", 10) == [3]
+    assert index.search("maria rizal", 10) == []
+
+
+def test_inside_word_matches_come_after_prefix_matches():
+    index = make_index(ROWS)
+    # "cruz" starts a word of Cruz and is inside Delacruz
+    assert index.search("cruz", 10) == [2, 3]
+    # terms under three letters only match word starts
+    assert index.search("ru", 10) == []
+
+
+def test_limit():
+    index = make_index(ROWS)
+    assert len(index.search("2025", 2)) == 2
+    assert index.search("", 10) == []
+
+
+def test_copy_add_and_remove_leave_the_original_alone():
+    index = make_index(ROWS)
+    words, grams = list(index.words), {gram: list(ids) for gram, ids in index.grams.items()}
+
+    updated = index.copy()
+    updated.remove(2)
+    updated.add(5, search._doc("students", {"id": 5, "student_id": "2025-0005", "first_name": "Marian",
+                                            "middle_name": None, "last_name": "Lopez"}))
+    updated.add(1, search._doc("students", dict(ROWS[0], last_name="Ramos")))
+
+    assert updated.search("mari", 10) == [3, 5, 1]
+    assert updated.search("reyes", 10) == []
+    assert index.search("mari", 10) == [2, 3, 1]
+    assert index.search("reyes", 10) == [1]
+    assert index.words == words
+    assert {gram: list(ids) for gram, ids in index.grams.items()} == grams
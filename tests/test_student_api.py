@@ -0,0 +1,218 @@
+import asyncio
+import datetime
+import json
+import sys
+import types
+
+import pytest
+
+# student_api needs only aiomysql.DictCursor and create_pool at import time; the
+# pool itself is replaced per test, so the real driver is never needed here.
+sys.modules.setdefault("aiomysql", types.SimpleNamespace(DictCursor=object, create_pool=None))
+
+import refcache  # noqa: E402
+import student_api  # noqa: E402
+
+
+class FakePool:
+    # Answers each query with the rows of the first `responses` key found in its SQL
+    def __init__(self, responses):
+        self.responses = responses
+        self.queries = []
+
+    def acquire(self):
+        return _Context(_FakeConn(self))
+
+
+class _Context:
+    def __init__(self, value):
+        self.value = value
+
+    async def __aenter__(self):
+        return self.value
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _FakeConn:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def cursor(self, cursor_class):
+        return _Context(_FakeCursor(self.pool))
+
+
+class _FakeCursor:
+    def __init__(self, pool):
+        self.pool = pool
+        self.rows = []
+
+    async def execute(self, sql, params=()):
+        self.pool.queries.append((sql, params))
+        for key, rows in self.pool.responses.items():
+            if key in sql:
+                self.rows = [dict(row) for row in rows]
+                return
+        raise AssertionError("unexpected query: %s" % sql)
+
+    async def fetchall(self):
+        return self.rows
+
+
+SUBJECTS = [
+    {"id": 1, "prerequisite_id": None, "program_id": 10},
+    {"id": 2, "prerequisite_id": 1, "program_id": 10},
+    {"id": 3, "prerequisite_id": 2, "program_id": 10},
+    {"id": 4, "prerequisite_id": None, "program_id": 20},
+]
+
+OFFERINGS = [
+    {"schedule_id": 100, "subject_id": 2, "code": "CS102", "title": "Programming 2", "units": 3,
+     "prerequisite_id": 1, "day": "Mon", "time_start": datetime.timedelta(hours=8),
+     "time_end": datetime.timedelta(hours=9, minutes=30), "room": "R1", "instructor_id": 5,
+     "instructor": "Ada Lovelace", "capacity": 30, "enrolled_count": 30},
+    {"schedule_id": 101, "subject_id": 3, "code": "CS103", "title": "Data Structures", "units": 3,
+     "prerequisite_id": 2, "day": "Tue", "time_start": datetime.timedelta(hours=10),
+     "time_end": datetime.timedelta(hours=11, minutes=30), "room": "R2", "instructor_id": None,
+     "instructor": None, "capacity": None, "enrolled_count": 4},
+]
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    # A fresh list each time, so prereqs rebuilds its graph from it
+    monkeypatch.setattr(refcache, "subjects", lambda: [dict(row) for row in SUBJECTS])
+    fake = FakePool({
+        "FROM student_completed_subjects": [{"subject_id": 1}],
+        "FROM students s": [{"id": 7, "student_id": "2025-0007", "first_name": "Grace", "middle_name": None,
+                             "last_name": "Hopper", "year_level": 2, "program_id": 10,
+                             "program_name": "Computer Science"}],
+        "FROM class_schedules cs": OFFERINGS,
+        "FROM enrollments e": [],
+    })
+    monkeypatch.setattr(student_api, "_pool", fake)
+    return fake
+
+
+def cookie(**session):
+    return "%s=%s" % (student_api._cookie_name, student_api._sessions.dumps(session))
+
+
+def call(path, cookie_header=None, method="GET", query=b""):
+    headers = [(b"cookie", cookie_header.encode("latin-1"))] if cookie_header else []
+    scope = {"type": "http", "method": method, "path": path, "query_string": query, "headers": headers}
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(student_api.app(scope, receive, send))
+    return sent[0]["status"], json.loads(sent[1]["body"])
+
+
+STUDENT = cookie(role="student", student_id=7)
+
+
+def test_requires_a_session(pool):
+    assert call("/api/student/me") == (401, {"error": "Not logged in"})
+    assert call("/api/student/me", "%s=forged" % student_api._cookie_name)[0] == 401
+    assert pool.queries == []
+
+
+def test_rejects_other_roles(pool):
+    assert call("/api/student/me", cookie(role="admin", user_id=1)) == (403, {"error": "Access Denied"})
+    assert call("/api/student/me", cookie(role="student")) == (403, {"error": "Access Denied"})
+
+
+def test_unknown_path_and_method(pool):
+    assert call("/api/student/nothing", STUDENT)[0] == 404
+    assert call("/api/student/me", STUDENT, method="POST")[0] == 405
+
+
+def test_me(pool):
+    status, body = call("/api/student/me", STUDENT)
+    assert status == 200
+    assert body["program_name"] == "Computer Science"
+    assert pool.queries[0][1] == (7,)
+
+
+def test_me_not_found(pool):
+    pool.responses["FROM students s"] = []
+    assert call("/api/student/me", STUDENT) == (404, {"error": "Student not found"})
+
+
+def test_section_offerings(pool):
+    status, body = call("/api/student/sections/BSCS-2A", STUDENT)
+    assert status == 200
+    assert body["section"] == "BSCS-2A"
+    full, blocked = body["subjects"]
+    assert full["instructor"] == "Ada Lovelace"
+    assert (full["blocked"], full["seats_left"], full["full"]) == (False, 0, True)
+    assert (full["time_start"], full["time_end"]) == ("08:00", "09:30")
+    assert blocked["missing_prerequisites"] == [2]
+    assert (blocked["blocked"], blocked["seats_left"], blocked["full"]) == (True, None, False)
+
+    sql, params = next((sql, params) for sql, params in pool.queries if "FROM class_schedules cs" in sql)
+    assert "LEFT JOIN instructors i ON cs.instructor_id = i.id" in sql
+    assert params == ("BSCS-2A", student_api.enrollments.CURRENT_SEMESTER)
+
+
+def test_section_offerings_for_another_semester(pool):
+    status, body = call("/api/student/sections/BSCS-2A", STUDENT, query=b"semester=2nd")
+    assert (status, body["semester"]) == (200, "2nd")
+    assert pool.queries[0][1] == ("BSCS-2A", "2nd")
+
+
+def test_section_offerings_with_prerequisite_cycle(pool, monkeypatch):
+    cyclic = [dict(row) for row in SUBJECTS]
+    cyclic[0]["prerequisite_id"] = 3
+    monkeypatch.setattr(refcache, "subjects", lambda: cyclic)
+    status, body = call("/api/student/sections/BSCS-2A", STUDENT)
+    assert status == 409
+    assert "cycle" in body["error"]
+
+
+def test_eligibility_for_listed_subjects(pool):
+    status, body = call("/api/student/eligibility", STUDENT, query=b"subject_ids=3,2")
+    assert status == 200
+    assert body["subjects"] == [
+        {"subject_id": 2, "eligible": True, "completed": False, "missing_prerequisites": []},
+        {"subject_id": 3, "eligible": False, "completed": False, "missing_prerequisites": [2]},
+    ]
+
+
+def test_eligibility_defaults_to_the_students_program(pool):
+    status, body = call("/api/student/eligibility", STUDENT)
+    assert status == 200
+    assert [row["subject_id"] for row in body["subjects"]] == [1, 2, 3]
+    assert body["subjects"][0]["completed"] is True
+
+
+def test_eligibility_bad_ids(pool):
+    assert call("/api/student/eligibility", STUDENT, query=b"subject_ids=1,x")[0] == 400
+
+
+def test_current_enrollment_none(pool):
+    assert call("/api/student/enrollment", STUDENT) == (200, {"enrollment": None, "subjects": []})
+
+
+def test_current_enrollment(pool):
+    pool.responses["FROM enrollments e"] = [{"id": 40, "section": "BSCS-2A", "semester": "1st",
+                                            "school_year": "2025-2026", "status": "pending",
+                                            "created_at": datetime.datetime(2025, 8, 1, 9, 30)}]
+    pool.responses["FROM enrollment_subjects es"] = [{"subject_id": 2, "code": "CS102", "instructor": "Ada Lovelace"}]
+    status, body = call("/api/student/enrollment", STUDENT, query=b"semester=2nd")
+    assert status == 200
+    assert body["enrollment"]["created_at"] == "2025-08-01 09:30:00"
+    assert body["subjects"] == [{"subject_id": 2, "code": "CS102", "instructor": "Ada Lovelace"}]
+
+    term_sql, term_params = pool.queries[0]
+    assert term_params == (7, "2nd", "2025-2026")
+    subjects_sql, subjects_params = pool.queries[1]
+    assert "LEFT JOIN instructors i ON cs.instructor_id = i.id" in subjects_sql
+    assert "cs.semester = %s" in subjects_sql
+    assert subjects_params == ("BSCS-2A", "1st", 40)
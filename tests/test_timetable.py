@@ -0,0 +1,72 @@
+import random
+
+import conflicts
+import timetable
+
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri"]
+
+
+def problem(seed, sections=40, subjects=6, rooms=12, instructors=20):
+    rng = random.Random(seed)
+    # Overlapping slot grids on purpose: 1.5-hour and 1-hour slots on the same days
+    slots = [{"day": day, "start": 450 + 90 * i, "end": 540 + 90 * i} for day in DAYS for i in range(7)]
+    slots += [{"day": day, "start": 480 + 60 * i, "end": 540 + 60 * i} for day in DAYS[:2] for i in range(8)]
+    room_list = [{"name": "R%02d" % i, "capacity": rng.choice([30, 40, 50, None])} for i in range(rooms)]
+    available = {i: {k for k, slot in enumerate(slots) if slot["day"] != rng.choice(DAYS)}
+                 for i in range(1, instructors + 1) if i % 3}
+    tasks = [{"section": "S%02d" % n, "subject_id": s, "size": rng.choice([20, 30, 40, 45]),
+              "instructors": rng.sample(range(1, instructors + 1), 3)}
+             for n in range(sections) for s in range(subjects)]
+    fixed = [{"day": "Mon", "start": 450, "end": 540, "room": "r00", "instructor_id": 1, "section": "s00"}]
+    return timetable.Solver(slots, room_list, available, tasks, fixed=fixed), fixed
+
+
+def rows(solver, fixed):
+    placed = [{"id": n, "day": solver.slots[k]["day"], "time_start": timetable._clock(solver.slots[k]["start"]),
+               "time_end": timetable._clock(solver.slots[k]["end"]), "room": solver.rooms[room]["name"],
+               "instructor_id": teacher, "section": task["section"]}
+              for n, (task, k, room, teacher) in enumerate(solver.placed)]
+    placed += [{"id": "fixed", "day": row["day"], "time_start": timetable._clock(row["start"]),
+                "time_end": timetable._clock(row["end"]), "room": row["room"],
+                "instructor_id": row["instructor_id"], "section": row["section"]} for row in fixed]
+    return placed
+
+
+def test_solver_places_without_clashes():
+    for seed in range(3):
+        solver, fixed = problem(seed)
+        progress = list(solver.run())
+        assert progress[-1]["done"] == progress[-1]["total"] == len(solver.tasks)
+        assert len(solver.placed) + len(solver.unplaced) == len(solver.tasks)
+        assert len(solver.placed) > len(solver.tasks) * 0.9
+
+        placed = rows(solver, fixed)
+        for kind in ("room", "instructor_id", "section"):
+            groups = {}
+            for row in placed:
+                key = str(row[kind]).lower()
+                groups.setdefault(key, []).append(row)
+            for group in groups.values():
+                assert conflicts.overlaps_within(group) == [], kind
+
+
+def test_solver_respects_capacity_and_availability():
+    solver, _ = problem(4)
+    list(solver.run())
+    for task, k, room, teacher in solver.placed:
+        capacity = solver.rooms[room]["capacity"]
+        assert capacity is None or capacity >= task["size"]
+        assert teacher in task["instructors"]
+        assert teacher not in solver.available or k in solver.available[teacher]
+
+
+def test_solver_reports_what_cannot_fit():
+    slots = [{"day": "Mon", "start": 480, "end": 570}]
+    rooms = [{"name": "R1", "capacity": 40}]
+    tasks = [{"section": "A", "subject_id": 1, "size": 30, "instructors": [None]},
+             {"section": "A", "subject_id": 2, "size": 30, "instructors": [None]},
+             {"section": "B", "subject_id": 3, "size": 50, "instructors": [None]}]
+    solver = timetable.Solver(slots, rooms, {}, tasks)
+    list(solver.run())
+    assert len(solver.placed) == 1
+    assert {task["subject_id"] for task in solver.unplaced} >= {3}